@@ -168,6 +168,10 @@ async def update_rubric(
     teacher_id: str = Depends(auth_service.get_current_teacher)
 ):
     """Update a rubric."""
+    previous = rubric_service.get_rubric(rubric_id, teacher_id)
+    if previous is None:
+        raise HTTPException(status_code=404, detail="Rubric not found")
+
     rubric = rubric_service.update_rubric(
         rubric_id=rubric_id,
         teacher_id=teacher_id,
@@ -178,8 +182,12 @@ async def update_rubric(
     if rubric is None:
         raise HTTPException(status_code=404, detail="Rubric not found")
 
-    # Re-parse if content changed
-    if request.content:
+    # Re-parse if content changed (identical content reuses its stored parse)
+    content_changed = (
+        request.content is not None
+        and rubric.content_hash != previous.content_hash
+    )
+    if request.content and (content_changed or rubric.parsed_criteria is None):
         try:
             parsed = await coverage_service.parse_rubric(request.content)
             rubric_service.update_rubric_parsed_criteria(rubric.id, parsed)
@@ -212,15 +220,16 @@ async def delete_rubric(
 @router.post("/rubrics/{rubric_id}/parse")
 async def parse_rubric(
     rubric_id: str,
+    force: bool = False,
     teacher_id: str = Depends(auth_service.get_current_teacher)
 ):
-    """Re-parse a rubric with LLM."""
+    """Re-parse a rubric. Reuses the stored parse of identical content unless force is set."""
     rubric = rubric_service.get_rubric(rubric_id, teacher_id)
     if rubric is None:
         raise HTTPException(status_code=404, detail="Rubric not found")
 
     try:
-        parsed = await coverage_service.parse_rubric(rubric.content)
+        parsed = await coverage_service.parse_rubric(rubric.content, use_cache=not force)
         rubric_service.update_rubric_parsed_criteria(rubric.id, parsed)
         return parsed.model_dump()
     except Exception as e:
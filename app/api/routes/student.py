@@ -1,11 +1,14 @@
-import os
-import tempfile
+import hashlib
+import time
+from typing import Any, Callable, Coroutine, Optional
 
-import requests
-from fastapi import APIRouter, File, Form, HTTPException, Query, UploadFile
-from fastapi.responses import Response
+from fastapi import APIRouter, File, Form, Header, HTTPException, Query, Request, UploadFile
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from fastapi.routing import APIRoute
 
 from app.api.schemas import (
+    AnswerJobResponse,
+    AudioChunkResponse,
     JoinExamRequest,
     JoinExamResponse,
     SubmitResponseRequest,
@@ -15,19 +18,57 @@ from app.api.schemas import (
     StudentTranscriptResponse,
     StudentTranscriptEntryResponse,
 )
-from app.models.domain import SessionStatus
+from app.config import get_settings
+from app.models.domain import Job, JobStatus, SessionStatus
+from app.services import audio_chunks as audio_chunk_service
 from app.services import exam as exam_service
+from app.services import idempotency as idempotency_service
+from app.services import jobs
 from app.services import rubric as rubric_service
 from app.services import transcript as transcript_service
 from app.services import orchestrator
+from app.services import stt as stt_service
 from app.services import tts as tts_service
 from app.services import voice as voice_service
+from app.services.idempotency import StoredResponse
+from app.services.timing import record_stage, server_timing_header
+
+# Room for the multipart framing and form fields around an audio upload
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+def limit_audio_upload(request: Request) -> None:
+    """Reject audio requests whose body is larger than the STT upload limit allows."""
+    max_bytes = get_settings().stt_max_upload_bytes
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > max_bytes + MULTIPART_OVERHEAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"Audio upload exceeds {max_bytes} bytes")
+
+
+class AudioUploadRoute(APIRoute):
+    """
+    Route taking an audio upload: the body size is checked from Content-Length
+    before it is read, and the form is parsed with uploads kept in memory up
+    to STT_SPOOL_MAX_BYTES (see stt.read_audio_form).
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def audio_upload_handler(request: Request) -> Response:
+            limit_audio_upload(request)
+            await stt_service.read_audio_form(request)
+            return await handler(request)
+
+        return audio_upload_handler
+
 
 router = APIRouter()
+audio_router = APIRouter(route_class=AudioUploadRoute)
 
 
 @router.post("/join", response_model=JoinExamResponse)
-async def join_exam(request: JoinExamRequest):
+async def join_exam(request: JoinExamRequest, response: Response):
     """
     Join an exam with room code, student name, and student ID.
     Returns the session ID and first question.
@@ -41,31 +82,31 @@ async def join_exam(request: JoinExamRequest):
     if not exam_service.can_join_exam(exam.id):
         raise HTTPException(status_code=400, detail="Exam is full or not accepting students")
 
-    # Get the rubric
-    rubric = rubric_service.get_rubric(exam.rubric_id)
-    if rubric is None:
-        raise HTTPException(status_code=500, detail="Exam rubric not found")
-
-    if rubric.parsed_criteria is None:
+    # Get the compiled rubric (shared by every student in the exam)
+    compiled = rubric_service.get_compiled_rubric(exam.rubric_id)
+    if compiled is None:
+        rubric = rubric_service.get_rubric(exam.rubric_id)
+        if rubric is None:
+            raise HTTPException(status_code=500, detail="Exam rubric not found")
         raise HTTPException(status_code=500, detail="Exam rubric not parsed")
 
-    # Create student session
+    # Create student session, remembering the language for question prefetching
+    language = request.language if request.language in tts_service.SUPPORTED_LANGUAGES else "en"
     session = exam_service.create_student_session(
         exam_id=exam.id,
         student_name=request.student_name,
         student_id=request.student_id,
+        language=language,
     )
 
     # Generate first question
-    first_question = await orchestrator.start_student_session(
-        session_id=session.id,
-        rubric=rubric.parsed_criteria,
-    )
+    started = await orchestrator.start_student_session(session_id=session.id, compiled=compiled)
+    response.headers["Server-Timing"] = server_timing_header(started.stage_timings)
 
     return JoinExamResponse(
         session_id=session.id,
-        exam_title=rubric.title,
-        first_question=first_question,
+        exam_title=compiled.title,
+        first_question=started.next_question,
     )
 
 
@@ -93,11 +134,24 @@ async def get_session_status(session_id: str):
     )
 
 
-@router.post("/session/{session_id}/response", response_model=QuestionResponse)
-async def submit_response(session_id: str, request: SubmitResponseRequest):
+@router.post(
+    "/session/{session_id}/response",
+    response_model=QuestionResponse,
+    responses={202: {"model": AnswerJobResponse}},
+)
+async def submit_response(
+    session_id: str,
+    request: SubmitResponseRequest,
+    prefer: Optional[str] = Header(None),
+    idempotency_key: Optional[str] = Header(None),
+):
     """
     Submit transcript response for current question.
     Returns next question or completion signal.
+
+    With "Prefer: respond-async", returns 202 with a job to poll instead.
+    A retry with the same Idempotency-Key, or without one the same answer to
+    the same asking of the question, returns the original response.
     """
     # Verify session exists and is active
     session = exam_service.get_student_session(session_id)
@@ -107,37 +161,39 @@ async def submit_response(session_id: str, request: SubmitResponseRequest):
     if session.status != SessionStatus.ACTIVE:
         raise HTTPException(status_code=400, detail="Session is not active")
 
-    # Process the response
-    try:
-        result = await orchestrator.process_student_response(
-            session_id=session_id,
-            response_text=request.response,
-        )
-    except ValueError as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-    return QuestionResponse(
-        question_text=result.next_question,
-        question_number=result.question_number,
-        is_final=result.is_final,
-        is_adapted=result.is_adapted,
-        message=result.teacher_message,
-    )
+    async def _submit() -> StoredResponse:
+        if _respond_async(prefer):
+            return _accepted(session_id, request.question, request.response)
+        return await _process_response(session_id, request.response)
 
+    # Async answers are deduplicated by their job instead, which lets a
+    # failed one be resubmitted
+    if idempotency_key is None and not _respond_async(prefer):
+        idempotency_key = _derived_key(session_id, request.question, "response", _sha256(request.response))
 
-# ElevenLabs Speech-to-Text constants
-ELEVENLABS_STT_URL = "https://api.elevenlabs.io/v1/speech-to-text"
-ELEVENLABS_MODEL_ID = "scribe_v1"
+    response = await idempotency_service.run_once(session_id, idempotency_key, "response", _submit)
+    return response.to_response()
 
 
-@router.post("/session/{session_id}/audio", response_model=QuestionResponse)
+@audio_router.post(
+    "/session/{session_id}/audio",
+    response_model=QuestionResponse,
+    responses={202: {"model": AnswerJobResponse}},
+)
 async def submit_audio_response(
     session_id: str,
     audio: UploadFile = File(...),
     question: str = Form(...),
+    prefer: Optional[str] = Header(None),
+    idempotency_key: Optional[str] = Header(None),
 ):
     """
     Accept audio file, transcribe via ElevenLabs, then process as response.
+
+    With "Prefer: respond-async", returns 202 with a job to poll once the
+    audio is transcribed. Uploading the same recording again for the same
+    asking of the question (or retrying with the same Idempotency-Key)
+    returns the original response without transcribing it again.
     """
     # Verify session exists and is active
     session = exam_service.get_student_session(session_id)
@@ -147,96 +203,258 @@ async def submit_audio_response(
     if session.status != SessionStatus.ACTIVE:
         raise HTTPException(status_code=400, detail="Session is not active")
 
-    # Get ElevenLabs API key
-    api_key = os.environ.get("ELEVENLABS_API_KEY")
-    if not api_key:
-        raise HTTPException(
-            status_code=500,
-            detail="ELEVENLABS_API_KEY is not configured",
-        )
+    if idempotency_key is None:
+        idempotency_key = _derived_key(session_id, question, "audio", await stt_service.hash_upload(audio))
 
-    # Save uploaded audio to a temp file
-    try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp_file:
-            content = await audio.read()
-            tmp_file.write(content)
-            tmp_path = tmp_file.name
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to save audio file: {str(e)}",
-        )
+    async def _submit() -> StoredResponse:
+        # Stream the upload to ElevenLabs without blocking the event loop
+        # (silent WAV recordings come back empty without an STT call)
+        started = time.perf_counter()
+        transcript = await stt_service.transcribe_upload(audio)
+        timings = _stt_timing(started)
 
-    # Transcribe audio via ElevenLabs
-    try:
-        with open(tmp_path, "rb") as f:
-            files = {"file": (audio.filename or "audio.wav", f, "audio/wav")}
-            data = {"model_id": ELEVENLABS_MODEL_ID}
-            headers = {"xi-api-key": api_key}
-
-            response = requests.post(
-                ELEVENLABS_STT_URL,
-                headers=headers,
-                data=data,
-                files=files,
-                timeout=60,
-            )
+        if _respond_async(prefer):
+            return _accepted(session_id, question, transcript, no_speech=not transcript.strip(), timings=timings)
 
-        if response.status_code != 200:
-            msg = response.text or response.reason
-            raise HTTPException(
-                status_code=502,
-                detail=f"ElevenLabs STT failed ({response.status_code}): {msg}",
-            )
+        # Process the transcribed response (same as submit_response)
+        return await _process_response(session_id, transcript, no_speech=not transcript.strip(), timings=timings)
 
-        body = response.json()
-        transcript = body.get("text")
-        if transcript is None:
-            raise HTTPException(
-                status_code=502,
-                detail="ElevenLabs response missing 'text' field",
-            )
-        transcript = transcript.strip()
+    response = await idempotency_service.run_once(session_id, idempotency_key, "audio", _submit)
+    return response.to_response()
 
-    except HTTPException:
-        raise
-    except requests.RequestException as e:
-        raise HTTPException(
-            status_code=502,
-            detail=f"Failed to connect to ElevenLabs: {str(e)}",
-        )
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Transcription error: {str(e)}",
-        )
-    finally:
-        # Clean up temp file
-        try:
-            os.unlink(tmp_path)
-        except OSError:
-            pass
 
-    # Process the transcribed response (same as submit_response)
+@audio_router.post(
+    "/session/{session_id}/audio/chunk",
+    response_model=AudioChunkResponse,
+    status_code=202,
+)
+async def upload_audio_chunk(
+    session_id: str,
+    audio: UploadFile = File(...),
+    upload_id: str = Form(...),
+    seq: int = Form(...),
+):
+    """
+    Upload one segment of an answer while the student is still recording.
+
+    Segments are numbered from 0 and must each be a self-contained audio file.
+    Each is transcribed immediately; finish with /audio/finish.
+    """
+    session = exam_service.get_student_session(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    if session.status != SessionStatus.ACTIVE:
+        raise HTTPException(status_code=400, detail="Session is not active")
+
+    upload = await _add_audio_segment(session_id, upload_id, seq, audio)
+
+    return AudioChunkResponse(
+        upload_id=upload_id,
+        seq=seq,
+        segments_received=len(upload.segments),
+        partial_transcript=upload.transcript_so_far(),
+    )
+
+
+@audio_router.post(
+    "/session/{session_id}/audio/finish",
+    response_model=QuestionResponse,
+    responses={202: {"model": AnswerJobResponse}},
+)
+async def finish_audio_upload(
+    session_id: str,
+    upload_id: str = Form(...),
+    seq: Optional[int] = Form(None),
+    audio: Optional[UploadFile] = File(None),
+    question: Optional[str] = Form(None),
+    prefer: Optional[str] = Header(None),
+    idempotency_key: Optional[str] = Header(None),
+):
+    """
+    Finish a segmented answer upload, optionally carrying the last segment.
+    Waits for the remaining segment transcriptions, then processes the full
+    transcript as the student's response ("Prefer: respond-async" as for /audio).
+    Finishing the same upload again returns the original response. Send
+    the question being answered for async mode (defaults to the current one).
+    """
+    session = exam_service.get_student_session(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    if session.status != SessionStatus.ACTIVE:
+        audio_chunk_service.discard_upload(session_id, upload_id)
+        raise HTTPException(status_code=400, detail="Session is not active")
+
+    async def _finish() -> StoredResponse:
+        if audio is not None:
+            if seq is None:
+                raise HTTPException(status_code=400, detail="Segment number is required with audio")
+            await _add_audio_segment(session_id, upload_id, seq, audio)
+
+        # Only the segments still being transcribed are waited for
+        started = time.perf_counter()
+        transcript = await audio_chunk_service.finish_upload(session_id, upload_id)
+        timings = _stt_timing(started)
+
+        if _respond_async(prefer):
+            answered = question
+            if answered is None:
+                last_question = transcript_service.get_last_question(session_id)
+                answered = last_question.content if last_question else ""
+            return _accepted(session_id, answered, transcript, no_speech=not transcript.strip(), timings=timings)
+        return await _process_response(session_id, transcript, no_speech=not transcript.strip(), timings=timings)
+
+    key = idempotency_key or f"upload:{upload_id}"
+    response = await idempotency_service.run_once(session_id, key, "audio_finish", _finish)
+    return response.to_response()
+
+
+@router.get("/session/{session_id}/answers/{job_id}", response_model=AnswerJobResponse)
+async def get_answer_job(
+    session_id: str,
+    job_id: str,
+    wait: float = Query(0.0, ge=0.0, description="Seconds to wait for the answer to be processed"),
+):
+    """
+    Get the status of an answer submitted with "Prefer: respond-async".
+
+    Long-polls: with `wait`, returns as soon as the answer is processed (or
+    failed), or with the current status once `wait` seconds have passed.
+    """
+    timeout = min(wait, get_settings().answer_poll_max_wait)
+    job = await jobs.wait_for_job(job_id, timeout)
+    if job is None or job.kind != orchestrator.ANSWER_JOB or job.payload.get("session_id") != session_id:
+        raise HTTPException(status_code=404, detail="Answer job not found")
+
+    return _answer_job_response(job)
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _derived_key(session_id: str, question: str, kind: str, content_hash: str) -> Optional[str]:
+    """
+    Idempotency key for a retry sent without one: the answer's content hash
+    on the transcript entry of the question it answers, so the same answer
+    to the question asked again later is processed as a new answer.
+    """
+    entry = transcript_service.find_question(session_id, question)
+    if entry is None:
+        return None
+    return f"{kind}:{entry.id}:{content_hash}"
+
+
+def _respond_async(prefer: Optional[str]) -> bool:
+    return prefer is not None and "respond-async" in prefer.lower()
+
+
+def _stt_timing(started: float) -> dict[str, float]:
+    """Record the time spent waiting for speech-to-text since `started`."""
+    ms = round((time.perf_counter() - started) * 1000, 2)
+    record_stage("response", "stt", ms)
+    return {"stt": ms}
+
+
+def _accepted(
+    session_id: str,
+    question: str,
+    transcript: str,
+    no_speech: bool = False,
+    timings: Optional[dict[str, float]] = None,
+) -> StoredResponse:
+    try:
+        job_id = orchestrator.submit_response_job(session_id, question, transcript, no_speech=no_speech)
+    except orchestrator.QuestionMismatchError:
+        raise HTTPException(status_code=409, detail="Answer is for a question that is no longer current")
+    job = jobs.get_job(job_id)
+    return StoredResponse(
+        status_code=202,
+        body=_answer_job_response(job).model_dump(),
+        headers={"Location": f"/api/v1/session/{session_id}/answers/{job_id}"},
+        timings=timings or {},
+    )
+
+
+async def _process_response(
+    session_id: str,
+    transcript: str,
+    no_speech: bool = False,
+    timings: Optional[dict[str, float]] = None,
+) -> StoredResponse:
     try:
         result = await orchestrator.process_student_response(
             session_id=session_id,
             response_text=transcript,
+            no_speech=no_speech,
         )
+    except orchestrator.SessionNotActiveError:
+        raise HTTPException(status_code=400, detail="Session is not active")
     except ValueError as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-    return QuestionResponse(
-        question_text=result.next_question,
-        question_number=result.question_number,
-        is_final=result.is_final,
-        is_adapted=result.is_adapted,
-        message=result.teacher_message,
+    return _question_response(result, timings)
+
+
+def _question_response(
+    result: orchestrator.ProcessedResponse,
+    timings: Optional[dict[str, float]] = None,
+) -> StoredResponse:
+    return StoredResponse(
+        status_code=200,
+        body=QuestionResponse(
+            question_text=result.next_question,
+            question_number=result.question_number,
+            is_final=result.is_final,
+            is_adapted=result.is_adapted,
+            message=result.teacher_message,
+        ).model_dump(),
+        timings={**(timings or {}), **result.stage_timings},
+    )
+
+
+def _answer_job_response(job: Job) -> AnswerJobResponse:
+    result = None
+    if job.status == JobStatus.DONE and job.result is not None:
+        result = QuestionResponse(
+            question_text=job.result["next_question"],
+            question_number=job.result["question_number"],
+            is_final=job.result["is_final"],
+            is_adapted=job.result["is_adapted"],
+            message=job.result["teacher_message"],
+        )
+    return AnswerJobResponse(
+        job_id=job.id,
+        status=job.status.value,
+        result=result,
+        error=job.last_error if job.status == JobStatus.FAILED else None,
+    )
+
+
+async def _add_audio_segment(
+    session_id: str,
+    upload_id: str,
+    seq: int,
+    audio: UploadFile,
+) -> audio_chunk_service.ChunkedUpload:
+    max_bytes = get_settings().stt_max_upload_bytes
+    if audio.size is not None and audio.size > max_bytes:
+        raise HTTPException(status_code=413, detail=f"Audio upload exceeds {max_bytes} bytes")
+
+    data = await audio.read()
+    return audio_chunk_service.add_segment(
+        session_id,
+        upload_id,
+        seq,
+        data,
+        filename=audio.filename or "segment.webm",
+        content_type=audio.content_type or "audio/webm",
     )
 
 
 @router.post("/session/{session_id}/skip", response_model=QuestionResponse)
-async def skip_question(session_id: str):
+async def skip_question(session_id: str, idempotency_key: Optional[str] = Header(None)):
     """
     Skip the current question.
 
@@ -245,6 +463,8 @@ async def skip_question(session_id: str):
     - Second skip (on adapted question): Move to new topic, mark criterion as not covered
 
     Requires at least one audio submission before skipping is allowed.
+    A retry with the same Idempotency-Key, or without one while the same
+    question is current, returns the original response.
     """
     # Verify session exists and is active
     session = exam_service.get_student_session(session_id)
@@ -263,18 +483,22 @@ async def skip_question(session_id: str):
         )
 
     # Process the skip request
-    try:
-        result = await orchestrator.process_skip_request(session_id=session_id)
-    except ValueError as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    async def _skip() -> StoredResponse:
+        try:
+            result = await orchestrator.process_skip_request(session_id=session_id)
+        except orchestrator.SessionNotActiveError:
+            raise HTTPException(status_code=400, detail="Session is not active")
+        except ValueError as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        return _question_response(result)
 
-    return QuestionResponse(
-        question_text=result.next_question,
-        question_number=result.question_number,
-        is_final=result.is_final,
-        is_adapted=result.is_adapted,
-        message=result.teacher_message,
-    )
+    if idempotency_key is None:
+        last_question = transcript_service.get_last_question(session_id)
+        if last_question is not None:
+            idempotency_key = f"skip:{last_question.id}"
+
+    response = await idempotency_service.run_once(session_id, idempotency_key, "skip", _skip)
+    return response.to_response()
 
 
 @router.get("/session/{session_id}/question", response_model=QuestionResponse)
@@ -328,11 +552,13 @@ async def get_question_audio(
     session_id: str,
     text: str = Query(..., description="Question text to convert to speech"),
     language: str = Query("en", description="Language code for TTS (en, es, fr, de, zh)"),
+    if_none_match: Optional[str] = Header(None),
 ):
     """
     Convert question text to speech using ElevenLabs TTS.
     Uses the teacher's voice preference for the requested language.
-    Returns MP3 audio data.
+    Returns MP3 audio data: cache hits are served as files with ETag and Range
+    support, misses are streamed from ElevenLabs while being written to the cache.
     """
     # Verify session exists and is active
     session = exam_service.get_student_session(session_id)
@@ -347,21 +573,47 @@ async def get_question_audio(
     if exam is None:
         raise HTTPException(status_code=404, detail="Exam not found")
 
+    # Keep the stored language in step with what the student is listening in
+    if language != session.language and language in tts_service.SUPPORTED_LANGUAGES:
+        exam_service.update_session_language(session_id, language)
+
     # Get teacher's voice preference for this language
     voice_id = voice_service.get_voice_for_language(exam.teacher_id, language)
 
-    # Generate speech with language and teacher's preferred voice
-    audio_bytes = await tts_service.generate_speech(
-        text, language=language, voice_id=voice_id
-    )
+    # Clips are content-addressed, so a matching ETag means the bytes are identical
+    etag = f'"{tts_service.resolve_speech_cache_key(text, language, voice_id)}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "private, max-age=3600",
+    }
+    if if_none_match and etag in [t.strip() for t in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    settings = get_settings()
+    audio_iter = None
+
+    # Look up (or generate) speech with language and teacher's preferred voice
+    if settings.tts_streaming_enabled:
+        audio_path, _, audio_iter = await tts_service.stream_cached_speech(
+            text, language=language, voice_id=voice_id
+        )
+    else:
+        audio_path, _ = await tts_service.get_cached_speech(
+            text, language=language, voice_id=voice_id
+        )
 
-    return Response(
-        content=audio_bytes,
+    if audio_iter is not None:
+        # Cache miss: relay audio as ElevenLabs produces it (no Range support yet)
+        return StreamingResponse(
+            audio_iter,
+            media_type="audio/mpeg",
+            headers={**headers, "Content-Disposition": "inline"},
+        )
+
+    return FileResponse(
+        audio_path,
         media_type="audio/mpeg",
-        headers={
-            "Content-Disposition": "inline",
-            "Cache-Control": "private, max-age=3600",
-        },
+        headers={**headers, "Content-Disposition": "inline"},
     )
 
 
@@ -428,3 +680,6 @@ async def get_student_transcript(session_id: str):
             for e in entries
         ]
     )
+
+
+router.include_router(audio_router)
@@ -75,6 +75,7 @@ class JoinExamRequest(BaseModel):
     room_code: str
     student_name: str
     student_id: str
+    language: str = "en"
 
 
 class JoinExamResponse(BaseModel):
@@ -97,6 +98,21 @@ class QuestionResponse(BaseModel):
     message: Optional[str] = None
 
 
+class AnswerJobResponse(BaseModel):
+    """An answer submitted with "Prefer: respond-async"."""
+    job_id: str
+    status: str  # pending, running, done or failed
+    result: Optional[QuestionResponse] = None
+    error: Optional[str] = None
+
+
+class AudioChunkResponse(BaseModel):
+    upload_id: str
+    seq: int
+    segments_received: int
+    partial_transcript: str
+
+
 class SessionStatusResponse(BaseModel):
     session_id: str
     status: SessionStatus
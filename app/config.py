@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Literal
 
 
 class Settings(BaseSettings):
@@ -7,6 +8,8 @@ class Settings(BaseSettings):
     openrouter_api_key: str = ""
     openrouter_base_url: str = "https://openrouter.ai/api/v1"
     llm_model: str = "google/gemini-3-flash-preview"
+    # Mark the static prompt prefix (system prompt + rubric) as cacheable
+    llm_prompt_cache_control: bool = True
 
     # Database
     duckdb_path: str = "./data/speak_up.duckdb"
@@ -21,6 +24,99 @@ class Settings(BaseSettings):
     max_students_per_exam: int = 30
     max_rubric_title_length: int = 200
 
+    # Text-to-speech cache
+    tts_cache_dir: str = "./data/tts_cache"
+    tts_cache_max_bytes: int = 256 * 1024 * 1024  # 256 MB
+    tts_streaming_enabled: bool = True
+    translation_cache_max_entries: int = 4096
+
+    # Speech-to-text uploads
+    stt_max_upload_bytes: int = 25 * 1024 * 1024  # 25 MB
+    stt_spool_max_bytes: int = 10 * 1024 * 1024  # kept in memory up to this size
+    audio_upload_max_segments: int = 200
+    audio_upload_ttl_seconds: int = 600
+
+    # Audio preprocessing before STT (PCM WAV uploads only)
+    audio_preprocess_enabled: bool = True
+    audio_target_sample_rate: int = 16000
+    audio_silence_threshold_db: float = -45.0
+    audio_min_speech_ms: int = 250
+
+    # Background translation/TTS of each new question
+    question_prefetch_enabled: bool = True
+    question_prefetch_concurrency: int = 8  # prefetches running at once
+    # Translate each question into every supported language in one LLM call
+    # (students can switch language mid-exam without another translation)
+    question_prefetch_all_languages: bool = False
+
+    # Parse well-structured markdown rubrics without the LLM
+    rubric_local_parser_enabled: bool = True
+    rubric_local_parse_min_confidence: float = 0.7
+    # Compiled rubrics (criterion index, rendered prompt blocks) kept in memory
+    compiled_rubric_cache_size: int = 128
+
+    # Coverage analysis only sees this many criteria (plus the question's
+    # targets), ranked by lexical relevance to the response; 0 sends all
+    coverage_top_k: int = 6
+
+    # Generate a simplified variant with every question, served instantly on
+    # the first skip or a silence/confusion struggle
+    question_variant_enabled: bool = True
+
+    # Question targeting: recently targeted criteria have their priority cut
+    # by this fraction for this many questions
+    target_recency_penalty: float = 0.5
+    target_recency_window: int = 2
+    criterion_scheduler_cache_size: int = 1024
+
+    # "inline": students wait for coverage analysis of each answer.
+    # "deferred": coverage is analyzed in the background and reconciled (with
+    # the completion check) before the session's next answer. Pending analyses
+    # are in-process only and lost on restart.
+    coverage_mode: Literal["inline", "deferred"] = "inline"
+
+    # Local rules that settle obvious struggle cases without an LLM call
+    struggle_rules_enabled: bool = True
+
+    # Token budgets (estimated at ~4 characters per token) for the variable
+    # parts of prompts: conversation context per call site, one transcript
+    # entry within it, and the student response being analyzed
+    prompt_history_tokens_question: int = 500
+    prompt_history_tokens_struggle: int = 500
+    prompt_history_tokens_adapt: int = 250
+    prompt_entry_max_tokens: int = 100
+    prompt_response_max_tokens: int = 1500
+
+    # Rolling transcript summary, updated in the background every few exchanges
+    transcript_summary_enabled: bool = True
+    transcript_summary_interval: int = 3  # exchanges between updates
+    transcript_summary_tail_entries: int = 4  # most recent entries left out of the summary
+    transcript_summary_max_tokens: int = 300
+
+    # Durable background job queue (coverage records, struggle flags, async
+    # answers). Jobs live in DuckDB, so pending work survives a restart;
+    # 0 workers leaves jobs queued until something drains them
+    job_workers: int = 2
+    job_poll_interval: float = 1.0  # seconds an idle worker waits between table checks
+    job_max_attempts: int = 3
+    job_retry_backoff: float = 2.0  # seconds before the first retry, doubled for each one after
+    job_drain_timeout: float = 10.0  # seconds shutdown waits for queued jobs
+    job_retention: float = 3600.0  # seconds job results and failures are kept
+
+    # Async answer submission ("Prefer: respond-async"): answers are processed
+    # by this many workers and collected by long polling for up to
+    # answer_poll_max_wait seconds per request
+    answer_job_workers: int = 16
+    answer_poll_max_wait: float = 30.0
+
+    # Seconds a student action's response is kept for replay to a retry with
+    # the same Idempotency-Key (or the same audio)
+    idempotency_key_ttl: float = 86400.0
+
+    # Prometheus text exposition at GET /metrics; it is unauthenticated, so
+    # only enable it where the path is not reachable from the internet
+    metrics_enabled: bool = False
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -56,10 +56,29 @@ def init_tables(conn: duckdb.DuckDBPyConnection) -> None:
             parsed_criteria JSON,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             updated_at TIMESTAMP,
+            content_hash VARCHAR,
             FOREIGN KEY (teacher_id) REFERENCES teachers(id)
         )
     """)
 
+    # Add content_hash column if it doesn't exist (migration for existing databases)
+    try:
+        conn.execute("ALTER TABLE rubrics ADD COLUMN content_hash VARCHAR")
+    except duckdb.CatalogException:
+        pass  # Column already exists
+
+    # Rubric parse results, shared by all rubrics with the same content
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS rubric_parse_artifacts (
+            content_hash VARCHAR NOT NULL,
+            parser_version VARCHAR NOT NULL,
+            parsed_criteria JSON NOT NULL,
+            source VARCHAR,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (content_hash, parser_version)
+        )
+    """)
+
     # Exams table
     conn.execute("""
         CREATE TABLE IF NOT EXISTS exams (
@@ -86,6 +105,8 @@ def init_tables(conn: duckdb.DuckDBPyConnection) -> None:
             status VARCHAR DEFAULT 'active',
             rubric_coverage JSON,
             skip_state JSON,
+            language VARCHAR DEFAULT 'en',
+            transcript_summary JSON,
             started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             ended_at TIMESTAMP,
             FOREIGN KEY (exam_id) REFERENCES exams(id)
@@ -98,6 +119,18 @@ def init_tables(conn: duckdb.DuckDBPyConnection) -> None:
     except duckdb.CatalogException:
         pass  # Column already exists
 
+    # Add language column if it doesn't exist (migration for existing databases)
+    try:
+        conn.execute("ALTER TABLE student_sessions ADD COLUMN language VARCHAR DEFAULT 'en'")
+    except duckdb.CatalogException:
+        pass  # Column already exists
+
+    # Add transcript_summary column if it doesn't exist (migration for existing databases)
+    try:
+        conn.execute("ALTER TABLE student_sessions ADD COLUMN transcript_summary JSON")
+    except duckdb.CatalogException:
+        pass  # Column already exists
+
     # Transcript entries table
     conn.execute("""
         CREATE TABLE IF NOT EXISTS transcript_entries (
@@ -181,6 +214,51 @@ def init_tables(conn: duckdb.DuckDBPyConnection) -> None:
         )
     """)
 
+    # Background job queue (finished jobs are deleted unless they have a
+    # result to collect; failed ones are kept)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            id VARCHAR PRIMARY KEY,
+            kind VARCHAR NOT NULL,
+            queue VARCHAR DEFAULT 'default',
+            payload JSON,
+            result JSON,
+            priority INTEGER DEFAULT 0,
+            status VARCHAR DEFAULT 'pending',
+            attempts INTEGER DEFAULT 0,
+            max_attempts INTEGER DEFAULT 3,
+            job_key VARCHAR,
+            last_error VARCHAR,
+            run_after TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP
+        )
+    """)
+
+    # Add queue and result columns if they don't exist (migration for existing databases)
+    try:
+        conn.execute("ALTER TABLE jobs ADD COLUMN queue VARCHAR DEFAULT 'default'")
+    except duckdb.CatalogException:
+        pass  # Column already exists
+    try:
+        conn.execute("ALTER TABLE jobs ADD COLUMN result JSON")
+    except duckdb.CatalogException:
+        pass  # Column already exists
+
+    # Stored responses of student actions, replayed for retried idempotency keys
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS idempotency_keys (
+            session_id VARCHAR NOT NULL,
+            idempotency_key VARCHAR NOT NULL,
+            endpoint VARCHAR NOT NULL,
+            status_code INTEGER NOT NULL,
+            response JSON NOT NULL,
+            headers JSON,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (session_id, idempotency_key)
+        )
+    """)
+
 
 def close_connection() -> None:
     """Close the database connection."""
@@ -1,17 +1,31 @@
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+
+from app.config import get_settings
 
 from app.database import get_connection, close_connection
 from app.api.routes import student, internal
+from app.services import jobs
+from app.services import metrics
+from app.services import prefetch
+from app.services import transcript as transcript_service
+from app.services.http_client import close_http_client
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup: initialize database
     get_connection()
+    # Warm translation/TTS caches whenever a question is recorded
+    transcript_service.register_question_listener(prefetch.schedule_question_prefetch)
+    # Run queued background jobs, including any left over from the last run
+    jobs.start_workers()
     yield
-    # Shutdown: close database
+    # Shutdown: drain background jobs, then close pooled upstream connections and database
+    await jobs.stop_workers()
+    await close_http_client()
     close_connection()
 
 
@@ -31,6 +45,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request latency and in-flight metrics, per route template
+app.add_middleware(metrics.MetricsMiddleware)
+
 # Include routers
 app.include_router(student.router, prefix="/api/v1", tags=["Student"])
 app.include_router(internal.router, prefix="/internal", tags=["Internal"])
@@ -40,3 +57,11 @@ app.include_router(internal.router, prefix="/internal", tags=["Internal"])
 async def health_check():
     """Health check endpoint."""
     return {"status": "healthy", "service": "speak-up"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    """Prometheus metrics in the text exposition format."""
+    if not get_settings().metrics_enabled:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return PlainTextResponse(metrics.render_metrics(), media_type="text/plain; version=0.0.4")
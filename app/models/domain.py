@@ -39,6 +39,13 @@ class Severity(str, Enum):
     HIGH = "high"
 
 
+class JobStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
 # Domain Models
 
 class Teacher(BaseModel):
@@ -68,6 +75,7 @@ class Rubric(BaseModel):
     parsed_criteria: Optional[ParsedRubric] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: Optional[datetime] = None
+    content_hash: Optional[str] = None
 
 
 class Exam(BaseModel):
@@ -86,6 +94,12 @@ class CoverageMap(BaseModel):
     covered_criteria: dict[str, float] = Field(default_factory=dict)  # criterion_id -> coverage %
 
 
+class TranscriptSummary(BaseModel):
+    """Rolling summary of the start of a session's transcript."""
+    text: str = ""
+    entry_count: int = 0  # Number of leading transcript entries the summary covers
+
+
 class StudentSession(BaseModel):
     id: str
     exam_id: str
@@ -94,6 +108,8 @@ class StudentSession(BaseModel):
     status: SessionStatus = SessionStatus.ACTIVE
     rubric_coverage: CoverageMap = Field(default_factory=CoverageMap)
     skip_state: dict = Field(default_factory=dict)
+    language: str = "en"
+    transcript_summary: TranscriptSummary = Field(default_factory=TranscriptSummary)
     started_at: datetime = Field(default_factory=datetime.utcnow)
     ended_at: Optional[datetime] = None
 
@@ -140,3 +156,20 @@ class CompletionResult(BaseModel):
     is_complete: bool
     missing_criteria: list[str]
     coverage_summary: str
+
+
+class Job(BaseModel):
+    """A queued unit of background work."""
+    id: str
+    kind: str
+    queue: str = "default"
+    payload: dict = Field(default_factory=dict)
+    result: Optional[dict] = None
+    priority: int = 0
+    status: JobStatus = JobStatus.PENDING
+    attempts: int = 0
+    max_attempts: int = 3
+    job_key: Optional[str] = None
+    last_error: Optional[str] = None
+    run_after: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,176 @@
+"""
+Chunked Audio Upload Service
+
+Lets the browser upload an answer recording in segments while the student is
+still speaking. Each segment is transcribed as soon as it arrives, so when the
+student stops only the final segment is left to transcribe.
+
+Segments must be independently decodable audio files (e.g. the recorder is
+restarted for each segment) and are numbered from 0 in recording order.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+from fastapi import HTTPException
+
+from app.config import get_settings
+from app.services import stt as stt_service
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ChunkedUpload:
+    """In-progress segmented recording for one answer."""
+    session_id: str
+    upload_id: str
+    segments: dict[int, asyncio.Task] = field(default_factory=dict)
+    segment_bytes: dict[int, int] = field(default_factory=dict)
+    received_bytes: int = 0
+    updated_at: float = field(default_factory=time.monotonic)
+
+    def transcript_so_far(self) -> str:
+        """Join transcribed segments in order, stopping at the first unfinished one."""
+        parts = []
+        for seq in sorted(self.segments):
+            task = self.segments[seq]
+            if not task.done() or task.cancelled() or task.exception() is not None:
+                break
+            parts.append(task.result())
+        return _join(parts)
+
+
+# (session_id, upload_id) -> upload; single-process, like the rest of the app state
+_uploads: dict[tuple[str, str], ChunkedUpload] = {}
+
+
+def _join(parts: list[str]) -> str:
+    return " ".join(p for p in parts if p)
+
+
+def _failed(task: asyncio.Task) -> bool:
+    return task.done() and (task.cancelled() or task.exception() is not None)
+
+
+def _log_segment_failure(task: asyncio.Task) -> None:
+    # Retrieve the exception so abandoned uploads don't warn; finish() re-raises it
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Audio segment transcription failed: %s", task.exception())
+
+
+def _expire_stale_uploads() -> None:
+    ttl = get_settings().audio_upload_ttl_seconds
+    now = time.monotonic()
+    for key, upload in list(_uploads.items()):
+        if now - upload.updated_at > ttl:
+            discard_upload(*key)
+
+
+def add_segment(
+    session_id: str,
+    upload_id: str,
+    seq: int,
+    data: bytes,
+    filename: str = "segment.webm",
+    content_type: str = "audio/webm",
+) -> ChunkedUpload:
+    """
+    Accept one recorded segment and start transcribing it in the background.
+
+    Re-sending a segment that is pending or already transcribed is a no-op,
+    so client retries are safe; a segment whose transcription failed is retried.
+
+    Args:
+        session_id: Student session ID
+        upload_id: Client-chosen ID grouping the segments of one answer
+        seq: Segment number, starting at 0
+        data: Raw audio bytes of the segment
+        filename: File name reported to the STT provider
+        content_type: MIME type of the segment
+
+    Returns:
+        The updated ChunkedUpload
+
+    Raises:
+        HTTPException: If the segment number or total size is out of bounds
+    """
+    settings = get_settings()
+    _expire_stale_uploads()
+
+    if seq < 0 or seq >= settings.audio_upload_max_segments:
+        raise HTTPException(status_code=400, detail="Invalid segment number")
+
+    key = (session_id, upload_id)
+    upload = _uploads.get(key)
+    if upload is None:
+        upload = ChunkedUpload(session_id=session_id, upload_id=upload_id)
+        _uploads[key] = upload
+
+    existing = upload.segments.get(seq)
+    if existing is not None and not _failed(existing):
+        return upload
+
+    # A retried segment replaces the failed one's bytes rather than adding to them
+    received = upload.received_bytes - upload.segment_bytes.get(seq, 0) + len(data)
+    if received > settings.stt_max_upload_bytes:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Audio upload exceeds {settings.stt_max_upload_bytes} bytes",
+        )
+
+    upload.received_bytes = received
+    upload.segment_bytes[seq] = len(data)
+    upload.updated_at = time.monotonic()
+
+    # Silent segments come back empty without an STT call
+    task = asyncio.create_task(
+        stt_service.transcribe_bytes(data, filename=filename, content_type=content_type)
+    )
+    task.add_done_callback(_log_segment_failure)
+    upload.segments[seq] = task
+    return upload
+
+
+def get_upload(session_id: str, upload_id: str) -> Optional[ChunkedUpload]:
+    """Get an in-progress upload, if any."""
+    return _uploads.get((session_id, upload_id))
+
+
+async def finish_upload(session_id: str, upload_id: str) -> str:
+    """
+    Wait for all segments of an upload and return the full transcript.
+
+    The upload is discarded once the transcript is complete. When segments
+    are missing or one failed, it is kept so the client can send them again
+    and finish once more.
+
+    Raises:
+        HTTPException: If the upload is unknown, has gaps, or a segment failed
+    """
+    upload = _uploads.get((session_id, upload_id))
+    if upload is None or not upload.segments:
+        raise HTTPException(status_code=404, detail="Audio upload not found")
+
+    seqs = sorted(upload.segments)
+    if seqs != list(range(len(seqs))):
+        raise HTTPException(status_code=400, detail="Audio upload is missing segments")
+
+    upload.updated_at = time.monotonic()
+    # Shielded so a disconnecting client doesn't cancel segments it can finish later
+    parts = await asyncio.gather(*(asyncio.shield(upload.segments[seq]) for seq in seqs))
+    discard_upload(session_id, upload_id)
+    return _join(list(parts))
+
+
+def discard_upload(session_id: str, upload_id: str) -> None:
+    """Drop an upload and cancel any transcriptions still running."""
+    upload = _uploads.pop((session_id, upload_id), None)
+    if upload is None:
+        return
+    for task in upload.segments.values():
+        if not task.done():
+            task.cancel()
@@ -0,0 +1,207 @@
+"""
+Audio Preprocessing Service
+
+Shrinks WAV answer recordings before they are sent to speech-to-text:
+downmix to mono, trim leading/trailing silence by frame energy, and resample
+to a speech-appropriate rate. Near-silent recordings are flagged so callers
+can skip STT entirely.
+
+Formats other than PCM WAV (e.g. browser webm/opus) are passed through unchanged.
+"""
+
+import io
+import wave
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from app.config import get_settings
+
+FRAME_MS = 20
+PAD_MS = 150
+LOWPASS_TAPS = 63
+
+WAV_CONTENT_TYPES = {"audio/wav", "audio/x-wav", "audio/wave", "audio/vnd.wave"}
+WAV_EXTENSIONS = (".wav", ".wave")
+
+
+def looks_like_wav(filename: Optional[str], content_type: Optional[str]) -> bool:
+    """Guess from upload metadata whether buffering for preprocessing is worthwhile."""
+    if content_type and content_type.split(";")[0].strip().lower() in WAV_CONTENT_TYPES:
+        return True
+    return bool(filename) and filename.lower().endswith(WAV_EXTENSIONS)
+
+
+@dataclass
+class PreprocessedAudio:
+    """Result of preprocessing an uploaded recording."""
+    data: bytes
+    content_type: str
+    is_silent: bool
+    original_bytes: int
+    duration_seconds: Optional[float] = None
+    speech_seconds: Optional[float] = None
+
+
+def is_wav(data: bytes) -> bool:
+    """Check for a RIFF/WAVE header (the client's content type is not trusted)."""
+    return len(data) >= 12 and data[:4] == b"RIFF" and data[8:12] == b"WAVE"
+
+
+def decode_wav(data: bytes) -> Optional[tuple[np.ndarray, int]]:
+    """
+    Decode PCM WAV bytes into float32 samples in [-1, 1].
+
+    Returns:
+        Tuple of (samples shaped (frames, channels), sample rate), or None if
+        the data is not PCM WAV that the stdlib reader understands.
+    """
+    try:
+        with wave.open(io.BytesIO(data), "rb") as wav:
+            channels = wav.getnchannels()
+            width = wav.getsampwidth()
+            rate = wav.getframerate()
+            raw = wav.readframes(wav.getnframes())
+    except (wave.Error, EOFError):
+        return None
+
+    if width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif width == 2:
+        samples = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+    elif width == 4:
+        samples = np.frombuffer(raw, dtype="<i4").astype(np.float32) / 2147483648.0
+    else:
+        return None
+
+    usable = len(samples) - len(samples) % channels
+    return samples[:usable].reshape(-1, channels), rate
+
+
+def encode_wav(mono: np.ndarray, rate: int) -> bytes:
+    """Encode mono float samples as 16-bit PCM WAV."""
+    pcm = (np.clip(mono, -1.0, 1.0) * 32767.0).astype("<i2")
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+def downmix(samples: np.ndarray) -> np.ndarray:
+    """Average all channels into one."""
+    if samples.shape[1] == 1:
+        return samples[:, 0]
+    return samples.mean(axis=1)
+
+
+def frame_energy_db(mono: np.ndarray, rate: int, frame_ms: int = FRAME_MS) -> np.ndarray:
+    """RMS level of consecutive frames, in dBFS."""
+    frame_len = max(1, rate * frame_ms // 1000)
+    frames = len(mono) // frame_len
+    if frames == 0:
+        return np.array([], dtype=np.float32)
+
+    blocks = mono[: frames * frame_len].reshape(frames, frame_len)
+    rms = np.sqrt(np.mean(blocks * blocks, axis=1))
+    return 20.0 * np.log10(np.maximum(rms, 1e-10))
+
+
+def trim_silence(
+    mono: np.ndarray,
+    rate: int,
+    threshold_db: float,
+) -> tuple[np.ndarray, float]:
+    """
+    Remove leading and trailing frames quieter than the threshold.
+
+    Returns:
+        Tuple of (trimmed samples with a little padding kept, seconds of speech frames)
+    """
+    levels = frame_energy_db(mono, rate)
+    voiced = np.flatnonzero(levels > threshold_db)
+    if len(voiced) == 0:
+        return mono[:0], 0.0
+
+    frame_len = max(1, rate * FRAME_MS // 1000)
+    pad = rate * PAD_MS // 1000
+    start = max(0, voiced[0] * frame_len - pad)
+    end = min(len(mono), (voiced[-1] + 1) * frame_len + pad)
+    speech_seconds = len(voiced) * frame_len / rate
+    return mono[start:end], speech_seconds
+
+
+def resample(mono: np.ndarray, rate: int, target_rate: int) -> np.ndarray:
+    """Resample with a windowed-sinc low-pass (when downsampling) and linear interpolation."""
+    if rate == target_rate or len(mono) == 0:
+        return mono
+
+    if target_rate < rate:
+        cutoff = 0.5 * target_rate / rate  # cycles per input sample
+        n = np.arange(LOWPASS_TAPS) - (LOWPASS_TAPS - 1) / 2
+        taps = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(LOWPASS_TAPS)
+        taps /= taps.sum()
+        mono = np.convolve(mono, taps.astype(np.float32), mode="same")
+
+    out_len = int(round(len(mono) * target_rate / rate))
+    positions = np.arange(out_len) * (rate / target_rate)
+    return np.interp(positions, np.arange(len(mono)), mono).astype(np.float32)
+
+
+def preprocess_audio(data: bytes, content_type: Optional[str] = None) -> PreprocessedAudio:
+    """
+    Prepare a recording for speech-to-text.
+
+    Args:
+        data: Uploaded audio bytes
+        content_type: MIME type reported by the client
+
+    Returns:
+        PreprocessedAudio with the bytes to forward and whether it is near-silent
+    """
+    content_type = content_type or "application/octet-stream"
+    passthrough = PreprocessedAudio(
+        data=data,
+        content_type=content_type,
+        is_silent=False,
+        original_bytes=len(data),
+    )
+
+    if not is_wav(data):
+        return passthrough
+
+    decoded = decode_wav(data)
+    if decoded is None:
+        return passthrough
+
+    settings = get_settings()
+    samples, rate = decoded
+    duration = len(samples) / rate if rate else 0.0
+
+    mono = downmix(samples)
+    trimmed, speech_seconds = trim_silence(mono, rate, settings.audio_silence_threshold_db)
+
+    if speech_seconds * 1000 < settings.audio_min_speech_ms:
+        return PreprocessedAudio(
+            data=b"",
+            content_type="audio/wav",
+            is_silent=True,
+            original_bytes=len(data),
+            duration_seconds=duration,
+            speech_seconds=speech_seconds,
+        )
+
+    target_rate = min(rate, settings.audio_target_sample_rate)
+    processed = resample(trimmed, rate, target_rate)
+
+    return PreprocessedAudio(
+        data=encode_wav(processed, target_rate),
+        content_type="audio/wav",
+        is_silent=False,
+        original_bytes=len(data),
+        duration_seconds=duration,
+        speech_seconds=speech_seconds,
+    )
@@ -10,6 +10,7 @@ from uuid_extensions import uuid7
 from app.config import get_settings
 from app.database import get_db
 from app.models.domain import Teacher
+from app.services.metrics import timed_db
 
 security = HTTPBearer()
 
@@ -46,6 +47,7 @@ def decode_token(token: str) -> Optional[str]:
         return None
 
 
+@timed_db
 async def get_current_teacher(
     credentials: HTTPAuthorizationCredentials = Security(security)
 ) -> str:
@@ -72,6 +74,7 @@ async def get_current_teacher(
     return teacher_id
 
 
+@timed_db
 def register_teacher(username: str, password: str, display_name: Optional[str] = None) -> Teacher:
     """
     Register a new teacher.
@@ -117,6 +120,7 @@ def register_teacher(username: str, password: str, display_name: Optional[str] =
         )
 
 
+@timed_db
 def login_teacher(username: str, password: str) -> tuple[Teacher, str]:
     """
     Authenticate a teacher and return their data with a token.
@@ -160,6 +164,7 @@ def login_teacher(username: str, password: str) -> tuple[Teacher, str]:
         return teacher, token
 
 
+@timed_db
 def get_teacher_by_id(teacher_id: str) -> Optional[Teacher]:
     """Get a teacher by their ID."""
     with get_db() as conn:
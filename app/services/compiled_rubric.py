@@ -0,0 +1,106 @@
+"""
+Compiled Rubric
+
+Everything the per-answer pipeline derives from a ParsedRubric, computed once
+per rubric version: criterion lookup, point weights, pre-rendered prompt
+lines and blocks, the stable prompt prefix, and the relevance index.
+
+Compiled rubrics are cached by rubric_service.get_compiled_rubric.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+
+from app.models.domain import CoverageMap, Criterion, ParsedRubric, Rubric
+from app.services.relevance import CriteriaIndex
+
+
+@dataclass(frozen=True)
+class CompiledRubric:
+    """Immutable, pre-rendered view of one version of a parsed rubric."""
+    rubric_id: str
+    title: str
+    version: Optional[datetime]
+    parsed: ParsedRubric
+    by_id: dict[str, Criterion]
+    # Share of the rubric's points per criterion (uniform when points are missing)
+    weights: dict[str, float]
+    # "- id: name - description", as listed for coverage analysis
+    coverage_lines: dict[str, str]
+    # "- name: description", as listed for question generation
+    question_lines: dict[str, str]
+    # "- id: name", prefix of the completion status lines
+    status_labels: dict[str, str]
+    # All criteria for question generation
+    question_block: str
+    # Stable rubric description that can open every prompt for this rubric
+    prompt_prefix: str
+    index: CriteriaIndex = field(repr=False)
+
+    @property
+    def criteria(self) -> list[Criterion]:
+        return self.parsed.criteria
+
+    def coverage_block(self, criteria: list[Criterion]) -> str:
+        """Criteria listing for coverage analysis."""
+        return "\n".join(self.coverage_lines[c.id] for c in criteria)
+
+    def targets_block(self, criteria: list[Criterion], coverage: CoverageMap) -> str:
+        """Target criteria with their current coverage, for question generation."""
+        return "\n".join(
+            f"{self.question_lines[c.id]} (coverage: {coverage.covered_criteria.get(c.id, 0)*100:.0f}%)"
+            for c in criteria
+        )
+
+    def status_block(self, criteria: list[Criterion], coverage: CoverageMap) -> str:
+        """Coverage status lines for the completion check."""
+        return "\n".join(
+            f"{self.status_labels[c.id]} (covered: {coverage.covered_criteria.get(c.id, 0)*100:.0f}%)"
+            for c in criteria
+        )
+
+
+def compile_rubric(rubric: Rubric) -> CompiledRubric:
+    """
+    Compile a rubric with parsed criteria.
+
+    Args:
+        rubric: Rubric whose parsed_criteria is set
+
+    Returns:
+        CompiledRubric for the rubric's current version
+    """
+    parsed = rubric.parsed_criteria
+    if parsed is None:
+        raise ValueError("Rubric not parsed")
+
+    criteria = parsed.criteria
+    total_points = sum(c.points or 0 for c in criteria)
+    if total_points > 0:
+        weights = {c.id: (c.points or 0) / total_points for c in criteria}
+    else:
+        weights = {c.id: 1 / len(criteria) for c in criteria} if criteria else {}
+
+    question_lines = {c.id: f"- {c.name}: {c.description}" for c in criteria}
+
+    listing = "\n".join(
+        f"- {c.id}: {c.name}" + (f" ({c.points:g} points)" if c.points else "") + f" - {c.description}"
+        for c in criteria
+    )
+    prompt_prefix = f"EXAM RUBRIC: {rubric.title}\n\nRUBRIC CRITERIA:\n{listing}"
+
+    return CompiledRubric(
+        rubric_id=rubric.id,
+        title=rubric.title,
+        version=rubric.updated_at or rubric.created_at,
+        parsed=parsed,
+        by_id={c.id: c for c in criteria},
+        weights=weights,
+        coverage_lines={c.id: f"- {c.id}: {c.name} - {c.description}" for c in criteria},
+        question_lines=question_lines,
+        status_labels={c.id: f"- {c.id}: {c.name}" for c in criteria},
+        question_block="\n".join(question_lines[c.id] for c in criteria),
+        prompt_prefix=prompt_prefix,
+        index=CriteriaIndex(criteria),
+    )
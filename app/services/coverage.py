@@ -5,6 +5,7 @@ Focused solely on evaluating rubric criteria coverage.
 Separate from struggle detection to ensure clean separation of concerns.
 """
 
+import logging
 from typing import Optional
 from uuid_extensions import uuid7
 
@@ -18,7 +19,16 @@ from app.models.domain import (
     TranscriptEntry,
 )
 from app.config import get_settings
+from app.services.compiled_rubric import CompiledRubric
+from app.services import jobs
+from app.services import relevance as relevance_service
+from app.services import rubric as rubric_service
+from app.services import rubric_parser
 from app.services.llm_client import get_llm_client
+from app.services.metrics import timed_db
+from app.services.prompt_budget import truncate_to_tokens
+
+logger = logging.getLogger(__name__)
 
 
 PARSE_RUBRIC_SYSTEM_PROMPT = """You are an expert at analyzing educational rubrics and extracting structured criteria.
@@ -104,16 +114,89 @@ Return your response as valid JSON with this structure:
 """
 
 
-async def parse_rubric(rubric_text: str) -> ParsedRubric:
+def parse_rubric_locally(rubric_text: str) -> Optional[ParsedRubric]:
+    """
+    Parse a well-structured markdown rubric without the LLM.
+
+    Args:
+        rubric_text: Raw markdown rubric content
+
+    Returns:
+        ParsedRubric if the local parser is confident enough, None otherwise
+    """
+    settings = get_settings()
+    if not settings.rubric_local_parser_enabled:
+        return None
+
+    result = rubric_parser.parse_rubric_markdown(rubric_text)
+    if result is None or result.confidence < settings.rubric_local_parse_min_confidence:
+        logger.info(
+            "Rubric structure not recognized locally (confidence %.2f)",
+            result.confidence if result else 0.0,
+        )
+        return None
+
+    logger.info(
+        "Rubric parsed locally from %s: %d criteria (confidence %.2f)",
+        result.layout, len(result.parsed.criteria), result.confidence,
+    )
+    return result.parsed
+
+
+def parse_rubric_offline(rubric_text: str) -> Optional[ParsedRubric]:
+    """
+    Parse a rubric from the stored parse results or the local parser only.
+
+    Args:
+        rubric_text: Raw markdown rubric content
+
+    Returns:
+        ParsedRubric, or None if the content would need the LLM
+    """
+    content_hash = rubric_service.rubric_content_hash(rubric_text)
+    cached = rubric_service.get_parse_artifact(content_hash)
+    if cached is not None:
+        return cached
+
+    parsed = parse_rubric_locally(rubric_text)
+    if parsed is not None:
+        rubric_service.save_parse_artifact(content_hash, parsed, source="local")
+    return parsed
+
+
+async def parse_rubric(rubric_text: str, use_cache: bool = True) -> ParsedRubric:
     """
     Parse a markdown rubric into structured criteria.
 
+    Results are stored by normalized content hash and parser version, so
+    identical content is only ever parsed once. Recognized layouts are parsed
+    locally; anything else goes to the LLM.
+
     Args:
         rubric_text: Raw markdown rubric content
+        use_cache: Reuse a stored result for identical content
 
     Returns:
         ParsedRubric with extracted criteria
     """
+    content_hash = rubric_service.rubric_content_hash(rubric_text)
+    if use_cache:
+        cached = rubric_service.get_parse_artifact(content_hash)
+        if cached is not None:
+            return cached
+
+    parsed = parse_rubric_locally(rubric_text)
+    if parsed is not None:
+        rubric_service.save_parse_artifact(content_hash, parsed, source="local")
+        return parsed
+
+    parsed = await _parse_rubric_with_llm(rubric_text)
+    if parsed.criteria:
+        rubric_service.save_parse_artifact(content_hash, parsed, source="llm")
+    return parsed
+
+
+async def _parse_rubric_with_llm(rubric_text: str) -> ParsedRubric:
     client = get_llm_client()
 
     prompt = f"""Please parse the following rubric and extract all assessment criteria:
@@ -128,6 +211,7 @@ Extract the criteria as JSON."""
         prompt=prompt,
         system_prompt=PARSE_RUBRIC_SYSTEM_PROMPT,
         temperature=0.2,
+        call_site="parse_rubric",
     )
 
     criteria = [
@@ -185,6 +269,7 @@ Create a comprehensive rubric with assessment criteria, descriptions, and point
         system_prompt=GENERATE_RUBRIC_SYSTEM_PROMPT,
         temperature=0.7,
         max_tokens=2048,
+        call_site="generate_rubric",
     )
 
     if not isinstance(content, str):
@@ -197,37 +282,70 @@ Create a comprehensive rubric with assessment criteria, descriptions, and point
     return cleaned_content
 
 
-async def analyze_coverage(
+def select_coverage_criteria(
     response: str,
     question: str,
     rubric: ParsedRubric,
-    current_coverage: CoverageMap,
-) -> CoverageResult:
+    target_criteria: Optional[list[str]] = None,
+    compiled: Optional[CompiledRubric] = None,
+) -> list[Criterion]:
     """
-    Analyze which rubric criteria a student response addresses.
+    Choose which criteria a response is checked against.
 
-    Args:
-        response: Student's response text
-        question: The question that was asked
-        rubric: Parsed rubric with criteria
-        current_coverage: Current coverage state
+    Keeps the top-k criteria by lexical relevance to the question and response
+    plus the question's target criteria; see relevance.select_relevant_criteria.
+    The compiled rubric's index is used; without one, an index is built for
+    this call only.
+    """
+    index = compiled.index if compiled else relevance_service.CriteriaIndex(rubric.criteria)
+    return relevance_service.select_relevant_criteria(
+        rubric,
+        index,
+        f"{question}\n{response}",
+        k=get_settings().coverage_top_k,
+        always_include=target_criteria,
+    )
 
-    Returns:
-        CoverageResult with updated coverage information
+
+def build_coverage_prompt(
+    response: str,
+    question: str,
+    criteria: list[Criterion],
+    current_coverage: CoverageMap,
+    compiled: Optional[CompiledRubric] = None,
+) -> str:
     """
-    client = get_llm_client()
+    Build the coverage analysis prompt for the given criteria.
 
-    criteria_text = "\n".join([
-        f"- {c.id}: {c.name} - {c.description}"
-        for c in rubric.criteria
-    ])
+    With a compiled rubric the full criteria listing travels in the cached
+    prompt prefix, so the prompt only names the criteria to evaluate.
+    """
+    if compiled is not None:
+        criteria_header = "CRITERIA TO EVALUATE (described in the rubric above):"
+        criteria_text = "\n".join(compiled.status_labels[c.id] for c in criteria)
+    else:
+        criteria_header = "RUBRIC CRITERIA:"
+        criteria_text = "\n".join([
+            f"- {c.id}: {c.name} - {c.description}"
+            for c in criteria
+        ])
+
+    response = truncate_to_tokens(response, get_settings().prompt_response_max_tokens)
 
+    criterion_ids = {c.id for c in criteria}
     current_coverage_text = "\n".join([
         f"- {cid}: {pct*100:.0f}% covered"
         for cid, pct in current_coverage.covered_criteria.items()
+        if cid in criterion_ids
     ]) or "No criteria covered yet"
 
-    prompt = f"""Analyze the following student response for rubric coverage:
+    return f"""Analyze the following student response for rubric coverage:
+
+{criteria_header}
+{criteria_text}
+
+CURRENT COVERAGE STATUS:
+{current_coverage_text}
 
 QUESTION:
 {question}
@@ -235,18 +353,45 @@ QUESTION:
 STUDENT RESPONSE:
 {response}
 
-RUBRIC CRITERIA:
-{criteria_text}
+Determine which criteria this response addresses and to what degree."""
 
-CURRENT COVERAGE STATUS:
-{current_coverage_text}
 
-Determine which criteria this response addresses and to what degree."""
+async def analyze_coverage(
+    response: str,
+    question: str,
+    rubric: ParsedRubric,
+    current_coverage: CoverageMap,
+    target_criteria: Optional[list[str]] = None,
+    compiled: Optional[CompiledRubric] = None,
+) -> CoverageResult:
+    """
+    Analyze which rubric criteria a student response addresses.
+
+    Only the criteria most relevant to the response, plus the question's
+    target criteria, are sent to the LLM.
+
+    Args:
+        response: Student's response text
+        question: The question that was asked
+        rubric: Parsed rubric with criteria
+        current_coverage: Current coverage state
+        target_criteria: Criterion IDs the question was aimed at
+        compiled: Compiled form of the rubric, to reuse its index and rendered lines
+
+    Returns:
+        CoverageResult with updated coverage information
+    """
+    client = get_llm_client()
+
+    criteria = select_coverage_criteria(response, question, rubric, target_criteria, compiled)
+    prompt = build_coverage_prompt(response, question, criteria, current_coverage, compiled)
 
     result = await client.complete_json(
         prompt=prompt,
         system_prompt=ANALYZE_COVERAGE_SYSTEM_PROMPT,
         temperature=0.3,
+        cached_prefix=compiled.prompt_prefix if compiled else None,
+        call_site="coverage",
     )
 
     # Build updated coverage map
@@ -274,9 +419,23 @@ Determine which criteria this response addresses and to what degree."""
     )
 
 
+def _status_block(
+    criteria: list[Criterion],
+    coverage: CoverageMap,
+    compiled: Optional[CompiledRubric],
+) -> str:
+    if compiled is not None:
+        return compiled.status_block(criteria, coverage)
+    return "\n".join([
+        f"- {c.id}: {c.name} (covered: {coverage.covered_criteria.get(c.id, 0)*100:.0f}%)"
+        for c in criteria
+    ])
+
+
 async def check_completion(
     rubric: ParsedRubric,
     coverage: CoverageMap,
+    compiled: Optional[CompiledRubric] = None,
 ) -> CompletionResult:
     """
     Determine if the exam should end based on rubric coverage.
@@ -284,16 +443,14 @@ async def check_completion(
     Args:
         rubric: Parsed rubric with criteria
         coverage: Current coverage state
+        compiled: Compiled form of the rubric, to reuse its rendered lines
 
     Returns:
         CompletionResult indicating if exam is complete
     """
     client = get_llm_client()
 
-    criteria_text = "\n".join([
-        f"- {c.id}: {c.name} (covered: {coverage.covered_criteria.get(c.id, 0)*100:.0f}%)"
-        for c in rubric.criteria
-    ])
+    criteria_text = _status_block(rubric.criteria, coverage, compiled)
 
     prompt = f"""Evaluate if this oral exam should be considered complete:
 
@@ -306,6 +463,8 @@ Determine if the student has sufficiently covered all criteria."""
         prompt=prompt,
         system_prompt=CHECK_COMPLETION_SYSTEM_PROMPT,
         temperature=0.2,
+        cached_prefix=compiled.prompt_prefix if compiled else None,
+        call_site="completion",
     )
 
     return CompletionResult(
@@ -315,10 +474,69 @@ Determine if the student has sufficiently covered all criteria."""
     )
 
 
+# Local completion verdicts: every active criterion at this coverage is
+# complete; active criteria weighted by points below this average are not
+COMPLETE_COVERAGE = 0.7
+INCOMPLETE_WEIGHTED_COVERAGE = 0.5
+
+
+def local_completion_verdict(
+    rubric: ParsedRubric,
+    coverage: CoverageMap,
+    excluded_criteria: Optional[list[str]] = None,
+    compiled: Optional[CompiledRubric] = None,
+) -> Optional[CompletionResult]:
+    """
+    Decide clear-cut completion cases without the LLM.
+
+    Args:
+        rubric: Parsed rubric with criteria
+        coverage: Current coverage state
+        excluded_criteria: Criterion IDs that don't count (skipped by student)
+        compiled: Compiled form of the rubric, for its point weights
+
+    Returns:
+        CompletionResult, or None when the LLM should decide
+    """
+    excluded = set(excluded_criteria or [])
+    active = [c for c in rubric.criteria if c.id not in excluded]
+    if not active:
+        return CompletionResult(
+            is_complete=True,
+            missing_criteria=[],
+            coverage_summary="All remaining criteria have been skipped - exam complete",
+        )
+
+    covered = {c.id: min(coverage.covered_criteria.get(c.id, 0.0), 1.0) for c in active}
+    missing = [cid for cid, pct in covered.items() if pct < COMPLETE_COVERAGE]
+    if not missing:
+        return CompletionResult(
+            is_complete=True,
+            missing_criteria=[],
+            coverage_summary=f"All active criteria are at least {COMPLETE_COVERAGE:.0%} covered",
+        )
+
+    if compiled is not None:
+        weights = {c.id: compiled.weights.get(c.id, 0.0) for c in active}
+    else:
+        weights = {c.id: 1.0 for c in active}
+    total_weight = sum(weights.values()) or float(len(active))
+    weighted = sum(weights.get(cid, 1.0) * pct for cid, pct in covered.items()) / total_weight
+    if weighted < INCOMPLETE_WEIGHTED_COVERAGE:
+        return CompletionResult(
+            is_complete=False,
+            missing_criteria=missing,
+            coverage_summary=f"Active criteria are {weighted:.0%} covered overall",
+        )
+
+    return None
+
+
 async def check_completion_with_exclusions(
     rubric: ParsedRubric,
     coverage: CoverageMap,
     excluded_criteria: list[str],
+    compiled: Optional[CompiledRubric] = None,
 ) -> CompletionResult:
     """
     Determine if the exam should end based on rubric coverage, excluding skipped criteria.
@@ -330,6 +548,7 @@ async def check_completion_with_exclusions(
         rubric: Parsed rubric with criteria
         coverage: Current coverage state
         excluded_criteria: List of criterion IDs to exclude (skipped by student)
+        compiled: Compiled form of the rubric, to reuse its rendered lines
 
     Returns:
         CompletionResult indicating if exam is complete
@@ -347,10 +566,7 @@ async def check_completion_with_exclusions(
 
     client = get_llm_client()
 
-    criteria_text = "\n".join([
-        f"- {c.id}: {c.name} (covered: {coverage.covered_criteria.get(c.id, 0)*100:.0f}%)"
-        for c in active_criteria
-    ])
+    criteria_text = _status_block(active_criteria, coverage, compiled)
 
     excluded_text = ", ".join(excluded_criteria) if excluded_criteria else "None"
 
@@ -369,6 +585,8 @@ Note: Skipped criteria should not block completion."""
         prompt=prompt,
         system_prompt=CHECK_COMPLETION_SYSTEM_PROMPT,
         temperature=0.2,
+        cached_prefix=compiled.prompt_prefix if compiled else None,
+        call_site="completion",
     )
 
     return CompletionResult(
@@ -378,6 +596,7 @@ Note: Skipped criteria should not block completion."""
     )
 
 
+@timed_db
 def create_coverage_analysis(
     transcript_entry_id: str,
     criteria_covered: list[str],
@@ -428,3 +647,43 @@ def create_coverage_analysis(
         total_coverage_pct=total_coverage_pct,
         timestamp=timestamp,
     )
+
+
+COVERAGE_ANALYSIS_JOB = "coverage_analysis"
+
+
+def enqueue_coverage_analysis(
+    transcript_entry_id: str,
+    criteria_covered: list[str],
+    coverage_reasoning: str,
+    total_coverage_pct: float,
+) -> str:
+    """
+    Queue a coverage analysis record to be stored off the response path.
+
+    Args:
+        transcript_entry_id: ID of the transcript entry analyzed
+        criteria_covered: List of criterion IDs covered
+        coverage_reasoning: LLM's reasoning
+        total_coverage_pct: Total coverage percentage
+
+    Returns:
+        Job ID
+    """
+    return jobs.enqueue(
+        COVERAGE_ANALYSIS_JOB,
+        {
+            "transcript_entry_id": transcript_entry_id,
+            "criteria_covered": criteria_covered,
+            "coverage_reasoning": coverage_reasoning,
+            "total_coverage_pct": total_coverage_pct,
+        },
+        job_key=f"{COVERAGE_ANALYSIS_JOB}:{transcript_entry_id}",
+    )
+
+
+async def _coverage_analysis_job(payload: dict) -> None:
+    create_coverage_analysis(**payload)
+
+
+jobs.register_handler(COVERAGE_ANALYSIS_JOB, _coverage_analysis_job)
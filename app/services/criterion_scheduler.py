@@ -0,0 +1,199 @@
+"""
+Criterion Scheduler
+
+Per-session priority queue that decides which rubric criteria the next
+question targets. A criterion's priority is its coverage deficit times its
+share of the rubric's points, reduced for a few turns after it was targeted
+so questions move around the rubric.
+
+The heap is updated incrementally: only criteria whose coverage changed, or
+whose recency penalty starts or ends, are re-pushed (stale heap entries are
+skipped lazily), so picking targets never rescans the whole rubric.
+
+Schedulers are kept in a bounded in-memory LRU per session and rebuilt from
+the session's coverage and skip_state when missing.
+"""
+
+import heapq
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional
+
+from app.config import get_settings
+from app.models.domain import CoverageMap, Criterion, StudentSession
+from app.services.compiled_rubric import CompiledRubric
+
+# Coverage at which a criterion no longer needs targeting (unless nothing else is left)
+SATISFIED_COVERAGE = 0.7
+
+# skip_state keys persisting the recency state across restarts
+TURN_KEY = "target_turn"
+LAST_TARGETED_KEY = "last_targeted"
+
+_schedulers: "OrderedDict[str, CriterionScheduler]" = OrderedDict()
+_schedulers_lock = Lock()
+
+
+class CriterionScheduler:
+    """Max-heap of criteria keyed by weighted coverage deficit."""
+
+    def __init__(
+        self,
+        compiled: CompiledRubric,
+        coverage: CoverageMap,
+        turn: int = 0,
+        last_targeted: Optional[dict[str, int]] = None,
+    ):
+        settings = get_settings()
+        self.compiled = compiled
+        self.recency_penalty = settings.target_recency_penalty
+        self.recency_window = settings.target_recency_window
+        self.turn = turn
+        self.last_targeted = {
+            cid: t for cid, t in (last_targeted or {}).items() if cid in compiled.by_id
+        }
+        self._order = {c.id: i for i, c in enumerate(compiled.criteria)}
+        self._coverage: dict[str, float] = {}
+        self._version: dict[str, int] = {}
+        self._heap: list[tuple[bool, float, int, str, int]] = []
+        for criterion in compiled.criteria:
+            self._coverage[criterion.id] = coverage.covered_criteria.get(criterion.id, 0.0)
+            self._push(criterion.id)
+
+    def _recent(self, cid: str) -> bool:
+        last = self.last_targeted.get(cid)
+        return last is not None and self.turn - last < self.recency_window
+
+    def priority(self, cid: str) -> float:
+        """Coverage deficit x points weight, reduced while recently targeted."""
+        deficit = max(0.0, 1.0 - self._coverage[cid])
+        priority = deficit * self.compiled.weights.get(cid, 0.0)
+        if self._recent(cid):
+            priority *= 1.0 - self.recency_penalty
+        return priority
+
+    def _push(self, cid: str) -> None:
+        version = self._version.get(cid, 0) + 1
+        self._version[cid] = version
+        satisfied = self._coverage[cid] >= SATISFIED_COVERAGE
+        # Unsatisfied criteria first, then highest priority, then rubric order
+        heapq.heappush(self._heap, (satisfied, -self.priority(cid), self._order[cid], cid, version))
+        if len(self._heap) > 4 * len(self._order) + 16:
+            self._compact()
+
+    def _compact(self) -> None:
+        self._heap = [e for e in self._heap if self._version[e[3]] == e[4]]
+        heapq.heapify(self._heap)
+
+    def update_coverage(self, coverage: CoverageMap) -> None:
+        """
+        Apply coverage changes, re-prioritizing only the criteria that changed.
+
+        Args:
+            coverage: The session's current coverage
+        """
+        for cid, pct in coverage.covered_criteria.items():
+            if cid in self._coverage and self._coverage[cid] != pct:
+                self._coverage[cid] = pct
+                self._push(cid)
+
+    def mark_targeted(self, criterion_ids: list[str]) -> None:
+        """
+        Record that a new question targets these criteria and advance the turn.
+
+        Args:
+            criterion_ids: Criteria the new question targets
+        """
+        self.turn += 1
+        # Criteria whose penalty expires this turn regain their full priority
+        expired = [
+            cid for cid, last in self.last_targeted.items()
+            if self.turn - last >= self.recency_window and cid not in criterion_ids
+        ]
+        for cid in criterion_ids:
+            if cid in self._order:
+                self.last_targeted[cid] = self.turn
+                self._push(cid)
+        for cid in expired:
+            del self.last_targeted[cid]
+            self._push(cid)
+
+    def top_k(self, k: int, exclude: Optional[list[str]] = None) -> list[Criterion]:
+        """
+        The k criteria most in need of a question.
+
+        Criteria at or above SATISFIED_COVERAGE are only returned when every
+        remaining criterion is satisfied.
+
+        Args:
+            k: Number of criteria to return
+            exclude: Criterion IDs to leave out (e.g. skipped criteria)
+
+        Returns:
+            Criteria in priority order (ties broken by rubric order)
+        """
+        excluded = set(exclude or [])
+        popped: list[tuple[bool, float, int, str, int]] = []
+        selected: list[Criterion] = []
+        any_unsatisfied = False
+
+        while self._heap and len(selected) < k:
+            entry = heapq.heappop(self._heap)
+            satisfied, _, _, cid, version = entry
+            if self._version[cid] != version:
+                continue  # Stale entry, superseded by a later push
+            popped.append(entry)
+            if cid in excluded:
+                continue
+            if satisfied and any_unsatisfied:
+                break
+            any_unsatisfied = any_unsatisfied or not satisfied
+            selected.append(self.compiled.by_id[cid])
+
+        for entry in popped:
+            heapq.heappush(self._heap, entry)
+
+        if not any_unsatisfied and selected:
+            # Everything is satisfied: fall back to the available criteria in rubric order
+            selected = [c for c in self.compiled.criteria if c.id not in excluded][:k]
+        return selected
+
+    def recency_state(self) -> dict:
+        """The recency state to persist in skip_state."""
+        return {TURN_KEY: self.turn, LAST_TARGETED_KEY: dict(self.last_targeted)}
+
+
+def get_session_scheduler(session: StudentSession, compiled: CompiledRubric) -> CriterionScheduler:
+    """
+    Get a session's scheduler, synced with the session's current coverage.
+
+    Args:
+        session: The student session
+        compiled: Compiled rubric of the session's exam
+
+    Returns:
+        The session's CriterionScheduler
+    """
+    with _schedulers_lock:
+        scheduler = _schedulers.get(session.id)
+        if scheduler is not None and scheduler.compiled is compiled:
+            _schedulers.move_to_end(session.id)
+            scheduler.update_coverage(session.rubric_coverage)
+            return scheduler
+
+        scheduler = CriterionScheduler(
+            compiled,
+            session.rubric_coverage,
+            turn=session.skip_state.get(TURN_KEY, 0),
+            last_targeted=session.skip_state.get(LAST_TARGETED_KEY),
+        )
+        _schedulers[session.id] = scheduler
+        while len(_schedulers) > get_settings().criterion_scheduler_cache_size:
+            _schedulers.popitem(last=False)
+        return scheduler
+
+
+def drop_session_scheduler(session_id: str) -> None:
+    """Forget a session's scheduler (e.g. when the session ends)."""
+    with _schedulers_lock:
+        _schedulers.pop(session_id, None)
@@ -20,9 +20,12 @@ from app.models.domain import (
     StudentSession,
     SessionStatus,
     CoverageMap,
+    TranscriptSummary,
 )
+from app.services.metrics import timed_db
 
 
+@timed_db
 def generate_room_code() -> str:
     """Generate a unique room code for an exam."""
     settings = get_settings()
@@ -42,6 +45,7 @@ def generate_room_code() -> str:
                 return code
 
 
+@timed_db
 def create_exam(teacher_id: str, rubric_id: str) -> Exam:
     """
     Create a new exam and generate its room code.
@@ -78,6 +82,7 @@ def create_exam(teacher_id: str, rubric_id: str) -> Exam:
     )
 
 
+@timed_db
 def get_exam(exam_id: str, teacher_id: Optional[str] = None) -> Optional[Exam]:
     """Get an exam by ID."""
     with get_db() as conn:
@@ -108,6 +113,7 @@ def get_exam(exam_id: str, teacher_id: Optional[str] = None) -> Optional[Exam]:
         )
 
 
+@timed_db
 def get_exam_by_room_code(room_code: str) -> Optional[Exam]:
     """Get an active exam by room code."""
     with get_db() as conn:
@@ -134,6 +140,7 @@ def get_exam_by_room_code(room_code: str) -> Optional[Exam]:
         )
 
 
+@timed_db
 def list_exams(teacher_id: str, status: Optional[ExamStatus] = None) -> list[Exam]:
     """List all exams for a teacher."""
     with get_db() as conn:
@@ -172,6 +179,7 @@ def get_active_exam(teacher_id: str) -> Optional[Exam]:
     return exams[0] if exams else None
 
 
+@timed_db
 def end_exam(exam_id: str, teacher_id: str) -> bool:
     """
     End an active exam.
@@ -194,6 +202,7 @@ def end_exam(exam_id: str, teacher_id: str) -> bool:
         return result.rowcount > 0
 
 
+@timed_db
 def cancel_exam(exam_id: str, teacher_id: str) -> bool:
     """Cancel an exam."""
     with get_db() as conn:
@@ -209,10 +218,12 @@ def cancel_exam(exam_id: str, teacher_id: str) -> bool:
 
 # Student Session Management
 
+@timed_db
 def create_student_session(
     exam_id: str,
     student_name: str,
     student_id: str,
+    language: str = "en",
 ) -> StudentSession:
     """
     Create a new student session when they join an exam.
@@ -221,6 +232,7 @@ def create_student_session(
         exam_id: Exam ID
         student_name: Student's name
         student_id: Student's ID
+        language: Preferred language for translated and spoken questions
 
     Returns:
         Created StudentSession
@@ -234,10 +246,10 @@ def create_student_session(
         conn.execute(
             """
             INSERT INTO student_sessions
-            (id, exam_id, student_name, student_id, status, rubric_coverage, skip_state, started_at)
-            VALUES (?, ?, ?, ?, 'active', ?, ?, ?)
+            (id, exam_id, student_name, student_id, status, rubric_coverage, skip_state, language, started_at)
+            VALUES (?, ?, ?, ?, 'active', ?, ?, ?, ?)
             """,
-            [session_id, exam_id, student_name, student_id, coverage.model_dump_json(), json.dumps(skip_state), started_at]
+            [session_id, exam_id, student_name, student_id, coverage.model_dump_json(), json.dumps(skip_state), language, started_at]
         )
 
     return StudentSession(
@@ -248,16 +260,19 @@ def create_student_session(
         status=SessionStatus.ACTIVE,
         rubric_coverage=coverage,
         skip_state=skip_state,
+        language=language,
         started_at=started_at,
     )
 
 
+@timed_db
 def get_student_session(session_id: str) -> Optional[StudentSession]:
     """Get a student session by ID."""
     with get_db() as conn:
         result = conn.execute(
             """
-            SELECT id, exam_id, student_name, student_id, status, rubric_coverage, skip_state, started_at, ended_at
+            SELECT id, exam_id, student_name, student_id, status, rubric_coverage, skip_state, started_at, ended_at,
+                   language, transcript_summary
             FROM student_sessions WHERE id = ?
             """,
             [session_id]
@@ -269,6 +284,7 @@ def get_student_session(session_id: str) -> Optional[StudentSession]:
         coverage_data = json.loads(result[5]) if result[5] else {}
         coverage = CoverageMap(**coverage_data)
         skip_state = json.loads(result[6]) if result[6] else {}
+        summary_data = json.loads(result[10]) if result[10] else {}
 
         return StudentSession(
             id=result[0],
@@ -278,17 +294,21 @@ def get_student_session(session_id: str) -> Optional[StudentSession]:
             status=SessionStatus(result[4]),
             rubric_coverage=coverage,
             skip_state=skip_state,
+            language=result[9] or "en",
+            transcript_summary=TranscriptSummary(**summary_data),
             started_at=result[7],
             ended_at=result[8],
         )
 
 
+@timed_db
 def list_exam_sessions(exam_id: str) -> list[StudentSession]:
     """List all student sessions for an exam."""
     with get_db() as conn:
         results = conn.execute(
             """
-            SELECT id, exam_id, student_name, student_id, status, rubric_coverage, skip_state, started_at, ended_at
+            SELECT id, exam_id, student_name, student_id, status, rubric_coverage, skip_state, started_at, ended_at,
+                   language, transcript_summary
             FROM student_sessions WHERE exam_id = ?
             ORDER BY started_at ASC
             """,
@@ -300,6 +320,7 @@ def list_exam_sessions(exam_id: str) -> list[StudentSession]:
             coverage_data = json.loads(r[5]) if r[5] else {}
             coverage = CoverageMap(**coverage_data)
             skip_state = json.loads(r[6]) if r[6] else {}
+            summary_data = json.loads(r[10]) if r[10] else {}
 
             sessions.append(StudentSession(
                 id=r[0],
@@ -309,6 +330,8 @@ def list_exam_sessions(exam_id: str) -> list[StudentSession]:
                 status=SessionStatus(r[4]),
                 rubric_coverage=coverage,
                 skip_state=skip_state,
+                language=r[9] or "en",
+                transcript_summary=TranscriptSummary(**summary_data),
                 started_at=r[7],
                 ended_at=r[8],
             ))
@@ -316,6 +339,7 @@ def list_exam_sessions(exam_id: str) -> list[StudentSession]:
         return sessions
 
 
+@timed_db
 def update_session_coverage(session_id: str, coverage: CoverageMap) -> None:
     """Update the rubric coverage for a session."""
     with get_db() as conn:
@@ -325,6 +349,7 @@ def update_session_coverage(session_id: str, coverage: CoverageMap) -> None:
         )
 
 
+@timed_db
 def update_session_skip_state(session_id: str, skip_state: dict) -> None:
     """Update the skip state for a session."""
     with get_db() as conn:
@@ -334,6 +359,27 @@ def update_session_skip_state(session_id: str, skip_state: dict) -> None:
         )
 
 
+@timed_db
+def update_session_language(session_id: str, language: str) -> None:
+    """Update the preferred language for a session."""
+    with get_db() as conn:
+        conn.execute(
+            "UPDATE student_sessions SET language = ? WHERE id = ?",
+            [language, session_id]
+        )
+
+
+@timed_db
+def update_session_summary(session_id: str, summary: TranscriptSummary) -> None:
+    """Update the rolling transcript summary for a session."""
+    with get_db() as conn:
+        conn.execute(
+            "UPDATE student_sessions SET transcript_summary = ? WHERE id = ?",
+            [summary.model_dump_json(), session_id]
+        )
+
+
+@timed_db
 def complete_session(session_id: str) -> None:
     """Mark a student session as completed."""
     with get_db() as conn:
@@ -343,6 +389,7 @@ def complete_session(session_id: str) -> None:
         )
 
 
+@timed_db
 def terminate_session(session_id: str) -> None:
     """Terminate a student session (teacher intervention)."""
     with get_db() as conn:
@@ -352,6 +399,7 @@ def terminate_session(session_id: str) -> None:
         )
 
 
+@timed_db
 def get_active_sessions_count(exam_id: str) -> int:
     """Get count of active sessions for an exam."""
     with get_db() as conn:
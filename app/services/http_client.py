@@ -0,0 +1,33 @@
+"""Shared, connection-pooled HTTP client for upstream APIs (ElevenLabs)."""
+
+from typing import Optional
+
+import httpx
+
+from app.services.metrics import InstrumentedTransport
+
+# Singleton instance, closed on application shutdown
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the pooled HTTP client singleton."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(60.0, connect=10.0),
+            transport=InstrumentedTransport(
+                httpx.AsyncHTTPTransport(
+                    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+                )
+            ),
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the pooled HTTP client."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
@@ -0,0 +1,159 @@
+"""
+Idempotent Student Actions
+
+Replays the stored response when a student action is retried with the same
+idempotency key, instead of running it again. Keys come from the client's
+Idempotency-Key header or are derived from the request (the content hash of
+an audio answer, the upload ID of a segmented one).
+
+Responses are stored per session in the `idempotency_keys` table. A retry
+that arrives while the original is still running waits for its result.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Optional
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
+from app.config import get_settings
+from app.database import get_db
+from app.services.metrics import timed_db
+from app.services.timing import server_timing_header
+
+logger = logging.getLogger(__name__)
+
+# (session ID, key) -> result of the action in flight
+_in_flight: dict[tuple[str, str], asyncio.Future] = {}
+_last_prune = 0.0
+
+
+@dataclass
+class StoredResponse:
+    """The response of a student action, as replayed for a retried key."""
+    status_code: int
+    body: dict
+    headers: dict[str, str] = field(default_factory=dict)
+    # Stage timings of the run that produced the response (not stored:
+    # replays report no timings)
+    timings: dict[str, float] = field(default_factory=dict)
+
+    def to_response(self) -> JSONResponse:
+        headers = dict(self.headers)
+        if self.timings:
+            headers["Server-Timing"] = server_timing_header(self.timings)
+        return JSONResponse(status_code=self.status_code, content=self.body, headers=headers)
+
+
+@timed_db
+def get_stored_response(session_id: str, key: str, endpoint: str) -> Optional[StoredResponse]:
+    """
+    Look up the stored response for a key.
+
+    Raises:
+        HTTPException: If the key was used for a different endpoint
+    """
+    with get_db() as conn:
+        row = conn.execute(
+            """
+            SELECT endpoint, status_code, response, headers
+            FROM idempotency_keys
+            WHERE session_id = ? AND idempotency_key = ?
+            """,
+            [session_id, key],
+        ).fetchone()
+    if row is None:
+        return None
+    if row[0] != endpoint:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was used for a different request")
+    return StoredResponse(status_code=row[1], body=json.loads(row[2]), headers=json.loads(row[3] or "{}"))
+
+
+@timed_db
+def store_response(session_id: str, key: str, endpoint: str, response: StoredResponse) -> None:
+    """Store the response for a key (and prune expired keys now and then)."""
+    global _last_prune
+    ttl = get_settings().idempotency_key_ttl
+    now = datetime.utcnow()
+
+    with get_db() as conn:
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO idempotency_keys
+            (session_id, idempotency_key, endpoint, status_code, response, headers, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                session_id,
+                key,
+                endpoint,
+                response.status_code,
+                json.dumps(response.body),
+                json.dumps(response.headers),
+                now,
+            ],
+        )
+        if time.monotonic() - _last_prune > ttl / 24:
+            _last_prune = time.monotonic()
+            conn.execute(
+                "DELETE FROM idempotency_keys WHERE created_at < ?",
+                [now - timedelta(seconds=ttl)],
+            )
+
+
+async def run_once(
+    session_id: str,
+    key: Optional[str],
+    endpoint: str,
+    action: Callable[[], Awaitable[StoredResponse]],
+) -> StoredResponse:
+    """
+    Run a student action once per idempotency key.
+
+    Args:
+        session_id: Student session ID (keys are scoped to the session)
+        key: Idempotency key, or None to always run the action
+        endpoint: Name of the action, so a key cannot be replayed elsewhere
+        action: Runs the action and returns its response
+
+    Returns:
+        The action's response, or the stored response of an earlier run
+
+    Raises:
+        HTTPException: If the key was used for a different endpoint, or as
+            raised by the action (errors are not stored; a retry runs again)
+    """
+    if key is None:
+        return await action()
+
+    stored = get_stored_response(session_id, key, endpoint)
+    if stored is not None:
+        return stored
+
+    in_flight = _in_flight.get((session_id, key))
+    if in_flight is not None:
+        return await asyncio.shield(in_flight)
+
+    future = asyncio.get_running_loop().create_future()
+    _in_flight[(session_id, key)] = future
+    try:
+        response = await action()
+        store_response(session_id, key, endpoint, response)
+    except BaseException as e:
+        # Retries waiting on this run see the same error
+        if isinstance(e, asyncio.CancelledError):
+            future.cancel()
+        else:
+            future.set_exception(e)
+            future.exception()  # Retrieved, even if no retry is waiting
+        raise
+    else:
+        future.set_result(response)
+        return response
+    finally:
+        del _in_flight[(session_id, key)]
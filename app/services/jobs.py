@@ -0,0 +1,470 @@
+"""
+Background Job Queue
+
+Durable, in-process queue for work that must happen but need not delay a
+response: recording coverage analyses, flagging struggle events and (in async
+submission mode) processing student answers. Jobs are rows in the DuckDB
+`jobs` table, so anything still queued when the server stops runs after the
+next start.
+
+Services register an async handler per job kind at import time and enqueue
+JSON-serializable payloads; worker tasks started in the app lifespan run
+ready jobs highest priority first, retry failures with exponential backoff
+and drain the queue on shutdown. Each named queue has its own worker pool,
+so slow jobs (answers) cannot starve quick ones. A handler that returns a
+dict stores it as the job's result, for clients to collect with
+wait_for_job.
+
+Usage:
+    register_handler("coverage_analysis", _record_coverage_analysis)
+    enqueue("coverage_analysis", {"transcript_entry_id": ...})
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Optional
+
+from uuid_extensions import uuid7
+
+from app.config import get_settings
+from app.database import get_db
+from app.models.domain import Job, JobStatus
+from app.services.metrics import timed_db
+
+logger = logging.getLogger(__name__)
+
+# Higher runs first; user-visible work (e.g. async answers) jumps the queue
+PRIORITY_HIGH = 10
+PRIORITY_NORMAL = 0
+PRIORITY_LOW = -10
+
+DEFAULT_QUEUE = "default"
+
+JobHandler = Callable[[dict], Awaitable[Optional[dict]]]
+
+_handlers: dict[str, JobHandler] = {}
+
+# queue -> worker tasks / wake-up event
+_workers: dict[str, list[asyncio.Task]] = {}
+_wake: dict[str, asyncio.Event] = {}
+_stopping = False
+
+# job ID -> events of clients waiting for it to finish
+_waiters: dict[str, list[asyncio.Event]] = defaultdict(list)
+_last_prune = 0.0
+
+# kind -> {"enqueued", "completed", "retried", "failed"}
+_job_stats: dict[str, dict[str, int]] = defaultdict(
+    lambda: {"enqueued": 0, "completed": 0, "retried": 0, "failed": 0}
+)
+
+_JOB_COLUMNS = """id, kind, queue, payload, result, priority, status, attempts,
+                  max_attempts, job_key, last_error, run_after, created_at"""
+
+_TERMINAL = (JobStatus.DONE, JobStatus.FAILED)
+
+
+def register_handler(kind: str, handler: JobHandler) -> None:
+    """
+    Register the coroutine function that runs jobs of `kind`.
+
+    Args:
+        kind: Job kind name
+        handler: Async function taking the job payload, returning an optional
+            result dict
+    """
+    _handlers[kind] = handler
+
+
+def _row_to_job(row) -> Job:
+    return Job(
+        id=row[0],
+        kind=row[1],
+        queue=row[2] or DEFAULT_QUEUE,
+        payload=json.loads(row[3]) if row[3] else {},
+        result=json.loads(row[4]) if row[4] else None,
+        priority=row[5],
+        status=JobStatus(row[6]),
+        attempts=row[7],
+        max_attempts=row[8],
+        job_key=row[9],
+        last_error=row[10],
+        run_after=row[11],
+        created_at=row[12],
+    )
+
+
+@timed_db
+def enqueue(
+    kind: str,
+    payload: dict,
+    priority: int = PRIORITY_NORMAL,
+    job_key: Optional[str] = None,
+    max_attempts: Optional[int] = None,
+    delay: float = 0.0,
+    queue: str = DEFAULT_QUEUE,
+) -> str:
+    """
+    Queue a job. Cheap enough to call on the response path (one INSERT).
+
+    Args:
+        kind: Registered job kind
+        payload: JSON-serializable handler arguments
+        priority: Higher runs first
+        job_key: Deduplication key; while a job with the same key is queued,
+            running or holding a result, enqueueing again returns that job
+        max_attempts: Attempts before the job is marked failed
+            (defaults to the job_max_attempts setting)
+        delay: Seconds before the job may run
+        queue: Worker pool that runs the job
+
+    Returns:
+        Job ID
+    """
+    now = datetime.utcnow()
+
+    with get_db() as conn:
+        if job_key is not None:
+            existing = conn.execute(
+                "SELECT id FROM jobs WHERE job_key = ? AND status != ?",
+                [job_key, JobStatus.FAILED.value],
+            ).fetchone()
+            if existing:
+                return existing[0]
+
+        job_id = str(uuid7())
+        conn.execute(
+            """
+            INSERT INTO jobs
+            (id, kind, queue, payload, priority, status, attempts, max_attempts,
+             job_key, run_after, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, 0, ?, ?, ?, ?)
+            """,
+            [
+                job_id,
+                kind,
+                queue,
+                json.dumps(payload),
+                priority,
+                JobStatus.PENDING.value,
+                max_attempts or get_settings().job_max_attempts,
+                job_key,
+                now + timedelta(seconds=delay),
+                now,
+            ],
+        )
+
+    _job_stats[kind]["enqueued"] += 1
+    if queue in _wake:
+        _wake[queue].set()
+    return job_id
+
+
+@timed_db
+def get_job(job_id: str) -> Optional[Job]:
+    """Get a queued, running, failed or result-holding job (other finished jobs are deleted)."""
+    with get_db() as conn:
+        row = conn.execute(f"SELECT {_JOB_COLUMNS} FROM jobs WHERE id = ?", [job_id]).fetchone()
+    return _row_to_job(row) if row else None
+
+
+@timed_db
+def get_job_by_key(job_key: str) -> Optional[Job]:
+    """Get the queued, running or result-holding job with a deduplication key, if any."""
+    with get_db() as conn:
+        row = conn.execute(
+            f"SELECT {_JOB_COLUMNS} FROM jobs WHERE job_key = ? AND status != ?",
+            [job_key, JobStatus.FAILED.value],
+        ).fetchone()
+    return _row_to_job(row) if row else None
+
+
+async def wait_for_job(job_id: str, timeout: float) -> Optional[Job]:
+    """
+    Wait up to `timeout` seconds for a job to finish (long polling).
+
+    Args:
+        job_id: Job ID
+        timeout: Seconds to wait; 0 just looks the job up
+
+    Returns:
+        The job, finished or not, or None if it does not exist
+    """
+    deadline = time.monotonic() + timeout
+    poll_interval = get_settings().job_poll_interval
+    while True:
+        job = get_job(job_id)
+        remaining = deadline - time.monotonic()
+        if job is None or job.status in _TERMINAL or remaining <= 0:
+            return job
+
+        # Woken when a worker on this loop finishes the job; the poll
+        # interval covers jobs finished elsewhere
+        event = asyncio.Event()
+        _waiters[job_id].append(event)
+        try:
+            await asyncio.wait_for(event.wait(), min(remaining, poll_interval))
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            waiters = _waiters.get(job_id)
+            if waiters is not None and event in waiters:
+                waiters.remove(event)
+                if not waiters:
+                    del _waiters[job_id]
+
+
+def _notify_waiters(job_id: str) -> None:
+    for event in _waiters.pop(job_id, ()):
+        event.set()
+
+
+@timed_db
+def _claim_next_job(queue: Optional[str] = None) -> Optional[Job]:
+    """Mark the most urgent ready job (of `queue`, or any) as running and return it."""
+    where = "status = ? AND run_after <= ?"
+    params: list = [JobStatus.PENDING.value, datetime.utcnow()]
+    if queue is not None:
+        where += " AND queue = ?"
+        params.append(queue)
+
+    with get_db() as conn:
+        row = conn.execute(
+            f"""
+            SELECT {_JOB_COLUMNS} FROM jobs
+            WHERE {where}
+            ORDER BY priority DESC, id
+            LIMIT 1
+            """,
+            params,
+        ).fetchone()
+        if row is None:
+            return None
+        # No await between the SELECT and UPDATE, so workers can't claim the same job
+        conn.execute(
+            "UPDATE jobs SET status = ?, attempts = attempts + 1, updated_at = ? WHERE id = ?",
+            [JobStatus.RUNNING.value, datetime.utcnow(), row[0]],
+        )
+
+    job = _row_to_job(row)
+    job.status = JobStatus.RUNNING
+    job.attempts += 1
+    return job
+
+
+async def _run_job(job: Job) -> None:
+    """Run a claimed job, then finish it, schedule a retry or mark it failed."""
+    handler = _handlers.get(job.kind)
+    try:
+        if handler is None:
+            raise LookupError(f"No handler registered for job kind {job.kind!r}")
+        result = await handler(job.payload)
+    except asyncio.CancelledError:
+        # Shutdown interrupted the job; the interrupted run counts as an attempt,
+        # so jobs that must not run twice (max_attempts=1) are failed, not rerun
+        _fail_or_retry(job, handler, "Interrupted by shutdown", delay=0.0)
+        raise
+    except Exception as e:
+        delay = get_settings().job_retry_backoff * 2 ** (job.attempts - 1)
+        _fail_or_retry(job, handler, f"{type(e).__name__}: {e}", delay=delay)
+        return
+
+    with get_db() as conn:
+        if result is None:
+            conn.execute("DELETE FROM jobs WHERE id = ?", [job.id])
+        else:
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, updated_at = ? WHERE id = ?",
+                [JobStatus.DONE.value, json.dumps(result), datetime.utcnow(), job.id],
+            )
+    _job_stats[job.kind]["completed"] += 1
+    _notify_waiters(job.id)
+
+
+@timed_db
+def _fail_or_retry(job: Job, handler: Optional[JobHandler], error: str, delay: float) -> None:
+    now = datetime.utcnow()
+    if handler is not None and job.attempts < job.max_attempts:
+        logger.warning("Job %s (%s) failed, retrying in %.1fs: %s", job.id, job.kind, delay, error)
+        status, run_after = JobStatus.PENDING, now + timedelta(seconds=delay)
+        _job_stats[job.kind]["retried"] += 1
+    else:
+        logger.error("Job %s (%s) failed: %s", job.id, job.kind, error)
+        status, run_after = JobStatus.FAILED, job.run_after
+        _job_stats[job.kind]["failed"] += 1
+
+    with get_db() as conn:
+        conn.execute(
+            "UPDATE jobs SET status = ?, last_error = ?, run_after = ?, updated_at = ? WHERE id = ?",
+            [status.value, error, run_after, now, job.id],
+        )
+    if status == JobStatus.FAILED:
+        _notify_waiters(job.id)
+
+
+async def run_pending(queue: Optional[str] = None) -> int:
+    """
+    Run every ready job in the calling task until none are left.
+
+    For scripts and tests that run without workers (job_workers = 0).
+
+    Args:
+        queue: Only run jobs of this queue (default: all queues)
+
+    Returns:
+        Number of jobs run
+    """
+    count = 0
+    while (job := _claim_next_job(queue)) is not None:
+        await _run_job(job)
+        count += 1
+    return count
+
+
+@timed_db
+def recover_jobs() -> int:
+    """
+    Return jobs left running by a crash to the queue.
+
+    The interrupted run counts as an attempt: jobs with none left are failed.
+
+    Returns:
+        Number of jobs requeued
+    """
+    now = datetime.utcnow()
+    with get_db() as conn:
+        conn.execute(
+            """
+            UPDATE jobs SET status = ?, last_error = 'Interrupted by shutdown', updated_at = ?
+            WHERE status = ? AND attempts >= max_attempts
+            """,
+            [JobStatus.FAILED.value, now, JobStatus.RUNNING.value],
+        )
+        rows = conn.execute(
+            "UPDATE jobs SET status = ?, updated_at = ? WHERE status = ? RETURNING id",
+            [JobStatus.PENDING.value, now, JobStatus.RUNNING.value],
+        ).fetchall()
+    if rows:
+        logger.info("Recovered %d interrupted jobs", len(rows))
+    return len(rows)
+
+
+@timed_db
+def prune_jobs() -> int:
+    """
+    Delete results and failed jobs older than the job_retention setting.
+
+    Returns:
+        Number of jobs deleted
+    """
+    global _last_prune
+    _last_prune = time.monotonic()
+    cutoff = datetime.utcnow() - timedelta(seconds=get_settings().job_retention)
+    with get_db() as conn:
+        rows = conn.execute(
+            "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ? RETURNING id",
+            [JobStatus.DONE.value, JobStatus.FAILED.value, cutoff],
+        ).fetchall()
+    return len(rows)
+
+
+async def _worker(queue: str) -> None:
+    settings = get_settings()
+    wake = _wake[queue]
+    while True:
+        job = _claim_next_job(queue)
+        if job is None:
+            if _stopping:
+                return
+            if time.monotonic() - _last_prune > settings.job_retention:
+                prune_jobs()
+            wake.clear()
+            try:
+                await asyncio.wait_for(wake.wait(), settings.job_poll_interval)
+            except asyncio.TimeoutError:
+                pass  # Check for jobs whose retry delay has passed
+            continue
+        try:
+            await _run_job(job)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Bookkeeping failed (e.g. the database is closing); keep the worker alive
+            logger.exception("Job worker error")
+
+
+def start_workers(pools: Optional[dict[str, int]] = None) -> None:
+    """
+    Recover interrupted jobs and start the worker pools on the running loop.
+
+    Args:
+        pools: Queue name -> number of workers (defaults to job_workers for
+            the default queue and answer_job_workers for answers)
+    """
+    global _stopping
+    settings = get_settings()
+    if pools is None:
+        pools = {DEFAULT_QUEUE: settings.job_workers, "answers": settings.answer_job_workers}
+    recover_jobs()
+    prune_jobs()
+
+    _stopping = False
+    for queue, count in pools.items():
+        if count <= 0 or queue in _workers:
+            continue
+        _wake[queue] = asyncio.Event()
+        _workers[queue] = [asyncio.create_task(_worker(queue)) for _ in range(count)]
+
+
+async def stop_workers(timeout: Optional[float] = None) -> None:
+    """
+    Let the workers finish the jobs that are ready, then stop them.
+
+    Jobs still running after `timeout` are cancelled (see _run_job); jobs
+    scheduled for a later retry simply stay queued for the next start.
+
+    Args:
+        timeout: Seconds to wait (defaults to the job_drain_timeout setting)
+    """
+    global _stopping
+    tasks = [task for pool in _workers.values() for task in pool]
+    if not tasks:
+        return
+
+    _stopping = True
+    for wake in _wake.values():
+        wake.set()
+    timeout = get_settings().job_drain_timeout if timeout is None else timeout
+    _, still_running = await asyncio.wait(tasks, timeout=timeout)
+    for task in still_running:
+        task.cancel()
+    if still_running:
+        logger.warning("Cancelled %d job workers still running at shutdown", len(still_running))
+        await asyncio.gather(*still_running, return_exceptions=True)
+
+    _workers.clear()
+    _wake.clear()
+    _stopping = False
+
+
+@timed_db
+def get_job_stats() -> dict:
+    """
+    Job queue counters and current depth.
+
+    Returns:
+        Dict with per-kind counters ("kinds"), row counts per status and
+        workers per queue
+    """
+    with get_db() as conn:
+        rows = conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+    by_status = {status: count for status, count in rows}
+    return {
+        "kinds": {kind: dict(stats) for kind, stats in _job_stats.items()},
+        **{status.value: by_status.get(status.value, 0) for status in JobStatus},
+        "workers": {queue: len(pool) for queue, pool in _workers.items()},
+    }
@@ -1,8 +1,119 @@
 import json
-import httpx
+import logging
+import time
+from collections import defaultdict
 from typing import Optional
 
+import httpx
+
 from app.config import get_settings
+from app.services.metrics import InstrumentedTransport
+
+logger = logging.getLogger(__name__)
+
+# Per call site: requests, prompt/cached/completion tokens and latency, to
+# confirm provider-side prompt caching is hitting
+_usage: dict[str, dict[str, float]] = defaultdict(lambda: {
+    "requests": 0,
+    "prompt_tokens": 0,
+    "cached_tokens": 0,
+    "completion_tokens": 0,
+    "latency_seconds": 0.0,
+    "cached_latency_seconds": 0.0,
+    "cached_requests": 0,
+})
+
+
+def _record_usage(call_site: str, usage: Optional[dict], elapsed: float) -> None:
+    stats = _usage[call_site]
+    stats["requests"] += 1
+    stats["latency_seconds"] += elapsed
+    if not usage:
+        return
+    details = usage.get("prompt_tokens_details") or {}
+    cached = details.get("cached_tokens") or 0
+    stats["prompt_tokens"] += usage.get("prompt_tokens") or 0
+    stats["completion_tokens"] += usage.get("completion_tokens") or 0
+    stats["cached_tokens"] += cached
+    if cached:
+        stats["cached_requests"] += 1
+        stats["cached_latency_seconds"] += elapsed
+
+
+def get_llm_usage_stats() -> dict:
+    """
+    Token usage and latency per call site, with the prompt cache hit rate.
+
+    Returns:
+        Dict keyed by call site, plus a "total" entry
+    """
+    def summarize(stats: dict[str, float]) -> dict:
+        requests = stats["requests"]
+        cached_requests = stats["cached_requests"]
+        uncached_requests = requests - cached_requests
+        return {
+            **stats,
+            "cached_token_rate": stats["cached_tokens"] / stats["prompt_tokens"] if stats["prompt_tokens"] else 0.0,
+            "avg_latency_seconds": stats["latency_seconds"] / requests if requests else 0.0,
+            "avg_cached_latency_seconds": (
+                stats["cached_latency_seconds"] / cached_requests if cached_requests else 0.0
+            ),
+            "avg_uncached_latency_seconds": (
+                (stats["latency_seconds"] - stats["cached_latency_seconds"]) / uncached_requests
+                if uncached_requests else 0.0
+            ),
+        }
+
+    total: dict[str, float] = defaultdict(float)
+    result = {}
+    for call_site, stats in _usage.items():
+        result[call_site] = summarize(stats)
+        for key, value in stats.items():
+            total[key] += value
+    if total:
+        result["total"] = summarize(total)
+    return result
+
+
+def build_messages(
+    prompt: str,
+    system_prompt: Optional[str] = None,
+    cached_prefix: Optional[str] = None,
+    cache_control: bool = True,
+) -> list[dict]:
+    """
+    Build chat messages with static content first.
+
+    The system prompt and the cached prefix (e.g. the exam rubric) form the
+    system message, so every request for the same exam starts with the same
+    bytes; only the user message varies. With cache_control the prefix is
+    marked as a cache breakpoint for providers that need explicit hints
+    (Anthropic and Gemini via OpenRouter); others cache matching prefixes
+    automatically.
+
+    Args:
+        prompt: The variable part of the request
+        system_prompt: Optional system prompt
+        cached_prefix: Optional static context shared by many requests
+        cache_control: Whether to emit cache-control hints
+
+    Returns:
+        List of chat messages
+    """
+    messages: list[dict] = []
+
+    if cached_prefix and cache_control:
+        parts = []
+        if system_prompt:
+            parts.append({"type": "text", "text": system_prompt})
+        parts.append({"type": "text", "text": cached_prefix, "cache_control": {"type": "ephemeral"}})
+        messages.append({"role": "system", "content": parts})
+    elif system_prompt or cached_prefix:
+        content = "\n\n".join(part for part in (system_prompt, cached_prefix) if part)
+        messages.append({"role": "system", "content": content})
+
+    messages.append({"role": "user", "content": prompt})
+    return messages
 
 
 class LLMClient:
@@ -13,6 +124,7 @@ class LLMClient:
         self.base_url = settings.openrouter_base_url
         self.api_key = settings.openrouter_api_key
         self.model = settings.llm_model
+        self.cache_control = settings.llm_prompt_cache_control
 
     async def complete(
         self,
@@ -20,6 +132,8 @@ class LLMClient:
         system_prompt: Optional[str] = None,
         temperature: float = 0.7,
         max_tokens: int = 2048,
+        cached_prefix: Optional[str] = None,
+        call_site: str = "other",
     ) -> str:
         """
         Send a completion request to the LLM.
@@ -29,18 +143,17 @@ class LLMClient:
             system_prompt: Optional system prompt for context
             temperature: Sampling temperature (0-1)
             max_tokens: Maximum tokens in response
+            cached_prefix: Static context sent after the system prompt and
+                marked for provider-side prompt caching
+            call_site: Label for usage statistics
 
         Returns:
             The LLM's response text
         """
-        messages = []
-
-        if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
-
-        messages.append({"role": "user", "content": prompt})
+        messages = build_messages(prompt, system_prompt, cached_prefix, self.cache_control)
 
-        async with httpx.AsyncClient() as client:
+        started = time.perf_counter()
+        async with httpx.AsyncClient(transport=InstrumentedTransport()) as client:
             response = await client.post(
                 f"{self.base_url}/chat/completions",
                 headers={
@@ -54,12 +167,15 @@ class LLMClient:
                     "messages": messages,
                     "temperature": temperature,
                     "max_tokens": max_tokens,
+                    # Ask OpenRouter to include token usage (with cached tokens)
+                    "usage": {"include": True},
                 },
                 timeout=60.0,
             )
             response.raise_for_status()
             data = response.json()
 
+        _record_usage(call_site, data.get("usage"), time.perf_counter() - started)
         return data["choices"][0]["message"]["content"]
 
     async def complete_json(
@@ -68,6 +184,8 @@ class LLMClient:
         system_prompt: Optional[str] = None,
         temperature: float = 0.3,
         max_tokens: int = 2048,
+        cached_prefix: Optional[str] = None,
+        call_site: str = "other",
     ) -> dict:
         """
         Send a completion request expecting JSON response.
@@ -77,6 +195,8 @@ class LLMClient:
             system_prompt: Optional system prompt for context
             temperature: Lower temperature for more deterministic JSON
             max_tokens: Maximum tokens in response
+            cached_prefix: Static context marked for provider-side prompt caching
+            call_site: Label for usage statistics
 
         Returns:
             Parsed JSON dict from the response
@@ -86,6 +206,8 @@ class LLMClient:
             system_prompt=system_prompt,
             temperature=temperature,
             max_tokens=max_tokens,
+            cached_prefix=cached_prefix,
+            call_site=call_site,
         )
 
         # Try to extract JSON from the response
@@ -0,0 +1,478 @@
+"""
+Prometheus Metrics
+
+A small in-process metrics registry rendered in the Prometheus text
+exposition format at GET /metrics (no client library needed):
+
+- HTTP request latency histograms per route template, and in-flight requests
+  (MetricsMiddleware)
+- DuckDB time per service function (@timed_db on the functions that query)
+- Upstream OpenRouter/ElevenLabs latency, status and error counters
+  (InstrumentedTransport on every upstream HTTP client)
+- Domain gauges: active exams and sessions, answers per minute
+- The counters the services already keep (LLM usage, pipeline stage
+  histograms, STT, struggle detection, job queue, TTS/translation caches),
+  collected at scrape time
+
+Updates never await, so they are atomic with respect to the event loop; the
+per-update cost is a dict lookup and a few additions.
+"""
+
+import bisect
+import functools
+import inspect
+import logging
+import time
+from collections import deque
+from typing import Callable, Iterable, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "speakup_"
+
+# Seconds; the same bounds as the pipeline stage histograms
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+# A metric family at scrape time: (name, type, help, [(labels, value)]);
+# histogram samples carry their full sample name in labels["__name__"]
+Family = tuple[str, str, str, list[tuple[dict, float]]]
+
+_metrics: list["_Metric"] = []
+_collectors: list[Callable[[], Iterable[Family]]] = []
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    parts = []
+    for key, value in labels.items():
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{key}="{escaped}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        self.name = PREFIX + name
+        self.help = help
+        self.labelnames = labelnames
+        _metrics.append(self)
+
+    def family(self) -> Family:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonic counter; label values are passed positionally."""
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, help, labelnames)
+        # Unlabeled metrics are exposed from the start, as 0
+        self._values: dict[tuple, float] = {} if labelnames else {(): 0.0}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def family(self) -> Family:
+        samples = [(dict(zip(self.labelnames, key)), value) for key, value in self._values.items()]
+        return self.name, self.type, self.help, samples
+
+
+class Gauge(Counter):
+    """Value that goes up and down."""
+    type = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels: str) -> None:
+        self._values[labels] = value
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram of durations in seconds."""
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = buckets
+        # labels -> [per-bucket counts (+ overflow), sum]
+        self._values: dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        entry = self._values.get(labels)
+        if entry is None:
+            entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        entry[0][bisect.bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+
+    def family(self) -> Family:
+        samples = []
+        for key, (counts, total) in self._values.items():
+            samples.extend(histogram_samples(self.name, dict(zip(self.labelnames, key)), self.buckets, counts, total))
+        return self.name, self.type, self.help, samples
+
+
+def histogram_samples(
+    name: str,
+    labels: dict,
+    bounds: Iterable[float],
+    counts: list[int],
+    total: float,
+) -> list[tuple[dict, float]]:
+    """
+    Samples of one histogram series from per-bucket (non-cumulative) counts.
+
+    Args:
+        name: Metric name
+        labels: Series labels
+        bounds: Bucket upper bounds
+        counts: Count per bucket, plus a final overflow bucket
+        total: Sum of the observed values
+    """
+    samples = []
+    cumulative = 0
+    for bound, count in zip(bounds, counts):
+        cumulative += count
+        samples.append(({"__name__": f"{name}_bucket", **labels, "le": _format_value(bound)}, cumulative))
+    cumulative += counts[-1]
+    samples.append(({"__name__": f"{name}_bucket", **labels, "le": "+Inf"}, cumulative))
+    samples.append(({"__name__": f"{name}_sum", **labels}, total))
+    samples.append(({"__name__": f"{name}_count", **labels}, cumulative))
+    return samples
+
+
+def register_collector(collector: Callable[[], Iterable[Family]]) -> None:
+    """Register a function producing metric families at scrape time."""
+    _collectors.append(collector)
+
+
+def render_metrics() -> str:
+    """
+    Render every metric in the Prometheus text exposition format (0.0.4).
+
+    Returns:
+        The exposition text
+    """
+    families: list[Family] = [metric.family() for metric in _metrics]
+    for collector in _collectors:
+        try:
+            families.extend(collector())
+        except Exception:
+            # One broken collector must not take the whole scrape down
+            logger.exception("Metrics collector %s failed", getattr(collector, "__name__", collector))
+
+    lines = []
+    for name, type_, help_, samples in families:
+        lines.append(f"# HELP {name} {help_}")
+        lines.append(f"# TYPE {name} {type_}")
+        for labels, value in samples:
+            labels = dict(labels)
+            sample_name = labels.pop("__name__", name)
+            lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+# HTTP requests
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ("method", "route", "status"),
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests being handled")
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing each HTTP request under its route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = "500"
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - started, scope["method"], _route_template(scope), status
+            )
+
+
+def _route_template(scope) -> str:
+    """
+    Path template of the matched route, e.g. "/api/v1/session/{session_id}/status".
+
+    The router sets scope["route"] on a match (unmatched paths share one
+    series). Routes of included routers may carry their path without the
+    include prefix, which is then taken from the leading path segments.
+    """
+    path = getattr(scope.get("route"), "path", None)
+    if not path:
+        return "unmatched"
+    extra = scope["path"].count("/") - path.count("/")
+    if extra > 0:
+        path = "/".join(scope["path"].split("/")[:extra + 1]) + path
+    return path
+
+
+# Database
+
+DB_DURATION = Histogram(
+    "db_duration_seconds",
+    "Time spent in database service functions",
+    ("function",),
+    buckets=DB_BUCKETS,
+)
+
+
+def timed_db(func: Callable) -> Callable:
+    """
+    Decorator timing a service function that queries the database.
+
+    Observations are labeled "<service module>.<function>", e.g.
+    "exam.create_student_session".
+    """
+    label = f"{func.__module__.removeprefix('app.services.')}.{func.__qualname__}"
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                DB_DURATION.observe(time.perf_counter() - started, label)
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            DB_DURATION.observe(time.perf_counter() - started, label)
+
+    return wrapper
+
+
+# Upstream APIs
+
+UPSTREAM_DURATION = Histogram(
+    "upstream_request_duration_seconds",
+    "Upstream API latency until response headers",
+    ("upstream",),
+)
+UPSTREAM_REQUESTS = Counter(
+    "upstream_requests_total",
+    "Upstream API requests by status code (\"error\" when no response arrived)",
+    ("upstream", "status"),
+)
+UPSTREAM_ERRORS = Counter(
+    "upstream_errors_total",
+    "Upstream API requests that failed or returned an error status",
+    ("upstream", "error"),
+)
+
+
+def upstream_name(host: str) -> str:
+    if "openrouter" in host:
+        return "openrouter"
+    if "elevenlabs" in host:
+        return "elevenlabs"
+    return host
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """Transport wrapper recording latency and errors of upstream requests."""
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self._transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        upstream = upstream_name(request.url.host)
+        started = time.perf_counter()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except Exception as e:
+            UPSTREAM_REQUESTS.inc(upstream, "error")
+            UPSTREAM_ERRORS.inc(upstream, type(e).__name__)
+            raise
+        finally:
+            UPSTREAM_DURATION.observe(time.perf_counter() - started, upstream)
+
+        UPSTREAM_REQUESTS.inc(upstream, str(response.status_code))
+        if response.status_code >= 400:
+            UPSTREAM_ERRORS.inc(upstream, f"http_{response.status_code}")
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+# Domain
+
+ANSWERS = Counter("answers_total", "Student answers processed")
+_answer_times: deque[float] = deque()
+
+
+def record_answer() -> None:
+    """Count a processed student answer."""
+    ANSWERS.inc()
+    _answer_times.append(time.monotonic())
+
+
+def answers_per_minute() -> int:
+    """Answers processed in the last 60 seconds."""
+    cutoff = time.monotonic() - 60
+    while _answer_times and _answer_times[0] < cutoff:
+        _answer_times.popleft()
+    return len(_answer_times)
+
+
+def _family(name: str, type_: str, help: str, samples: list[tuple[dict, float]]) -> Family:
+    return PREFIX + name, type_, help, samples
+
+
+def collect_domain() -> list[Family]:
+    """Active exams and sessions (counted in the database) and answer rate."""
+    from app.database import get_db
+
+    with get_db() as conn:
+        active_exams = conn.execute("SELECT COUNT(*) FROM exams WHERE status = 'active'").fetchone()[0]
+        active_sessions = conn.execute(
+            "SELECT COUNT(*) FROM student_sessions WHERE status = 'active'"
+        ).fetchone()[0]
+    return [
+        _family("active_exams", "gauge", "Exams in progress", [({}, active_exams)]),
+        _family("active_sessions", "gauge", "Student sessions in progress", [({}, active_sessions)]),
+        _family("answers_per_minute", "gauge", "Answers processed in the last minute", [({}, answers_per_minute())]),
+    ]
+
+
+def collect_services() -> list[Family]:
+    """The counters kept by the LLM, pipeline, STT, struggle, job and TTS services."""
+    from app.services import jobs, llm_client, struggle, stt, timing, tts
+
+    families = []
+
+    usage = {site: stats for site, stats in llm_client.get_llm_usage_stats().items() if site != "total"}
+    for key, help_ in (
+        ("requests", "LLM requests by call site"),
+        ("prompt_tokens", "LLM prompt tokens by call site"),
+        ("cached_tokens", "LLM prompt tokens served from the provider cache by call site"),
+        ("completion_tokens", "LLM completion tokens by call site"),
+        ("latency_seconds", "Total LLM latency by call site"),
+    ):
+        families.append(_family(
+            f"llm_{key}_total",
+            "counter",
+            help_,
+            [({"call_site": site}, stats[key]) for site, stats in usage.items()],
+        ))
+
+    stage_samples = []
+    name = PREFIX + "stage_duration_seconds"
+    for pipeline, stages in timing.get_stage_stats().items():
+        for stage, stats in stages.items():
+            stage_samples.extend(histogram_samples(
+                name,
+                {"pipeline": pipeline, "stage": stage},
+                (ms / 1000 for ms in timing.LATENCY_BUCKETS_MS),
+                stats["buckets"],
+                stats["total_ms"] / 1000,
+            ))
+    families.append((name, "histogram", "Pipeline stage durations", stage_samples))
+
+    stt_stats = stt.get_stt_stats()
+    families.append(_family("stt_requests_total", "counter", "STT requests", [({}, stt_stats["requests"])]))
+    families.append(_family("stt_errors_total", "counter", "Failed STT requests", [({}, stt_stats["errors"])]))
+    families.append(_family(
+        "stt_seconds_total", "counter", "Total STT latency", [({}, stt_stats["total_seconds"])]
+    ))
+    families.append(_family(
+        "stt_silent_skipped_total", "counter", "Silent uploads not sent to STT", [({}, stt_stats["silent_skipped"])]
+    ))
+
+    struggle_stats = struggle.get_struggle_detection_stats()
+    families.append(_family(
+        "struggle_detections_total",
+        "counter",
+        "Responses settled by each struggle detection path",
+        [({"path": path}, struggle_stats[path])
+         for path in ("rule_silence", "rule_confusion", "rule_repetition", "llm")],
+    ))
+
+    job_stats = jobs.get_job_stats()
+    families.append(_family(
+        "jobs_total",
+        "counter",
+        "Background jobs by kind and outcome",
+        [({"kind": kind, "event": event}, count)
+         for kind, stats in job_stats["kinds"].items() for event, count in stats.items()],
+    ))
+    families.append(_family(
+        "jobs",
+        "gauge",
+        "Background job rows by status",
+        [({"status": status}, job_stats[status]) for status in ("pending", "running", "done", "failed")],
+    ))
+    families.append(_family(
+        "job_workers",
+        "gauge",
+        "Background job workers by queue",
+        [({"queue": queue}, count) for queue, count in job_stats["workers"].items()],
+    ))
+
+    # Only report caches that exist; creating them here would load the disk cache
+    caches = []
+    if tts.get_tts_cache.cache_info().currsize:
+        caches.append(("tts", tts.get_tts_cache().stats()))
+    if tts.get_translation_memo.cache_info().currsize:
+        caches.append(("translation", tts.get_translation_memo().stats()))
+    for key, type_ in (("hits", "counter"), ("misses", "counter"), ("entries", "gauge")):
+        name = f"cache_{key}_total" if type_ == "counter" else f"cache_{key}"
+        families.append(_family(
+            name, type_, f"Cache {key}", [({"cache": cache}, stats[key]) for cache, stats in caches]
+        ))
+
+    return families
+
+
+register_collector(collect_domain)
+register_collector(collect_services)
@@ -5,12 +5,17 @@ Orchestrates the parallel processing of student responses:
 1. Coverage analysis (runs in parallel with struggle detection)
 2. Struggle detection (runs in parallel with coverage analysis)
 3. Question generation (based on results of above)
+
+Actions of one session (answers, skips, starting) run one at a time.
 """
 
 import asyncio
-from dataclasses import dataclass
+import hashlib
+import logging
+from dataclasses import dataclass, field
 from typing import Optional
 
+from app.config import get_settings
 from app.models.domain import (
     ParsedRubric,
     CoverageMap,
@@ -20,13 +25,23 @@ from app.models.domain import (
     Severity,
     TranscriptEntry,
     EntryType,
+    SessionStatus,
 )
+from app.services.compiled_rubric import CompiledRubric
 from app.services import coverage as coverage_service
+from app.services import criterion_scheduler
 from app.services import struggle as struggle_service
 from app.services import questions as question_service
 from app.services import exam as exam_service
+from app.services import jobs
+from app.services import metrics
 from app.services import transcript as transcript_service
 from app.services import rubric as rubric_service
+from app.services import transcript_summary as summary_service
+from app.services.session_locks import serialized
+from app.services.timing import StageTimer
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -39,153 +54,429 @@ class ProcessedResponse:
     coverage_pct: float
     struggle_event: Optional[StruggleEvent]
     teacher_message: Optional[str]
+    # Stage name -> milliseconds spent producing this response
+    stage_timings: dict[str, float] = field(default_factory=dict)
 
 
-async def process_student_response(
+class SessionNotActiveError(ValueError):
+    """The session is no longer active (e.g. a concurrent answer completed it)."""
+
+
+class QuestionMismatchError(ValueError):
+    """An answer names a question that is not the session's current one."""
+
+
+# Transcript text recorded when an audio answer contained no speech
+NO_SPEECH_RESPONSE = "(no speech detected)"
+
+# Criteria a generated question targets (and a second skip excludes)
+MAX_TARGET_CRITERIA = 5
+
+# skip_state key holding the pre-generated simplified variant of the current question
+SIMPLIFIED_VARIANT_KEY = "simplified_variant"
+
+# Struggles answered with the simplified variant when one is available
+VARIANT_STRUGGLE_TYPES = (StruggleType.SILENCE, StruggleType.CONFUSION)
+
+
+def _store_variant(
+    skip_state: dict,
+    question_entry: TranscriptEntry,
+    generated: question_service.GeneratedQuestion,
+) -> None:
+    """Remember a new question's simplified variant (or forget the previous one)."""
+    if generated.simplified:
+        skip_state[SIMPLIFIED_VARIANT_KEY] = {"question_id": question_entry.id, "text": generated.simplified}
+    else:
+        skip_state.pop(SIMPLIFIED_VARIANT_KEY, None)
+
+
+def _take_variant(skip_state: dict, question_entry: Optional[TranscriptEntry]) -> Optional[str]:
+    """
+    Remove and return the stored simplified variant if it belongs to question_entry.
+
+    A variant stored for any other question is stale and is discarded.
+    """
+    variant = skip_state.pop(SIMPLIFIED_VARIANT_KEY, None)
+    if not variant or question_entry is None or variant.get("question_id") != question_entry.id:
+        return None
+    return variant.get("text") or None
+
+
+def _unchanged_coverage(current_coverage: CoverageMap, rubric: ParsedRubric, reasoning: str) -> CoverageResult:
+    """Coverage result for an answer that leaves coverage as it is."""
+    total_criteria = len(rubric.criteria)
+    total_pct = sum(current_coverage.covered_criteria.values()) / total_criteria if total_criteria else 0.0
+
+    return CoverageResult(
+        newly_covered=[],
+        updated_coverage=current_coverage,
+        reasoning=reasoning,
+        total_coverage_pct=total_pct,
+    )
+
+
+def _silence_analysis(current_coverage: CoverageMap, rubric: ParsedRubric) -> tuple[CoverageResult, StruggleEvent]:
+    """Coverage and struggle results for a silent answer, without any LLM calls."""
+    coverage_result = _unchanged_coverage(current_coverage, rubric, "No speech detected in the response")
+    struggle_event = StruggleEvent(
+        id="",  # Will be set when persisted
+        session_id="",
+        transcript_entry_id="",
+        struggle_type=StruggleType.SILENCE,
+        severity=Severity.MEDIUM,
+        llm_reasoning="No speech was detected in the student's recording",
+    )
+    return coverage_result, struggle_event
+
+
+# Deferred coverage mode: per session, the background analysis of the latest
+# answer; its result is whether the exam is complete. Analyses live only in
+# this process: any still pending when the server restarts are lost, and
+# those answers never count toward coverage.
+_deferred_coverage: dict[str, asyncio.Task] = {}
+# Analyses of final answers, which no later answer will reconcile
+_unreconciled_tasks: set[asyncio.Task] = set()
+
+
+def _deferred_coverage_done(session_id: str, task: asyncio.Task) -> None:
+    """
+    Log a failed analysis and forget finished ones with nothing to reconcile.
+
+    Coverage is already stored once the analysis finishes, so only a verdict
+    that the exam is complete is kept for the next answer. Abandoned sessions
+    therefore hold on to nothing.
+    """
+    complete = False
+    if not task.cancelled():
+        if task.exception() is not None:
+            logger.error("Deferred coverage analysis failed for session %s", session_id, exc_info=task.exception())
+        else:
+            complete = task.result()
+    if not complete and _deferred_coverage.get(session_id) is task:
+        del _deferred_coverage[session_id]
+
+
+def _release_deferred_coverage(session_id: str) -> None:
+    """Let a finished session's last deferred analysis complete on its own."""
+    task = _deferred_coverage.pop(session_id, None)
+    if task is None or task.done():
+        return
+    # The event loop keeps only weak references to tasks
+    _unreconciled_tasks.add(task)
+    task.add_done_callback(_unreconciled_tasks.discard)
+
+
+async def _analyze_coverage_deferred(
     session_id: str,
+    response_entry_id: str,
     response_text: str,
-) -> ProcessedResponse:
+    question: str,
+    target_criteria: Optional[list[str]],
+    compiled: CompiledRubric,
+) -> bool:
     """
-    Process a student response through parallel analysis pipelines.
+    Background coverage analysis of one answer.
 
-    Args:
-        session_id: Student session ID
-        response_text: The student's transcribed response
+    Records the analysis, updates the session coverage and checks completion.
 
     Returns:
-        ProcessedResponse with next question and analysis results
+        Whether the exam is complete with the updated coverage
     """
-    # Get session and related data
     session = exam_service.get_student_session(session_id)
     if session is None:
-        raise ValueError("Session not found")
+        return False
+    rubric = compiled.parsed
+
+    coverage_result = await coverage_service.analyze_coverage(
+        response=response_text,
+        question=question,
+        rubric=rubric,
+        current_coverage=session.rubric_coverage,
+        target_criteria=target_criteria,
+        compiled=compiled,
+    )
+    coverage_service.enqueue_coverage_analysis(
+        transcript_entry_id=response_entry_id,
+        criteria_covered=coverage_result.newly_covered,
+        coverage_reasoning=coverage_result.reasoning,
+        total_coverage_pct=coverage_result.total_coverage_pct,
+    )
+    exam_service.update_session_coverage(session_id, coverage_result.updated_coverage)
 
-    exam = exam_service.get_exam(session.exam_id)
-    if exam is None:
-        raise ValueError("Exam not found")
+    completion_result = coverage_service.local_completion_verdict(
+        rubric, coverage_result.updated_coverage, compiled=compiled
+    )
+    if completion_result is None:
+        completion_result = await coverage_service.check_completion(
+            rubric=rubric,
+            coverage=coverage_result.updated_coverage,
+            compiled=compiled,
+        )
+    return completion_result.is_complete
 
-    rubric = rubric_service.get_rubric(exam.rubric_id)
-    if rubric is None or rubric.parsed_criteria is None:
-        raise ValueError("Rubric not found or not parsed")
 
-    # Get transcript history and last question
-    transcript = transcript_service.get_session_transcript(session_id)
-    last_question_entry = transcript_service.get_last_question(session_id)
-    last_question = last_question_entry.content if last_question_entry else ""
+async def reconcile_deferred_coverage(session_id: str, consume: bool = True) -> bool:
+    """
+    Wait for the session's deferred coverage analysis, if any.
 
-    # Add the response to the transcript
-    response_entry = transcript_service.add_response(session_id, response_text)
+    Once this returns, the session's stored coverage includes every answer.
 
-    # Run coverage analysis and struggle detection in parallel
-    coverage_task = asyncio.create_task(
-        coverage_service.analyze_coverage(
-            response=response_text,
-            question=last_question,
-            rubric=rubric.parsed_criteria,
-            current_coverage=session.rubric_coverage,
-        )
-    )
+    Args:
+        session_id: Student session ID
+        consume: Forget the analysis afterwards (the next answer does);
+            otherwise its verdict stays available for the next answer
+
+    Returns:
+        Whether the analysis found the exam complete
+    """
+    task = _deferred_coverage.pop(session_id, None) if consume else _deferred_coverage.get(session_id)
+    if task is None:
+        return False
+    try:
+        return await task
+    except Exception:
+        # Coverage for that answer is lost (logged when the analysis failed); the exam carries on
+        return False
+
+
+@serialized
+async def process_student_response(
+    session_id: str,
+    response_text: str,
+    no_speech: bool = False,
+) -> ProcessedResponse:
+    """
+    Process a student response through parallel analysis pipelines.
+
+    With coverage_mode "deferred", coverage analysis of the answer runs in the
+    background after the next question is returned. The following answer
+    first reconciles it into the session coverage; if the exam turned out to
+    be complete, that answer is recorded as the final turn. The analysis runs
+    in this process only and is lost if the server restarts before it ends.
 
-    struggle_task = asyncio.create_task(
-        struggle_service.detect_struggle(
+    Args:
+        session_id: Student session ID
+        response_text: The student's transcribed response
+        no_speech: The recording was silent; record a silence struggle and
+            skip the coverage and struggle-detection LLM calls
+
+    Returns:
+        ProcessedResponse with next question, analysis results and per-stage timings
+    """
+    timer = StageTimer("response")
+    deferred = get_settings().coverage_mode == "deferred"
+    if deferred:
+        # Fold the previous answer's coverage in before reading the session
+        with timer.stage("reconcile"):
+            completed_by_previous = await reconcile_deferred_coverage(session_id)
+    else:
+        completed_by_previous = False
+
+    with timer.stage("load"):
+        # Get session and related data
+        session = exam_service.get_student_session(session_id)
+        if session is None:
+            raise ValueError("Session not found")
+        if session.status != SessionStatus.ACTIVE:
+            # Ended while this action waited for the session's previous one
+            raise SessionNotActiveError(session_id)
+
+        exam = exam_service.get_exam(session.exam_id)
+        if exam is None:
+            raise ValueError("Exam not found")
+
+        compiled = rubric_service.get_compiled_rubric(exam.rubric_id)
+        if compiled is None:
+            raise ValueError("Rubric not found or not parsed")
+        rubric = compiled.parsed
+
+        # Get transcript history and last question
+        transcript = transcript_service.get_session_transcript(session_id)
+        last_question_entry = transcript_service.get_last_question(session_id)
+        last_question = last_question_entry.content if last_question_entry else ""
+
+    if no_speech:
+        response_text = response_text or NO_SPEECH_RESPONSE
+
+    with timer.stage("record_response"):
+        # Add the response to the transcript
+        response_entry = transcript_service.add_response(session_id, response_text)
+    metrics.record_answer()
+
+    deferred_coverage = deferred and not no_speech
+    if no_speech:
+        coverage_result, struggle_event = _silence_analysis(
+            session.rubric_coverage, rubric
+        )
+    elif deferred_coverage:
+        # Analyze coverage in the background; this answer is judged on the coverage so far
+        task = asyncio.create_task(_analyze_coverage_deferred(
+            session_id=session_id,
+            response_entry_id=response_entry.id,
+            response_text=response_text,
+            question=last_question,
+            target_criteria=session.skip_state.get("current_criteria"),
+            compiled=compiled,
+        ))
+        _deferred_coverage[session_id] = task
+        task.add_done_callback(lambda t: _deferred_coverage_done(session_id, t))
+        struggle_event = await timer.timed("struggle", struggle_service.detect_struggle(
             response=response_text,
             question=last_question,
             history=transcript,
-        )
-    )
-
-    # Wait for both to complete
-    coverage_result, struggle_event = await asyncio.gather(coverage_task, struggle_task)
-
-    # Store coverage analysis
-    coverage_service.create_coverage_analysis(
-        transcript_entry_id=response_entry.id,
-        criteria_covered=coverage_result.newly_covered,
-        coverage_reasoning=coverage_result.reasoning,
-        total_coverage_pct=coverage_result.total_coverage_pct,
-    )
+            compiled=compiled,
+            summary=session.transcript_summary,
+        ))
+        coverage_result = _unchanged_coverage(session.rubric_coverage, rubric, "Coverage analysis deferred")
+    else:
+        # Run coverage analysis and struggle detection in parallel
+        coverage_task = asyncio.create_task(timer.timed(
+            "coverage", coverage_service.analyze_coverage(
+                response=response_text,
+                question=last_question,
+                rubric=rubric,
+                current_coverage=session.rubric_coverage,
+                target_criteria=session.skip_state.get("current_criteria"),
+                compiled=compiled,
+            )
+        ))
+
+        struggle_task = asyncio.create_task(timer.timed(
+            "struggle", struggle_service.detect_struggle(
+                response=response_text,
+                question=last_question,
+                history=transcript,
+                compiled=compiled,
+                summary=session.transcript_summary,
+            )
+        ))
+
+        # Wait for both to complete
+        coverage_result, struggle_event = await asyncio.gather(coverage_task, struggle_task)
+
+    with timer.stage("persist"):
+        if not deferred_coverage:
+            # Store coverage analysis (in the background)
+            coverage_service.enqueue_coverage_analysis(
+                transcript_entry_id=response_entry.id,
+                criteria_covered=coverage_result.newly_covered,
+                coverage_reasoning=coverage_result.reasoning,
+                total_coverage_pct=coverage_result.total_coverage_pct,
+            )
 
-    # Update session coverage
-    exam_service.update_session_coverage(session_id, coverage_result.updated_coverage)
+            # Update session coverage
+            exam_service.update_session_coverage(session_id, coverage_result.updated_coverage)
+        scheduler = criterion_scheduler.get_session_scheduler(session, compiled)
+        scheduler.update_coverage(coverage_result.updated_coverage)
+
+        if struggle_event is not None:
+            # Create and persist the struggle event
+            persisted_event = struggle_service.create_struggle_event(
+                session_id=session_id,
+                transcript_entry_id=response_entry.id,
+                struggle_type=struggle_event.struggle_type,
+                severity=struggle_event.severity,
+                llm_reasoning=struggle_event.llm_reasoning,
+            )
+            struggle_event = persisted_event
 
-    # Handle struggle event if detected
     teacher_message: Optional[str] = None
     is_adapted = False
 
-    if struggle_event is not None:
-        # Create and persist the struggle event
-        persisted_event = struggle_service.create_struggle_event(
-            session_id=session_id,
-            transcript_entry_id=response_entry.id,
-            struggle_type=struggle_event.struggle_type,
-            severity=struggle_event.severity,
-            llm_reasoning=struggle_event.llm_reasoning,
-        )
-        struggle_event = persisted_event
-
-    # Check if exam should be complete
-    completion_result = await coverage_service.check_completion(
-        rubric=rubric.parsed_criteria,
-        coverage=coverage_result.updated_coverage,
-    )
+    # Check if exam should be complete (silence cannot have changed coverage)
+    if deferred:
+        # Verdict of the previous answer's deferred analysis; this answer was the final turn
+        is_complete = completed_by_previous
+    elif no_speech:
+        is_complete = False
+    else:
+        completion_result = await timer.timed("completion", coverage_service.check_completion(
+            rubric=rubric,
+            coverage=coverage_result.updated_coverage,
+            compiled=compiled,
+        ))
+        is_complete = completion_result.is_complete
 
-    if completion_result.is_complete:
-        # Exam is complete for this student
-        exam_service.complete_session(session_id)
+    if is_complete:
+        with timer.stage("write"):
+            # Exam is complete for this student
+            exam_service.complete_session(session_id)
+            criterion_scheduler.drop_session_scheduler(session_id)
+            _release_deferred_coverage(session_id)
+            question_number = transcript_service.count_questions(session_id)
 
         return ProcessedResponse(
             next_question="",
-            question_number=transcript_service.count_questions(session_id),
+            question_number=question_number,
             is_final=True,
             is_adapted=False,
             coverage_pct=coverage_result.total_coverage_pct,
             struggle_event=struggle_event,
             teacher_message=None,
+            stage_timings=timer.finish(),
         )
 
     # Generate next question
-    # Get updated transcript with the response we just added
-    updated_transcript = transcript_service.get_session_transcript(session_id)
+    with timer.stage("load"):
+        # Get updated transcript with the response we just added
+        updated_transcript = transcript_service.get_session_transcript(session_id)
 
+    skip_state = session.skip_state.copy()
+    if struggle_event is not None and skip_state.get("current_criteria"):
+        # The adapted question stays on the current criteria
+        targets = None
+        current_criteria = skip_state["current_criteria"]
+    else:
+        targets = scheduler.top_k(MAX_TARGET_CRITERIA)
+        current_criteria = [c.id for c in targets]
+
+    generated: Optional[question_service.GeneratedQuestion] = None
     if struggle_event is not None:
-        # Generate adapted question
-        next_question = await struggle_service.generate_adapted_question(
-            original_question=last_question,
-            struggle_event=struggle_event,
-            history=updated_transcript,
-        )
+        # Serve the pre-generated simplified variant when it fits the struggle
+        variant = _take_variant(skip_state, last_question_entry)
+        if variant is not None and struggle_event.struggle_type in VARIANT_STRUGGLE_TYPES:
+            next_question = variant
+        else:
+            next_question = await timer.timed("adapt", struggle_service.generate_adapted_question(
+                original_question=last_question,
+                struggle_event=struggle_event,
+                history=updated_transcript,
+                summary=session.transcript_summary,
+            ))
         is_adapted = True
 
         # Mark that question was adapted
-        struggle_service.mark_question_adapted(struggle_event.id)
+        struggle_service.enqueue_mark_question_adapted(struggle_event.id)
     else:
         # Generate normal next question
-        next_question = await question_service.generate_question(
-            rubric=rubric.parsed_criteria,
+        generated = await timer.timed("generate", question_service.generate_question(
             transcript=updated_transcript,
             coverage=coverage_result.updated_coverage,
-        )
-
-    # Add the question to the transcript
-    transcript_service.add_question(session_id, next_question)
-    question_number = transcript_service.count_questions(session_id)
-
-    # Update skip state for the newly generated question
-    skip_state = session.skip_state.copy()
-    skip_state["has_submitted_in_session"] = True
-    if struggle_event is not None and skip_state.get("current_criteria"):
-        current_criteria = skip_state.get("current_criteria", [])
-    else:
-        current_criteria = [
-            c.id for c in question_service.select_target_criteria(
-                rubric=rubric.parsed_criteria,
-                coverage=coverage_result.updated_coverage,
-            )[:5]
-        ]
-    skip_state["current_criteria"] = current_criteria
-    skip_state["has_submitted_for_current"] = False
-    skip_state["current_question_is_adapted"] = is_adapted
-    exam_service.update_session_skip_state(session_id, skip_state)
+            targets=targets,
+            compiled=compiled,
+            summary=session.transcript_summary,
+        ))
+        next_question = generated.text
+
+    with timer.stage("write"):
+        # Add the question to the transcript
+        question_entry = transcript_service.add_question(session_id, next_question)
+        if generated is not None:
+            _store_variant(skip_state, question_entry, generated)
+        question_number = transcript_service.count_questions(session_id)
+
+        # Fold older exchanges into the rolling summary in the background
+        summary_service.schedule_summary_update(session, len(updated_transcript) + 1)
+
+        # Update skip state for the newly generated question
+        scheduler.mark_targeted(current_criteria)
+        skip_state.update(scheduler.recency_state())
+        skip_state["has_submitted_in_session"] = True
+        skip_state["current_criteria"] = current_criteria
+        skip_state["has_submitted_for_current"] = False
+        skip_state["current_question_is_adapted"] = is_adapted
+        exam_service.update_session_skip_state(session_id, skip_state)
 
     return ProcessedResponse(
         next_question=next_question,
@@ -195,43 +486,135 @@ async def process_student_response(
         coverage_pct=coverage_result.total_coverage_pct,
         struggle_event=struggle_event,
         teacher_message=teacher_message,
+        stage_timings=timer.finish(),
     )
 
 
-async def start_student_session(
+# Answers submitted in async mode are processed on their own job queue
+ANSWER_JOB = "process_answer"
+ANSWER_QUEUE = "answers"
+
+
+def submit_response_job(
     session_id: str,
-    rubric: ParsedRubric,
+    question: str,
+    response_text: str,
+    no_speech: bool = False,
 ) -> str:
     """
-    Start a student session by generating the first question.
+    Queue a student response for processing (async submission mode).
+
+    The job is keyed by the question the client says it is answering, so a
+    retried submission returns the existing job (even once it is done and
+    the session has moved on) instead of processing the answer twice.
 
     Args:
         session_id: Student session ID
-        rubric: Parsed rubric for the exam
+        question: Text of the question being answered, as sent by the client
+        response_text: The student's transcribed response
+        no_speech: The recording was silent
 
     Returns:
-        The first question text
+        Job ID; the finished job's result holds the ProcessedResponse fields
+        the student sees (see answer_job_result)
+
+    Raises:
+        QuestionMismatchError: If there is no job for the question and it is
+            not the current question
     """
-    # Generate the first question
-    first_question = await question_service.generate_first_question(rubric)
+    question_hash = hashlib.sha256(question.encode("utf-8")).hexdigest()
+    job_key = f"{ANSWER_JOB}:{session_id}:{question_hash}"
+    existing = jobs.get_job_by_key(job_key)
+    if existing is not None:
+        return existing.id
+
+    last_question = transcript_service.get_last_question(session_id)
+    if last_question is None or last_question.content != question:
+        raise QuestionMismatchError(session_id)
+
+    return jobs.enqueue(
+        ANSWER_JOB,
+        {"session_id": session_id, "response_text": response_text, "no_speech": no_speech},
+        priority=jobs.PRIORITY_HIGH,
+        job_key=job_key,
+        # Never rerun a half-processed answer
+        max_attempts=1,
+        queue=ANSWER_QUEUE,
+    )
 
-    # Add to transcript
-    transcript_service.add_question(session_id, first_question)
 
-    skip_state = {
-        "has_submitted_for_current": False,
-        "has_submitted_in_session": False,
-        "current_question_is_adapted": False,
-        "current_criteria": [c.id for c in question_service.select_target_criteria(
-            rubric=rubric,
-            coverage=CoverageMap(),
-        )[:5]],
-        "skipped_criteria": [],
+def answer_job_result(result: ProcessedResponse) -> dict:
+    """The JSON result stored for a processed answer job."""
+    return {
+        "next_question": result.next_question,
+        "question_number": result.question_number,
+        "is_final": result.is_final,
+        "is_adapted": result.is_adapted,
+        "teacher_message": result.teacher_message,
     }
-    exam_service.update_session_skip_state(session_id, skip_state)
 
-    return first_question
 
+async def _process_answer_job(payload: dict) -> dict:
+    result = await process_student_response(
+        session_id=payload["session_id"],
+        response_text=payload["response_text"],
+        no_speech=payload["no_speech"],
+    )
+    return answer_job_result(result)
+
+
+jobs.register_handler(ANSWER_JOB, _process_answer_job)
+
+
+@serialized
+async def start_student_session(session_id: str, compiled: CompiledRubric) -> ProcessedResponse:
+    """
+    Start a student session by generating the first question.
+
+    Args:
+        session_id: Student session ID
+        compiled: Compiled rubric for the exam
+
+    Returns:
+        ProcessedResponse with the first question and per-stage timings
+    """
+    timer = StageTimer("start")
+
+    # Generate the first question
+    generated = await timer.timed(
+        "generate", question_service.generate_first_question(compiled.parsed, compiled=compiled)
+    )
+    first_question = generated.text
+
+    with timer.stage("write"):
+        # Add to transcript
+        question_entry = transcript_service.add_question(session_id, first_question)
+
+        skip_state = {
+            "has_submitted_for_current": False,
+            "has_submitted_in_session": False,
+            "current_question_is_adapted": False,
+            "skipped_criteria": [],
+        }
+        _store_variant(skip_state, question_entry, generated)
+        scheduler = criterion_scheduler.get_session_scheduler(
+            exam_service.get_student_session(session_id), compiled
+        )
+        skip_state["current_criteria"] = [c.id for c in scheduler.top_k(MAX_TARGET_CRITERIA)]
+        scheduler.mark_targeted(skip_state["current_criteria"])
+        skip_state.update(scheduler.recency_state())
+        exam_service.update_session_skip_state(session_id, skip_state)
+
+    return ProcessedResponse(
+        next_question=first_question,
+        question_number=1,
+        is_final=False,
+        is_adapted=False,
+        coverage_pct=0.0,
+        struggle_event=None,
+        teacher_message=None,
+        stage_timings=timer.finish(),
+    )
 
 async def get_pending_question(session_id: str) -> Optional[str]:
     """
@@ -256,6 +639,7 @@ async def get_pending_question(session_id: str) -> Optional[str]:
     return None
 
 
+@serialized
 async def process_skip_request(session_id: str) -> ProcessedResponse:
     """
     Process a skip request from a student.
@@ -264,149 +648,215 @@ async def process_skip_request(session_id: str) -> ProcessedResponse:
     1. If current question is NOT adapted -> Generate adapted version of same question
     2. If current question IS already adapted -> Move to new topic, mark criterion as not covered
 
+    On a second skip the completion verdict comes first: clear-cut cases are
+    decided locally, otherwise the LLM verdict runs concurrently with question
+    generation, which is cancelled if the exam turns out to be complete. A
+    question is only recorded for sessions that continue.
+
     Args:
         session_id: Student session ID
 
     Returns:
-        ProcessedResponse with next question
+        ProcessedResponse with next question and per-stage timings
     """
-    # Get session and related data
-    session = exam_service.get_student_session(session_id)
-    if session is None:
-        raise ValueError("Session not found")
-
-    exam = exam_service.get_exam(session.exam_id)
-    if exam is None:
-        raise ValueError("Exam not found")
-
-    rubric = rubric_service.get_rubric(exam.rubric_id)
-    if rubric is None or rubric.parsed_criteria is None:
-        raise ValueError("Rubric not found or not parsed")
+    timer = StageTimer("skip")
+
+    if get_settings().coverage_mode == "deferred":
+        # Skips decide on the latest coverage; the verdict stays for the next answer
+        with timer.stage("reconcile"):
+            await reconcile_deferred_coverage(session_id, consume=False)
+
+    with timer.stage("load"):
+        # Get session and related data
+        session = exam_service.get_student_session(session_id)
+        if session is None:
+            raise ValueError("Session not found")
+        if session.status != SessionStatus.ACTIVE:
+            raise SessionNotActiveError(session_id)
+
+        exam = exam_service.get_exam(session.exam_id)
+        if exam is None:
+            raise ValueError("Exam not found")
+
+        compiled = rubric_service.get_compiled_rubric(exam.rubric_id)
+        if compiled is None:
+            raise ValueError("Rubric not found or not parsed")
+        rubric = compiled.parsed
+
+        # Get skip state
+        skip_state = session.skip_state.copy()
+        current_is_adapted = skip_state.get("current_question_is_adapted", False)
+        skipped_criteria = skip_state.get("skipped_criteria", [])
+        current_criteria = skip_state.get("current_criteria", [])
 
-    # Get skip state
-    skip_state = session.skip_state.copy()
-    current_is_adapted = skip_state.get("current_question_is_adapted", False)
-    skipped_criteria = skip_state.get("skipped_criteria", [])
-    current_criteria = skip_state.get("current_criteria", [])
+        # Get transcript and last question
+        transcript = transcript_service.get_session_transcript(session_id)
+        last_question_entry = transcript_service.get_last_question(session_id)
+        last_question = last_question_entry.content if last_question_entry else ""
 
-    # Get transcript and last question
-    transcript = transcript_service.get_session_transcript(session_id)
-    last_question_entry = transcript_service.get_last_question(session_id)
-    last_question = last_question_entry.content if last_question_entry else ""
-
-    # Create a skip struggle event
-    skip_event = struggle_service.create_struggle_event(
-        session_id=session_id,
-        transcript_entry_id=last_question_entry.id if last_question_entry else "",
-        struggle_type=StruggleType.SKIP,
-        severity=Severity.MEDIUM if current_is_adapted else Severity.LOW,
-        llm_reasoning="Student skipped this question" + (
-            " (second skip - moving to new topic)" if current_is_adapted else " (adapting question)"
-        ),
-        question_adapted=not current_is_adapted,
-    )
+    with timer.stage("record_skip"):
+        # Create a skip struggle event
+        skip_event = struggle_service.create_struggle_event(
+            session_id=session_id,
+            transcript_entry_id=last_question_entry.id if last_question_entry else "",
+            struggle_type=StruggleType.SKIP,
+            severity=Severity.MEDIUM if current_is_adapted else Severity.LOW,
+            llm_reasoning="Student skipped this question" + (
+                " (second skip - moving to new topic)" if current_is_adapted else " (adapting question)"
+            ),
+            question_adapted=not current_is_adapted,
+        )
 
     # Calculate current coverage percentage
     coverage_pct = 0.0
     if session.rubric_coverage.covered_criteria:
-        total_criteria = len(rubric.parsed_criteria.criteria)
+        total_criteria = len(rubric.criteria)
         if total_criteria > 0:
             coverage_pct = sum(session.rubric_coverage.covered_criteria.values()) / total_criteria
 
     if not current_is_adapted:
-        # First skip: Generate adapted version of same question
-        next_question = await struggle_service.generate_adapted_question(
-            original_question=last_question,
-            struggle_event=skip_event,
-            history=transcript,
-        )
-
-        # Update skip state
-        skip_state["current_question_is_adapted"] = True
-        skip_state["has_submitted_for_current"] = False
-        if not current_criteria:
-            skip_state["current_criteria"] = [
-                c.id for c in question_service.select_target_criteria(
-                    rubric=rubric.parsed_criteria,
-                    coverage=session.rubric_coverage,
-                )[:5]
-            ]
-        exam_service.update_session_skip_state(session_id, skip_state)
-
-        # Add adapted question to transcript with a system note
-        transcript_service.add_system_note(session_id, "Student requested skip - question adapted")
-        transcript_service.add_question(session_id, next_question)
+        # First skip: serve the pre-generated simplified variant, or adapt the question live
+        next_question = _take_variant(skip_state, last_question_entry)
+        if next_question is None:
+            next_question = await timer.timed("adapt", struggle_service.generate_adapted_question(
+                original_question=last_question,
+                struggle_event=skip_event,
+                history=transcript,
+                summary=session.transcript_summary,
+            ))
+
+        with timer.stage("persist"):
+            # Update skip state
+            skip_state["current_question_is_adapted"] = True
+            skip_state["has_submitted_for_current"] = False
+            if not current_criteria:
+                scheduler = criterion_scheduler.get_session_scheduler(session, compiled)
+                skip_state["current_criteria"] = [c.id for c in scheduler.top_k(MAX_TARGET_CRITERIA)]
+            exam_service.update_session_skip_state(session_id, skip_state)
+
+            # Add adapted question to transcript with a system note
+            transcript_service.add_system_note(session_id, "Student requested skip - question adapted")
+            transcript_service.add_question(session_id, next_question)
+            question_number = transcript_service.count_questions(session_id)
 
         return ProcessedResponse(
             next_question=next_question,
-            question_number=transcript_service.count_questions(session_id),
+            question_number=question_number,
             is_final=False,
             is_adapted=True,
             coverage_pct=coverage_pct,
             struggle_event=skip_event,
             teacher_message="Question adapted after skip",
-        )
-    else:
-        # Second skip: Move to new topic, mark as not covered
-        transcript_service.add_system_note(
-            session_id,
-            "Student skipped twice - moving to new topic"
+            stage_timings=timer.finish(),
         )
 
-        if current_criteria:
-            for criterion_id in current_criteria:
-                if criterion_id not in skipped_criteria:
-                    skipped_criteria.append(criterion_id)
+    # Second skip: Move to new topic, mark as not covered
+    transcript_service.add_system_note(
+        session_id,
+        "Student skipped twice - moving to new topic"
+    )
 
-        # Generate question for a DIFFERENT topic (excluding skipped criteria)
-        next_question = await question_service.generate_question_excluding_criteria(
-            rubric=rubric.parsed_criteria,
-            transcript=transcript,
-            coverage=session.rubric_coverage,
-            exclude_criteria=skipped_criteria,
+    if current_criteria:
+        for criterion_id in current_criteria:
+            if criterion_id not in skipped_criteria:
+                skipped_criteria.append(criterion_id)
+
+    scheduler = criterion_scheduler.get_session_scheduler(session, compiled)
+    targets = scheduler.top_k(MAX_TARGET_CRITERIA, exclude=skipped_criteria)
+
+    # Completion verdict first: it decides whether a new question is needed at all
+    with timer.stage("completion_local"):
+        completion_result = coverage_service.local_completion_verdict(
+            rubric, session.rubric_coverage, skipped_criteria, compiled
         )
 
-        # Update skip state
-        skip_state["current_question_is_adapted"] = False
-        skip_state["has_submitted_for_current"] = False
-        skip_state["skipped_criteria"] = skipped_criteria
-        skip_state["current_criteria"] = [
-            c.id for c in question_service.select_target_criteria(
-                rubric=rubric.parsed_criteria,
+    async def generate_new_topic() -> question_service.GeneratedQuestion:
+        # Generate question for a DIFFERENT topic (excluding skipped criteria)
+        with timer.stage("generate"):
+            return await question_service.generate_question_excluding_criteria(
+                rubric=rubric,
+                transcript=transcript,
                 coverage=session.rubric_coverage,
                 exclude_criteria=skipped_criteria,
-            )[:5]
-        ]
-        exam_service.update_session_skip_state(session_id, skip_state)
+                targets=targets,
+                compiled=compiled,
+                summary=session.transcript_summary,
+            )
 
-        # Add new question to transcript
-        transcript_service.add_question(session_id, next_question)
+    generation_task: Optional[asyncio.Task] = None
+    if completion_result is None:
+        # Ask the LLM while the question is generated speculatively
+        generation_task = asyncio.create_task(generate_new_topic())
+        try:
+            completion_result = await timer.timed(
+                "completion", coverage_service.check_completion_with_exclusions(
+                    rubric=rubric,
+                    coverage=session.rubric_coverage,
+                    excluded_criteria=skipped_criteria,
+                    compiled=compiled,
+                )
+            )
+        except BaseException:
+            _cancel(generation_task)
+            raise
+    elif not completion_result.is_complete:
+        generation_task = asyncio.create_task(generate_new_topic())
 
-        # Check if exam should be complete (with remaining criteria)
-        completion_result = await coverage_service.check_completion_with_exclusions(
-            rubric=rubric.parsed_criteria,
-            coverage=session.rubric_coverage,
-            excluded_criteria=skipped_criteria,
-        )
+    skip_state["current_question_is_adapted"] = False
+    skip_state["has_submitted_for_current"] = False
+    skip_state["skipped_criteria"] = skipped_criteria
 
-        if completion_result.is_complete:
+    if completion_result.is_complete:
+        if generation_task is not None:
+            _cancel(generation_task)
+        with timer.stage("persist"):
+            skip_state["current_criteria"] = []
+            skip_state.pop(SIMPLIFIED_VARIANT_KEY, None)
+            exam_service.update_session_skip_state(session_id, skip_state)
             exam_service.complete_session(session_id)
-            return ProcessedResponse(
-                next_question="",
-                question_number=transcript_service.count_questions(session_id),
-                is_final=True,
-                is_adapted=False,
-                coverage_pct=coverage_pct,
-                struggle_event=skip_event,
-                teacher_message=None,
-            )
+            criterion_scheduler.drop_session_scheduler(session_id)
+            _release_deferred_coverage(session_id)
+            question_number = transcript_service.count_questions(session_id)
 
         return ProcessedResponse(
-            next_question=next_question,
-            question_number=transcript_service.count_questions(session_id),
-            is_final=False,
+            next_question="",
+            question_number=question_number,
+            is_final=True,
             is_adapted=False,
             coverage_pct=coverage_pct,
             struggle_event=skip_event,
-            teacher_message="Moving to a new topic",
+            teacher_message=None,
+            stage_timings=timer.finish(),
         )
+
+    generated = await generation_task
+    next_question = generated.text
+
+    with timer.stage("persist"):
+        # Add new question to transcript
+        question_entry = transcript_service.add_question(session_id, next_question)
+
+        # Update skip state
+        skip_state["current_criteria"] = [c.id for c in targets]
+        _store_variant(skip_state, question_entry, generated)
+        scheduler.mark_targeted(skip_state["current_criteria"])
+        skip_state.update(scheduler.recency_state())
+        exam_service.update_session_skip_state(session_id, skip_state)
+        question_number = transcript_service.count_questions(session_id)
+
+    return ProcessedResponse(
+        next_question=next_question,
+        question_number=question_number,
+        is_final=False,
+        is_adapted=False,
+        coverage_pct=coverage_pct,
+        struggle_event=skip_event,
+        teacher_message="Moving to a new topic",
+        stage_timings=timer.finish(),
+    )
+
+
+def _cancel(task: asyncio.Task) -> None:
+    """Cancel a speculative task, retrieving its outcome so errors aren't reported."""
+    task.cancel()
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
@@ -0,0 +1,120 @@
+"""
+Question Prefetch Service
+
+Post-generation pipeline stage: as soon as a question is recorded, translate it
+into the session's language and synthesize it with the teacher's voice in the
+background, so the student's /translate and /tts requests hit warm caches.
+
+Prefetches are plain asyncio tasks rather than queued jobs: they are only
+useful within seconds of the question being recorded, and a lost one just
+means the student's own request fills the cache.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Optional
+
+from app.config import get_settings
+from app.models.domain import SessionStatus, TranscriptEntry
+from app.services import exam as exam_service
+from app.services import tts as tts_service
+from app.services import voice as voice_service
+
+logger = logging.getLogger(__name__)
+
+# Keep references so in-flight prefetches aren't garbage collected
+_background_tasks: set[asyncio.Task] = set()
+_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(get_settings().question_prefetch_concurrency)
+    return _semaphore
+
+
+def schedule_question_prefetch(entry: TranscriptEntry) -> Optional[asyncio.Task]:
+    """
+    Question listener: start translation and synthesis for a new question.
+
+    The session lookup runs inline (it is a couple of cheap queries); the
+    LLM and ElevenLabs calls run as a background task, with at most
+    question_prefetch_concurrency running at once.
+
+    Args:
+        entry: The question transcript entry that was just added
+
+    Returns:
+        The scheduled task, or None if there is nothing to prefetch
+    """
+    if not get_settings().question_prefetch_enabled:
+        return None
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return None  # Not inside the event loop (e.g. seed scripts)
+
+    session = exam_service.get_student_session(entry.session_id)
+    if session is None or session.status != SessionStatus.ACTIVE:
+        return None
+
+    language = session.language
+    if language not in tts_service.SUPPORTED_LANGUAGES:
+        language = "en"
+
+    voice_id: Optional[str] = None
+    if os.environ.get("ELEVENLABS_API_KEY"):
+        exam = exam_service.get_exam(session.exam_id)
+        if exam is not None:
+            voice_id = voice_service.get_voice_for_language(exam.teacher_id, language)
+
+    nothing_to_translate = language == "en" and not get_settings().question_prefetch_all_languages
+    if nothing_to_translate and voice_id is None:
+        return None  # Nothing to translate and no way to synthesize
+
+    task = loop.create_task(_bounded_prefetch(entry.content, language, voice_id))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+async def _bounded_prefetch(question: str, language: str, voice_id: Optional[str]) -> None:
+    async with _get_semaphore():
+        await prefetch_question(question, language, voice_id)
+
+
+async def prefetch_question(
+    question: str,
+    language: str,
+    voice_id: Optional[str],
+) -> None:
+    """
+    Translate and synthesize a question ahead of the student asking for it.
+
+    Args:
+        question: Question text as recorded in the transcript
+        language: Session language code
+        voice_id: Teacher's voice for the language, or None to skip synthesis
+    """
+    translated: Optional[str] = None
+
+    try:
+        if get_settings().question_prefetch_all_languages:
+            translations = await tts_service.translate_text_batch(question)
+            translated = translations.get(language)
+        elif language != "en":
+            translated = await tts_service.translate_text(question, language)
+
+        if voice_id is not None:
+            await tts_service.get_cached_speech(
+                question,
+                language=language,
+                voice_id=voice_id,
+                translated_text=translated,
+            )
+    except Exception as e:
+        # Best effort: the student's own request will retry on a miss
+        logger.warning("Question prefetch failed (%s): %s", language, e)
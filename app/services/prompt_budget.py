@@ -0,0 +1,88 @@
+"""
+Prompt Budget
+
+Rough token accounting for the variable parts of LLM prompts, so long exams
+and long answers cannot grow prompts without bound. Conversation context is
+rendered as the session's rolling summary plus as many recent transcript
+entries as fit the call site's budget.
+"""
+
+import math
+from typing import Optional
+
+from app.models.domain import TranscriptEntry, TranscriptSummary
+
+# Average characters per token for English/European text
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in a text."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Cut a text to roughly max_tokens, marking the cut with "...".
+
+    Args:
+        text: Text to shorten
+        max_tokens: Token budget for the text
+
+    Returns:
+        The text unchanged if it fits, otherwise its truncated head
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    max_chars = max(max_tokens * CHARS_PER_TOKEN - 3, 0)
+    return text[:max_chars].rstrip() + "..."
+
+
+def render_history(
+    history: list[TranscriptEntry],
+    budget_tokens: int,
+    entry_max_tokens: int,
+    summary: Optional[TranscriptSummary] = None,
+    empty_text: str = "No previous history",
+) -> str:
+    """
+    Render conversation context within a token budget.
+
+    The summary (if any) comes first and may use up to half the budget; the
+    remainder is filled with the most recent entries not covered by the
+    summary, each truncated to entry_max_tokens. Older entries that do not
+    fit are dropped.
+
+    Args:
+        history: Transcript entries, oldest first
+        budget_tokens: Token budget for the rendered context
+        entry_max_tokens: Token budget for a single entry
+        summary: Rolling summary of the start of the transcript
+        empty_text: Text to return when there is no context
+
+    Returns:
+        The rendered context
+    """
+    parts: list[str] = []
+    remaining = budget_tokens
+    start = 0
+
+    if summary is not None and summary.text:
+        summary_text = "Summary of earlier conversation: " + truncate_to_tokens(summary.text, budget_tokens // 2)
+        parts.append(summary_text)
+        remaining -= estimate_tokens(summary_text)
+        start = min(summary.entry_count, len(history))
+
+    lines: list[str] = []
+    for entry in reversed(history[start:]):
+        line = f"[{entry.entry_type.value}]: {truncate_to_tokens(entry.content, entry_max_tokens)}"
+        cost = estimate_tokens(line)
+        if cost > remaining:
+            break
+        lines.append(line)
+        remaining -= cost
+
+    if lines:
+        parts.append("\n".join(reversed(lines)))
+
+    return "\n\n".join(parts) or empty_text
@@ -4,15 +4,23 @@ Question Generation Service
 Handles dynamic question generation based on rubric and conversation context.
 """
 
+import logging
+from dataclasses import dataclass
 from typing import Optional
 
+from app.config import get_settings
 from app.models.domain import (
     Criterion,
     ParsedRubric,
     CoverageMap,
     TranscriptEntry,
+    TranscriptSummary,
 )
-from app.services.llm_client import get_llm_client
+from app.services.compiled_rubric import CompiledRubric
+from app.services.llm_client import LLMClient, get_llm_client
+from app.services.prompt_budget import render_history
+
+logger = logging.getLogger(__name__)
 
 
 GENERATE_QUESTION_SYSTEM_PROMPT = """You are an expert oral examiner conducting an academic assessment.
@@ -47,39 +55,120 @@ Guidelines:
 Return only the question text, nothing else. Do not include prefixes like "Question:" or numbers.
 """
 
+_QUESTION_TEXT_FORMAT = 'Return only the question text, nothing else. Do not include prefixes like "Question:" or numbers.\n'
+
+_QUESTION_WITH_VARIANT_FORMAT = """Also write a simplified variant of the same question, to offer instantly if the student struggles or skips it:
+- Same topic and criteria, but simpler wording and a narrower scope
+- It may give a hint or a concrete starting point
+
+Return JSON only, in this format:
+{"question": "<the question>", "simplified": "<the simplified variant>"}
+Do not include prefixes like "Question:" or numbers in either text.
+"""
+
+# Same prompts, asking for the question and its simplified variant in one call
+GENERATE_QUESTION_WITH_VARIANT_SYSTEM_PROMPT = GENERATE_QUESTION_SYSTEM_PROMPT.replace(
+    _QUESTION_TEXT_FORMAT, _QUESTION_WITH_VARIANT_FORMAT
+)
+GENERATE_FIRST_QUESTION_WITH_VARIANT_SYSTEM_PROMPT = GENERATE_FIRST_QUESTION_SYSTEM_PROMPT.replace(
+    _QUESTION_TEXT_FORMAT, _QUESTION_WITH_VARIANT_FORMAT
+)
+
+
+@dataclass
+class GeneratedQuestion:
+    """A generated question and, when available, its simplified variant."""
+    text: str
+    simplified: Optional[str] = None
+
+
+async def _complete_question(
+    client: LLMClient,
+    prompt: str,
+    system_prompt: str,
+    variant_system_prompt: str,
+    temperature: float,
+    cached_prefix: Optional[str],
+    call_site: str,
+) -> GeneratedQuestion:
+    """
+    Generate a question, with its simplified variant when enabled.
+
+    Falls back to a plain question if the structured reply can't be parsed.
+    """
+    if get_settings().question_variant_enabled:
+        try:
+            result = await client.complete_json(
+                prompt=prompt,
+                system_prompt=variant_system_prompt,
+                temperature=temperature,
+                cached_prefix=cached_prefix,
+                call_site=call_site,
+            )
+            text = str(result.get("question") or "").strip()
+            if text:
+                simplified = str(result.get("simplified") or "").strip()
+                return GeneratedQuestion(text=text, simplified=simplified or None)
+        except (ValueError, AttributeError) as e:
+            logger.warning("Structured question reply unusable, retrying as plain text: %s", e)
+
+    question = await client.complete(
+        prompt=prompt,
+        system_prompt=system_prompt,
+        temperature=temperature,
+        cached_prefix=cached_prefix,
+        call_site=call_site,
+    )
+    return GeneratedQuestion(text=question.strip())
+
+
+
+def _targets_block(
+    criteria: list[Criterion],
+    coverage: CoverageMap,
+    compiled: Optional[CompiledRubric],
+) -> str:
+    if compiled is not None:
+        return compiled.targets_block(criteria, coverage)
+    return "\n".join([
+        f"- {c.name}: {c.description} (coverage: {coverage.covered_criteria.get(c.id, 0)*100:.0f}%)"
+        for c in criteria
+    ])
+
 
 async def generate_question(
-    rubric: ParsedRubric,
     transcript: list[TranscriptEntry],
     coverage: CoverageMap,
-) -> str:
+    targets: list[Criterion],
+    compiled: Optional[CompiledRubric] = None,
+    summary: Optional[TranscriptSummary] = None,
+) -> GeneratedQuestion:
     """
     Generate the next contextual question based on rubric and progress.
 
     Args:
-        rubric: Parsed rubric with criteria
         transcript: Conversation history
         coverage: Current coverage state
+        targets: Criteria to target, in priority order (from the session's
+            criterion scheduler)
+        compiled: Compiled form of the rubric, to reuse its rendered lines
+        summary: Rolling summary of the session's earlier transcript
 
     Returns:
-        Generated question text
+        GeneratedQuestion with the question and its simplified variant
     """
     client = get_llm_client()
 
-    target_criteria = select_target_criteria(rubric, coverage)
+    criteria_text = _targets_block(targets[:5], coverage, compiled)  # Limit to top 5
 
-    criteria_text = "\n".join([
-        f"- {c.name}: {c.description} (coverage: {coverage.covered_criteria.get(c.id, 0)*100:.0f}%)"
-        for c in target_criteria[:5]  # Limit to top 5
-    ])
-
-    # Build recent transcript context
-    recent = transcript[-6:] if len(transcript) > 6 else transcript
-    transcript_text = "\n".join([
-        f"[{e.entry_type.value}]: {e.content[:200]}..."
-        if len(e.content) > 200 else f"[{e.entry_type.value}]: {e.content}"
-        for e in recent
-    ]) or "This is the start of the exam."
+    settings = get_settings()
+    transcript_text = render_history(
+        transcript,
+        budget_tokens=settings.prompt_history_tokens_question,
+        entry_max_tokens=settings.prompt_entry_max_tokens,
+        summary=summary,
+        empty_text="This is the start of the exam.",
+    )
 
     prompt = f"""Generate the next question for this oral exam.
 
@@ -91,47 +180,60 @@ RECENT CONVERSATION:
 
 Generate a natural follow-up question that targets the uncovered criteria while building on the conversation."""
 
-    question = await client.complete(
-        prompt=prompt,
-        system_prompt=GENERATE_QUESTION_SYSTEM_PROMPT,
+    return await _complete_question(
+        client,
+        prompt,
+        GENERATE_QUESTION_SYSTEM_PROMPT,
+        GENERATE_QUESTION_WITH_VARIANT_SYSTEM_PROMPT,
         temperature=0.7,
+        cached_prefix=compiled.prompt_prefix if compiled else None,
+        call_site="question",
     )
 
-    return question.strip()
-
 
-async def generate_first_question(rubric: ParsedRubric) -> str:
+async def generate_first_question(
+    rubric: ParsedRubric,
+    compiled: Optional[CompiledRubric] = None,
+) -> GeneratedQuestion:
     """
     Generate the opening question for an exam.
 
     Args:
         rubric: Parsed rubric with criteria
+        compiled: Compiled form of the rubric, to reuse its rendered lines
 
     Returns:
-        Opening question text
+        GeneratedQuestion with the opening question and its simplified variant
     """
     client = get_llm_client()
 
-    criteria_text = "\n".join([
-        f"- {c.name}: {c.description}"
-        for c in rubric.criteria
-    ])
+    if compiled is not None:
+        # The criteria travel in the cached rubric prefix
+        prompt = """Generate an opening question for this oral exam, based on the rubric above.
 
-    prompt = f"""Generate an opening question for this oral exam.
+Generate a welcoming but substantive opening question that starts the assessment."""
+    else:
+        criteria_text = "\n".join([
+            f"- {c.name}: {c.description}"
+            for c in rubric.criteria
+        ])
+        prompt = f"""Generate an opening question for this oral exam.
 
 RUBRIC CRITERIA:
 {criteria_text}
 
 Generate a welcoming but substantive opening question that starts the assessment."""
 
-    question = await client.complete(
-        prompt=prompt,
-        system_prompt=GENERATE_FIRST_QUESTION_SYSTEM_PROMPT,
+    return await _complete_question(
+        client,
+        prompt,
+        GENERATE_FIRST_QUESTION_SYSTEM_PROMPT,
+        GENERATE_FIRST_QUESTION_WITH_VARIANT_SYSTEM_PROMPT,
         temperature=0.6,
+        cached_prefix=compiled.prompt_prefix if compiled else None,
+        call_site="first_question",
     )
 
-    return question.strip()
-
 
 async def generate_synthesis_question(
     rubric: ParsedRubric,
@@ -164,6 +266,7 @@ Generate a question that requires integrating knowledge from multiple areas."""
         prompt=prompt,
         system_prompt=GENERATE_QUESTION_SYSTEM_PROMPT,
         temperature=0.7,
+        call_site="synthesis_question",
     )
 
     return question.strip()
@@ -174,7 +277,10 @@ async def generate_question_excluding_criteria(
     transcript: list[TranscriptEntry],
     coverage: CoverageMap,
     exclude_criteria: list[str],
-) -> str:
+    targets: list[Criterion],
+    compiled: Optional[CompiledRubric] = None,
+    summary: Optional[TranscriptSummary] = None,
+) -> GeneratedQuestion:
     """
     Generate a question that targets criteria NOT in the exclude list.
     Used when a student has skipped a criterion entirely and needs a new topic.
@@ -184,36 +290,32 @@ async def generate_question_excluding_criteria(
         transcript: Conversation history
         coverage: Current coverage state
         exclude_criteria: List of criterion IDs to exclude (skipped criteria)
+        targets: Criteria to target, in priority order, already excluding the
+            skipped ones (from the session's criterion scheduler)
+        compiled: Compiled form of the rubric, to reuse its rendered lines
+        summary: Rolling summary of the session's earlier transcript
 
     Returns:
-        Generated question text for a different topic
+        GeneratedQuestion for a different topic
     """
     client = get_llm_client()
 
-    target_criteria = select_target_criteria(
-        rubric,
-        coverage,
-        exclude_criteria=exclude_criteria,
-    )
-
-    if not target_criteria:
+    if not targets:
         # All criteria excluded - ask a general wrap-up question
-        return await generate_synthesis_question(rubric, transcript)
+        return GeneratedQuestion(text=await generate_synthesis_question(rubric, transcript))
 
-    criteria_text = "\n".join([
-        f"- {c.name}: {c.description} (coverage: {coverage.covered_criteria.get(c.id, 0)*100:.0f}%)"
-        for c in target_criteria[:5]
-    ])
+    criteria_text = _targets_block(targets[:5], coverage, compiled)
 
     excluded_text = ", ".join(exclude_criteria) if exclude_criteria else "None"
 
-    # Build recent transcript context
-    recent = transcript[-6:] if len(transcript) > 6 else transcript
-    transcript_text = "\n".join([
-        f"[{e.entry_type.value}]: {e.content[:200]}..."
-        if len(e.content) > 200 else f"[{e.entry_type.value}]: {e.content}"
-        for e in recent
-    ]) or "This is the start of the exam."
+    settings = get_settings()
+    transcript_text = render_history(
+        transcript,
+        budget_tokens=settings.prompt_history_tokens_question,
+        entry_max_tokens=settings.prompt_entry_max_tokens,
+        summary=summary,
+        empty_text="This is the start of the exam.",
+    )
 
     prompt = f"""Generate a NEW question on a DIFFERENT topic than the previous questions.
 The student has chosen to skip the previous topic.
@@ -229,38 +331,12 @@ RECENT CONVERSATION:
 
 Generate a question that explores a new area of the rubric, moving away from the previous topic."""
 
-    question = await client.complete(
-        prompt=prompt,
-        system_prompt=GENERATE_QUESTION_SYSTEM_PROMPT,
+    return await _complete_question(
+        client,
+        prompt,
+        GENERATE_QUESTION_SYSTEM_PROMPT,
+        GENERATE_QUESTION_WITH_VARIANT_SYSTEM_PROMPT,
         temperature=0.7,
+        cached_prefix=compiled.prompt_prefix if compiled else None,
+        call_site="question",
     )
-
-    return question.strip()
-
-
-def select_target_criteria(
-    rubric: ParsedRubric,
-    coverage: CoverageMap,
-    exclude_criteria: Optional[list[str]] = None,
-) -> list[Criterion]:
-    exclude = set(exclude_criteria or [])
-    available_criteria = [c for c in rubric.criteria if c.id not in exclude]
-
-    if not available_criteria:
-        return []
-
-    uncovered = []
-    partially_covered = []
-
-    for criterion in available_criteria:
-        cov = coverage.covered_criteria.get(criterion.id, 0.0)
-        if cov < 0.3:
-            uncovered.append(criterion)
-        elif cov < 0.7:
-            partially_covered.append(criterion)
-
-    target_criteria = uncovered if uncovered else partially_covered
-    if not target_criteria:
-        target_criteria = available_criteria
-
-    return target_criteria
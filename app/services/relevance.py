@@ -0,0 +1,148 @@
+"""
+Criterion Relevance Service
+
+Local lexical index over a rubric's criteria, used to decide which criteria a
+student response is worth checking against. Criteria are embedded as hashed
+TF-IDF vectors (unigrams and bigrams of their names and descriptions), so
+scoring a response is one small matrix-vector product with no LLM call.
+
+Each compiled rubric builds the index for its criteria once per rubric
+version (see compiled_rubric.CompiledRubric.index).
+"""
+
+import re
+import unicodedata
+import zlib
+from typing import Iterable, Optional
+
+import numpy as np
+
+from app.models.domain import Criterion, ParsedRubric
+
+HASH_DIMENSIONS = 1 << 12
+NAME_WEIGHT = 2  # Criterion names count double relative to descriptions
+
+# Below this best score the response shares too little vocabulary with the
+# rubric to trust the ranking (e.g. answered in another language)
+MIN_CONFIDENT_SCORE = 0.05
+
+_TOKEN_RE = re.compile(r"[\u3400-\u9fff]|[^\W_]+")
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does", "for",
+    "from", "has", "have", "how", "i", "in", "is", "it", "its", "of", "on", "or",
+    "that", "the", "their", "them", "they", "this", "to", "was", "were", "what",
+    "when", "which", "who", "why", "will", "with", "you", "your", "student",
+    "students", "demonstrate", "demonstrates", "understanding", "ability",
+}
+
+
+def _stem(token: str) -> str:
+    """Crude suffix stripping so "causes"/"caused"/"causing" share a feature."""
+    for suffix in ("ing", "ed", "es", "s"):
+        if len(token) > len(suffix) + 3 and token.endswith(suffix):
+            return token[: -len(suffix)]
+    return token
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercased, stemmed content words (CJK characters as single tokens)."""
+    text = unicodedata.normalize("NFKC", text).lower()
+    return [_stem(t) for t in _TOKEN_RE.findall(text) if t not in STOPWORDS]
+
+
+def _features(tokens: list[str]) -> Iterable[str]:
+    yield from tokens
+    for i in range(len(tokens) - 1):
+        yield f"{tokens[i]} {tokens[i + 1]}"
+
+
+def _term_counts(text: str, weight: int = 1) -> dict[int, float]:
+    counts: dict[int, float] = {}
+    for feature in _features(tokenize(text)):
+        bucket = zlib.crc32(feature.encode()) % HASH_DIMENSIONS
+        counts[bucket] = counts.get(bucket, 0.0) + weight
+    return counts
+
+
+class CriteriaIndex:
+    """Hashed TF-IDF vectors for one rubric's criteria."""
+
+    def __init__(self, criteria: list[Criterion]):
+        self.criterion_ids = [c.id for c in criteria]
+
+        rows = []
+        for c in criteria:
+            counts = _term_counts(c.name, NAME_WEIGHT)
+            for bucket, n in _term_counts(c.description).items():
+                counts[bucket] = counts.get(bucket, 0.0) + n
+            rows.append(counts)
+
+        # Smoothed IDF over the criteria themselves
+        doc_freq = np.zeros(HASH_DIMENSIONS, dtype=np.float32)
+        for counts in rows:
+            doc_freq[list(counts)] += 1
+        self.idf = np.log((1 + len(rows)) / (1 + doc_freq)).astype(np.float32) + 1.0
+
+        self.matrix = np.zeros((len(rows), HASH_DIMENSIONS), dtype=np.float32)
+        for i, counts in enumerate(rows):
+            buckets = np.fromiter(counts.keys(), dtype=np.int64)
+            tf = 1.0 + np.log(np.fromiter(counts.values(), dtype=np.float32))
+            self.matrix[i, buckets] = tf * self.idf[buckets]
+        norms = np.linalg.norm(self.matrix, axis=1, keepdims=True)
+        self.matrix /= np.maximum(norms, 1e-12)
+
+    def score(self, text: str) -> np.ndarray:
+        """Cosine similarity of the text to each criterion, in index order."""
+        counts = _term_counts(text)
+        if not counts or len(self.criterion_ids) == 0:
+            return np.zeros(len(self.criterion_ids), dtype=np.float32)
+
+        query = np.zeros(HASH_DIMENSIONS, dtype=np.float32)
+        buckets = np.fromiter(counts.keys(), dtype=np.int64)
+        tf = 1.0 + np.log(np.fromiter(counts.values(), dtype=np.float32))
+        query[buckets] = tf * self.idf[buckets]
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return np.zeros(len(self.criterion_ids), dtype=np.float32)
+        return self.matrix @ (query / norm)
+
+    def top_k(self, text: str, k: int) -> list[tuple[str, float]]:
+        """The k best-matching criteria with their scores, best first."""
+        scores = self.score(text)
+        order = np.argsort(-scores, kind="stable")[:k]
+        return [(self.criterion_ids[i], float(scores[i])) for i in order]
+
+
+def select_relevant_criteria(
+    rubric: ParsedRubric,
+    index: CriteriaIndex,
+    text: str,
+    k: int,
+    always_include: Optional[Iterable[str]] = None,
+) -> list[Criterion]:
+    """
+    Pick the criteria worth checking a response against.
+
+    Args:
+        rubric: Parsed rubric
+        index: Relevance index of the rubric's criteria
+        text: Response (and question) text to score criteria against
+        k: Number of top-scoring criteria to keep; 0 or less keeps all
+        always_include: Criterion IDs to keep regardless of score (e.g. the
+            current question's targets)
+
+    Returns:
+        Selected criteria in rubric order. All criteria are returned when the
+        rubric is small or the lexical match is too weak to rank on.
+    """
+    required = set(always_include or ())
+    if k <= 0 or len(rubric.criteria) <= k + len(required):
+        return list(rubric.criteria)
+
+    ranked = index.top_k(text, k)
+    if not ranked or ranked[0][1] < MIN_CONFIDENT_SCORE:
+        return list(rubric.criteria)
+
+    selected = required | {cid for cid, score in ranked if score > 0}
+    return [c for c in rubric.criteria if c.id in selected]
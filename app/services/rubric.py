@@ -1,13 +1,55 @@
+from collections import OrderedDict
 from datetime import datetime
+from threading import Lock
 from typing import Optional
+import hashlib
 import json
 
 from uuid_extensions import uuid7
 
+from app.config import get_settings
 from app.database import get_db
 from app.models.domain import Rubric, ParsedRubric
+from app.services.compiled_rubric import CompiledRubric, compile_rubric
+from app.services.metrics import timed_db
+from app.services.rubric_parser import PARSER_VERSION
 
 
+# rubric_id -> compiled rubric, most recently used last
+_compiled: "OrderedDict[str, CompiledRubric]" = OrderedDict()
+_compiled_lock = Lock()
+
+
+def normalize_rubric_content(content: str) -> str:
+    """Normalize line endings and surrounding/trailing whitespace."""
+    lines = content.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip()
+
+
+def rubric_content_hash(content: str) -> str:
+    """SHA-256 of the normalized rubric content."""
+    return hashlib.sha256(normalize_rubric_content(content).encode("utf-8")).hexdigest()
+
+
+def _row_to_rubric(result) -> Rubric:
+    parsed = None
+    if result[4]:
+        parsed_data = json.loads(result[4]) if isinstance(result[4], str) else result[4]
+        parsed = ParsedRubric(**parsed_data)
+
+    return Rubric(
+        id=result[0],
+        teacher_id=result[1],
+        title=result[2],
+        content=result[3],
+        parsed_criteria=parsed,
+        created_at=result[5],
+        updated_at=result[6],
+        content_hash=result[7],
+    )
+
+
+@timed_db
 def create_rubric(
     teacher_id: str,
     title: str,
@@ -29,6 +71,7 @@ def create_rubric(
     with get_db() as conn:
         rubric_id = str(uuid7())
         created_at = datetime.utcnow()
+        content_hash = rubric_content_hash(content)
 
         parsed_json = None
         if parsed_criteria:
@@ -36,10 +79,10 @@ def create_rubric(
 
         conn.execute(
             """
-            INSERT INTO rubrics (id, teacher_id, title, content, parsed_criteria, created_at)
-            VALUES (?, ?, ?, ?, ?, ?)
+            INSERT INTO rubrics (id, teacher_id, title, content, parsed_criteria, created_at, content_hash)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
             """,
-            [rubric_id, teacher_id, title, content, parsed_json, created_at]
+            [rubric_id, teacher_id, title, content, parsed_json, created_at, content_hash]
         )
 
         return Rubric(
@@ -49,9 +92,11 @@ def create_rubric(
             content=content,
             parsed_criteria=parsed_criteria,
             created_at=created_at,
+            content_hash=content_hash,
         )
 
 
+@timed_db
 def get_rubric(rubric_id: str, teacher_id: Optional[str] = None) -> Optional[Rubric]:
     """
     Get a rubric by ID.
@@ -65,7 +110,8 @@ def get_rubric(rubric_id: str, teacher_id: Optional[str] = None) -> Optional[Rub
     """
     with get_db() as conn:
         query = """
-            SELECT id, teacher_id, title, content, parsed_criteria, created_at, updated_at
+            SELECT id, teacher_id, title, content, parsed_criteria, created_at, updated_at,
+                content_hash
             FROM rubrics WHERE id = ?
         """
         params = [rubric_id]
@@ -79,22 +125,10 @@ def get_rubric(rubric_id: str, teacher_id: Optional[str] = None) -> Optional[Rub
         if result is None:
             return None
 
-        parsed = None
-        if result[4]:
-            parsed_data = json.loads(result[4]) if isinstance(result[4], str) else result[4]
-            parsed = ParsedRubric(**parsed_data)
-
-        return Rubric(
-            id=result[0],
-            teacher_id=result[1],
-            title=result[2],
-            content=result[3],
-            parsed_criteria=parsed,
-            created_at=result[5],
-            updated_at=result[6],
-        )
+        return _row_to_rubric(result)
 
 
+@timed_db
 def list_rubrics(teacher_id: str) -> list[Rubric]:
     """
     List all rubrics for a teacher.
@@ -108,33 +142,18 @@ def list_rubrics(teacher_id: str) -> list[Rubric]:
     with get_db() as conn:
         results = conn.execute(
             """
-            SELECT id, teacher_id, title, content, parsed_criteria, created_at, updated_at
+            SELECT id, teacher_id, title, content, parsed_criteria, created_at, updated_at,
+                content_hash
             FROM rubrics WHERE teacher_id = ?
             ORDER BY created_at DESC
             """,
             [teacher_id]
         ).fetchall()
 
-        rubrics = []
-        for result in results:
-            parsed = None
-            if result[4]:
-                parsed_data = json.loads(result[4]) if isinstance(result[4], str) else result[4]
-                parsed = ParsedRubric(**parsed_data)
-
-            rubrics.append(Rubric(
-                id=result[0],
-                teacher_id=result[1],
-                title=result[2],
-                content=result[3],
-                parsed_criteria=parsed,
-                created_at=result[5],
-                updated_at=result[6],
-            ))
-
-        return rubrics
+        return [_row_to_rubric(result) for result in results]
 
 
+@timed_db
 def update_rubric(
     rubric_id: str,
     teacher_id: str,
@@ -174,6 +193,8 @@ def update_rubric(
         if content is not None:
             updates.append("content = ?")
             params.append(content)
+            updates.append("content_hash = ?")
+            params.append(rubric_content_hash(content))
 
         if parsed_criteria is not None:
             updates.append("parsed_criteria = ?")
@@ -188,10 +209,12 @@ def update_rubric(
             """,
             params
         )
+    invalidate_compiled_rubric(rubric_id)
 
     return get_rubric(rubric_id, teacher_id)
 
 
+@timed_db
 def delete_rubric(rubric_id: str, teacher_id: str) -> bool:
     """
     Delete a rubric.
@@ -208,9 +231,12 @@ def delete_rubric(rubric_id: str, teacher_id: str) -> bool:
             "DELETE FROM rubrics WHERE id = ? AND teacher_id = ?",
             [rubric_id, teacher_id]
         )
-        return result.rowcount > 0
+        deleted = result.rowcount > 0
+    invalidate_compiled_rubric(rubric_id)
+    return deleted
 
 
+@timed_db
 def update_rubric_parsed_criteria(rubric_id: str, parsed_criteria: ParsedRubric) -> None:
     """
     Update only the parsed criteria for a rubric.
@@ -228,3 +254,89 @@ def update_rubric_parsed_criteria(rubric_id: str, parsed_criteria: ParsedRubric)
             """,
             [parsed_criteria.model_dump_json(), datetime.utcnow(), rubric_id]
         )
+    invalidate_compiled_rubric(rubric_id)
+
+
+@timed_db
+def get_parse_artifact(content_hash: str) -> Optional[ParsedRubric]:
+    """
+    Get a stored parse result for rubric content.
+
+    Args:
+        content_hash: Hash from rubric_content_hash()
+
+    Returns:
+        ParsedRubric from the current parser version, or None if not stored
+    """
+    with get_db() as conn:
+        result = conn.execute(
+            """
+            SELECT parsed_criteria FROM rubric_parse_artifacts
+            WHERE content_hash = ? AND parser_version = ?
+            """,
+            [content_hash, PARSER_VERSION]
+        ).fetchone()
+
+    if result is None:
+        return None
+
+    parsed_data = json.loads(result[0]) if isinstance(result[0], str) else result[0]
+    return ParsedRubric(**parsed_data)
+
+
+@timed_db
+def save_parse_artifact(content_hash: str, parsed_criteria: ParsedRubric, source: str) -> None:
+    """
+    Store a parse result for rubric content, replacing any previous one.
+
+    Args:
+        content_hash: Hash from rubric_content_hash()
+        parsed_criteria: Parse result
+        source: How it was produced ("local" or "llm")
+    """
+    with get_db() as conn:
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO rubric_parse_artifacts
+                (content_hash, parser_version, parsed_criteria, source, created_at)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            [content_hash, PARSER_VERSION, parsed_criteria.model_dump_json(), source, datetime.utcnow()]
+        )
+
+
+def get_compiled_rubric(rubric_id: str) -> Optional[CompiledRubric]:
+    """
+    Get the compiled form of a rubric, compiling it on first use.
+
+    Compiled rubrics are held in a bounded LRU and dropped whenever the
+    rubric is updated, re-parsed or deleted.
+
+    Args:
+        rubric_id: Rubric ID
+
+    Returns:
+        CompiledRubric, or None if the rubric doesn't exist or isn't parsed
+    """
+    with _compiled_lock:
+        compiled = _compiled.get(rubric_id)
+        if compiled is not None:
+            _compiled.move_to_end(rubric_id)
+            return compiled
+
+    rubric = get_rubric(rubric_id)
+    if rubric is None or rubric.parsed_criteria is None:
+        return None
+
+    compiled = compile_rubric(rubric)
+    with _compiled_lock:
+        _compiled[rubric_id] = compiled
+        while len(_compiled) > get_settings().compiled_rubric_cache_size:
+            _compiled.popitem(last=False)
+    return compiled
+
+
+def invalidate_compiled_rubric(rubric_id: str) -> None:
+    """Drop a rubric's compiled form after it changes."""
+    with _compiled_lock:
+        _compiled.pop(rubric_id, None)
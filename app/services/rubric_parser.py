@@ -0,0 +1,243 @@
+"""
+Local Rubric Parser
+
+Deterministic markdown parser for well-structured rubrics, so the common case
+needs no LLM call. Three layouts are recognized:
+
+- Headings carrying a point value, e.g. "### 1. Pronunciation (35 points)"
+- A table with a criterion column (and optionally points/description columns)
+- Bullet or numbered lists, e.g. "- **Grammar** (20 pts): Correct tenses"
+
+Each layout yields a candidate ParsedRubric with a confidence score; the most
+confident candidate wins. Callers fall back to the LLM below their threshold.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+from app.models.domain import Criterion, ParsedRubric
+
+# Part of the parse cache key: bump when this parser or the LLM parse prompt
+# changes so stored parse results are recomputed
+PARSER_VERSION = "1"
+
+MAX_DESCRIPTION_CHARS = 500
+
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_BULLET_RE = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s+(.*)$")
+_TOP_LEVEL_ITEM_RE = re.compile(r"^(?:[-*+]|\d+[.)])\s+(.*)$")
+_POINTS_RE = re.compile(
+    r"[\(\[]\s*(\d+(?:\.\d+)?)\s*(?:points?|pts?\.?|marks?)\s*[\)\]]"
+    r"|[:\-–—]\s*(\d+(?:\.\d+)?)\s*(?:points?|pts?\.?|marks?)\s*$",
+    re.IGNORECASE,
+)
+_TOTAL_RE = re.compile(r"total\s+points?\s*[:\-–—]?\s*\**\s*(\d+(?:\.\d+)?)", re.IGNORECASE)
+_NUMBERING_RE = re.compile(r"^(?:\d+[.)]|[A-Za-z][.)]|[IVXivx]+[.)])\s+")
+_EMPHASIS_RE = re.compile(r"(\*\*|__|\*|_|`)")
+_TABLE_SEPARATOR_RE = re.compile(r"^\|?\s*:?-{3,}:?\s*(\|\s*:?-{3,}:?\s*)*\|?\s*$")
+# Performance band lines like "**Excellent (27-30 points)**"
+_BAND_RE = re.compile(r"^\*\*[^*]+\(\s*\d+\s*[-–]\s*\d+\s*points?\s*\)\*\*\s*$", re.IGNORECASE)
+
+_NAME_COLUMNS = ("criterion", "criteria", "category", "component", "skill", "area", "dimension", "standard")
+_POINTS_COLUMNS = ("points", "pts", "max points", "score", "weight", "marks")
+_DESCRIPTION_COLUMNS = ("description", "descriptor", "expectations", "details", "look fors", "evidence")
+
+
+@dataclass
+class LocalParseResult:
+    """A locally parsed rubric and how much to trust it."""
+    parsed: ParsedRubric
+    confidence: float
+    layout: str
+
+
+def _clean(text: str) -> str:
+    return " ".join(_EMPHASIS_RE.sub("", text).split())
+
+
+def _slug(name: str) -> str:
+    name = re.sub(r"['’]", "", name.lower())
+    return re.sub(r"[^a-z0-9]+", "_", name).strip("_") or "criterion"
+
+
+def _split_points(text: str) -> tuple[str, Optional[float]]:
+    """Remove a point value from a title, returning (title, points)."""
+    match = _POINTS_RE.search(text)
+    if match is None:
+        return text, None
+    value = match.group(1) or match.group(2)
+    title = (text[: match.start()] + text[match.end():]).strip(" :-–—")
+    return title, float(value)
+
+
+def _build(items: list[tuple[str, str, Optional[float]]], text: str) -> ParsedRubric:
+    criteria = []
+    seen: dict[str, int] = {}
+    for name, description, points in items:
+        base = _slug(name)
+        seen[base] = seen.get(base, 0) + 1
+        cid = base if seen[base] == 1 else f"{base}_{seen[base]}"
+        criteria.append(Criterion(
+            id=cid,
+            name=name,
+            description=description[:MAX_DESCRIPTION_CHARS] or name,
+            points=points,
+        ))
+
+    total = _TOTAL_RE.search(_EMPHASIS_RE.sub("", text))
+    if total is not None:
+        total_points: Optional[float] = float(total.group(1))
+    elif criteria and all(c.points is not None for c in criteria):
+        total_points = sum(c.points for c in criteria)
+    else:
+        total_points = None
+    return ParsedRubric(criteria=criteria, total_points=total_points)
+
+
+def _confidence(parsed: ParsedRubric, items: list[tuple[str, str, Optional[float]]], text: str) -> float:
+    """Heuristic trust in a candidate: enough criteria, points, descriptions, consistent total."""
+    n = len(parsed.criteria)
+    if n == 0:
+        return 0.0
+
+    score = 0.4 if n >= 2 else 0.1
+    points = [c.points for c in parsed.criteria]
+    if all(p is not None for p in points):
+        score += 0.2
+    if all(desc and desc != name for name, desc, _ in items):
+        score += 0.2
+
+    stated = _TOTAL_RE.search(_EMPHASIS_RE.sub("", text))
+    if stated is None:
+        score += 0.1
+    elif all(p is not None for p in points):
+        total = float(stated.group(1))
+        regular = sum(c.points for c in parsed.criteria if "extra credit" not in c.name.lower())
+        if abs(regular - total) < 1e-6 or abs(sum(points) - total) < 1e-6:
+            score += 0.2
+    return min(score, 1.0)
+
+
+def _section_description(lines: list[str]) -> str:
+    """Summarize a criterion section: its lead paragraph plus its first bullet list."""
+    lead: list[str] = []
+    bullets: list[str] = []
+    for line in lines:
+        stripped = line.strip()
+        if not stripped or stripped == "---" or _BAND_RE.match(stripped):
+            if bullets:
+                break
+            continue
+        bullet = _BULLET_RE.match(line)
+        if bullet:
+            bullets.append(_clean(bullet.group(1)))
+        elif bullets:
+            break
+        elif not lead:
+            lead.append(_clean(stripped).rstrip(":"))
+
+    parts = lead + (["; ".join(bullets)] if bullets else [])
+    return ". ".join(p for p in parts if p)
+
+
+def _parse_headings(lines: list[str]) -> list[tuple[str, str, Optional[float]]]:
+    headings = []
+    for i, line in enumerate(lines):
+        match = _HEADING_RE.match(line)
+        if match:
+            headings.append((i, len(match.group(1)), _clean(match.group(2))))
+
+    items = []
+    for n, (i, level, title) in enumerate(headings):
+        name, points = _split_points(title)
+        if points is None:
+            continue
+        end = len(lines)
+        for j, next_level, _ in headings[n + 1:]:
+            if next_level <= level:
+                end = j
+                break
+        name = _NUMBERING_RE.sub("", name).strip()
+        items.append((name, _section_description(lines[i + 1:end]), points))
+    return items
+
+
+def _table_cells(line: str) -> list[str]:
+    return [_clean(c) for c in line.strip().strip("|").split("|")]
+
+
+def _parse_tables(lines: list[str]) -> list[tuple[str, str, Optional[float]]]:
+    items = []
+    i = 0
+    while i < len(lines) - 1:
+        if not (lines[i].lstrip().startswith("|") and _TABLE_SEPARATOR_RE.match(lines[i + 1].strip())):
+            i += 1
+            continue
+
+        header = [h.lower() for h in _table_cells(lines[i])]
+        name_col = next((k for k, h in enumerate(header) if h in _NAME_COLUMNS), None)
+        points_col = next((k for k, h in enumerate(header) if h in _POINTS_COLUMNS), None)
+        desc_col = next((k for k, h in enumerate(header) if h in _DESCRIPTION_COLUMNS), None)
+        if desc_col is None and name_col is not None:
+            desc_col = next((k for k in range(len(header)) if k not in (name_col, points_col)), None)
+
+        i += 2
+        while i < len(lines) and lines[i].lstrip().startswith("|"):
+            cells = _table_cells(lines[i])
+            i += 1
+            if name_col is None or name_col >= len(cells):
+                continue
+            name, points = _split_points(cells[name_col])
+            if not name or name.lower().startswith("total"):
+                continue
+            if points_col is not None and points_col < len(cells):
+                value = re.search(r"\d+(?:\.\d+)?", cells[points_col])
+                points = float(value.group()) if value else points
+            description = cells[desc_col] if desc_col is not None and desc_col < len(cells) else ""
+            items.append((_NUMBERING_RE.sub("", name).strip(), description, points))
+    return items
+
+
+def _parse_lists(lines: list[str]) -> list[tuple[str, str, Optional[float]]]:
+    items = []
+    for line in lines:
+        match = _TOP_LEVEL_ITEM_RE.match(line)
+        if not match:
+            continue
+        text = _clean(match.group(1))
+        head, points = _split_points(text)
+        if points is None:
+            continue
+        # "Name (N pts): description" or "Name: description (N pts)"
+        parts = re.split(r"\s*[:–—]\s*|\s+-\s+", head, maxsplit=1)
+        name = parts[0].strip()
+        description = parts[1].strip() if len(parts) > 1 else ""
+        if name:
+            items.append((name, description, points))
+    return items
+
+
+def parse_rubric_markdown(text: str) -> Optional[LocalParseResult]:
+    """
+    Parse a markdown rubric without the LLM.
+
+    Args:
+        text: Raw markdown rubric content
+
+    Returns:
+        The most confident LocalParseResult, or None if no layout was recognized
+    """
+    lines = text.splitlines()
+    best: Optional[LocalParseResult] = None
+
+    for layout, parser in (("headings", _parse_headings), ("table", _parse_tables), ("list", _parse_lists)):
+        items = parser(lines)
+        if not items:
+            continue
+        parsed = _build(items, text)
+        candidate = LocalParseResult(parsed=parsed, confidence=_confidence(parsed, items, text), layout=layout)
+        if best is None or candidate.confidence > best.confidence:
+            best = candidate
+
+    return best
@@ -0,0 +1,52 @@
+"""
+Per-Session Locks
+
+Serializes the actions of one student session (answers, skips, starting the
+exam) so a double-click or client retry cannot run the orchestrator twice at
+once for the same session and race the read-modify-write of its coverage and
+skip state. Different sessions never wait for each other.
+"""
+
+import asyncio
+import functools
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+# session ID -> [lock, number of holders and waiters]; entries are dropped
+# when nobody needs them, so the dict only holds sessions with actions in flight
+_locks: dict[str, list] = {}
+
+
+@asynccontextmanager
+async def session_lock(session_id: str) -> AsyncIterator[None]:
+    """Hold the session's lock for the enclosed block (not reentrant)."""
+    entry = _locks.get(session_id)
+    if entry is None:
+        entry = _locks[session_id] = [asyncio.Lock(), 0]
+    entry[1] += 1
+    try:
+        async with entry[0]:
+            yield
+    finally:
+        entry[1] -= 1
+        if entry[1] == 0:
+            del _locks[session_id]
+
+
+def serialized(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+    """Decorate an async function taking `session_id` first to run under the session's lock."""
+
+    @functools.wraps(func)
+    async def wrapper(session_id: str, *args, **kwargs) -> T:
+        async with session_lock(session_id):
+            return await func(session_id, *args, **kwargs)
+
+    return wrapper
+
+
+def is_locked(session_id: str) -> bool:
+    """Whether an action for the session is in flight."""
+    entry = _locks.get(session_id)
+    return entry is not None and entry[0].locked()
@@ -3,22 +3,40 @@ Struggle Detection Service
 
 Focused solely on identifying when students need help.
 Separate from coverage analysis to ensure clean separation of concerns.
+
+Obvious cases (empty answers, "I don't know", near-verbatim repeats of an
+earlier answer) are settled by local rules; everything else goes to the LLM.
 """
 
 from datetime import datetime
+from functools import lru_cache
 from typing import Optional
+import hashlib
 import json
+import logging
+import re
+import unicodedata
 
+import numpy as np
 from uuid_extensions import uuid7
 
+from app.config import get_settings
 from app.database import get_db
 from app.models.domain import (
+    EntryType,
     StruggleEvent,
     StruggleType,
     Severity,
     TranscriptEntry,
+    TranscriptSummary,
 )
+from app.services import jobs
+from app.services.compiled_rubric import CompiledRubric
 from app.services.llm_client import get_llm_client
+from app.services.metrics import timed_db
+from app.services.prompt_budget import render_history, truncate_to_tokens
+
+logger = logging.getLogger(__name__)
 
 
 DETECT_STRUGGLE_SYSTEM_PROMPT = """You are an expert at identifying when students are struggling during oral exams.
@@ -72,49 +90,270 @@ Return only the adapted question text, nothing else.
 """
 
 
+# Phrases that on their own mean the student has nothing to say (SILENCE)
+# or did not understand the question (CONFUSION), per supported language
+DONT_KNOW_PHRASES = [
+    # en
+    "i don't know", "i do not know", "don't know", "no idea", "i'm not sure",
+    "i have no idea", "i can't remember", "i don't remember", "i forgot", "dunno",
+    # es
+    "no sé", "no lo sé", "ni idea", "no tengo idea", "no estoy seguro",
+    "no estoy segura", "no me acuerdo", "no recuerdo",
+    # fr
+    "je ne sais pas", "je sais pas", "aucune idée", "je ne suis pas sûr",
+    "je ne suis pas sûre", "je ne me souviens pas", "j'ai oublié",
+    # de
+    "ich weiß nicht", "ich weiss nicht", "weiß ich nicht", "keine ahnung",
+    "ich bin nicht sicher", "ich habe vergessen", "ich erinnere mich nicht",
+    # zh
+    "不知道", "不清楚", "不确定", "忘了", "想不起来", "不记得",
+]
+
+CONFUSION_PHRASES = [
+    # en
+    "i don't understand", "i do not understand", "i don't get it", "what do you mean",
+    "what does that mean", "can you repeat", "could you repeat", "can you rephrase",
+    "could you rephrase", "i'm confused", "i am confused",
+    # es
+    "no entiendo", "no comprendo", "qué quiere decir", "qué quieres decir",
+    "puede repetir", "puedes repetir", "estoy confundido", "estoy confundida",
+    # fr
+    "je ne comprends pas", "je comprends pas", "qu'est-ce que vous voulez dire",
+    "qu'est-ce que ça veut dire", "pouvez-vous répéter", "je suis confus", "je suis confuse",
+    # de
+    "ich verstehe nicht", "ich verstehe das nicht", "was meinen sie", "was meinst du",
+    "können sie das wiederholen", "ich bin verwirrt",
+    # zh
+    "不明白", "不懂", "听不懂", "不理解", "什么意思", "再说一遍",
+]
+
+# Hesitation sounds that carry no content
+FILLER_WORDS = {
+    "um", "umm", "uh", "uhh", "er", "erm", "hmm", "hm", "mm", "ah", "eh",
+    "euh", "bah", "ähm", "äh", "öhm", "嗯", "啊", "呃", "额",
+}
+
+# Words that may surround a lexicon phrase without adding an answer to it.
+# A match only decides the case if nothing else was said; "I don't know,
+# Hemingway?" is a hedged answer for the LLM to judge.
+HEDGE_WORDS = {
+    # en
+    "sorry", "really", "just", "honestly", "actually", "well", "so", "oh", "but",
+    "i", "the", "that", "this", "it", "question", "answer", "at", "all", "anything",
+    # es
+    "lo", "siento", "perdón", "la", "el", "pregunta", "respuesta", "pues", "bueno", "nada",
+    "realmente", "de", "verdad",
+    # fr
+    "désolé", "désolée", "pardon", "le", "réponse", "vraiment", "bon", "ben",
+    "rien",
+    # de
+    "tut", "mir", "leid", "die", "das", "frage", "antwort", "wirklich", "also", "na",
+    "leider",
+    # zh (one token per character)
+    "我", "真", "的", "了", "呢", "吧", "啦", "这", "个", "问", "题", "抱", "歉",
+}
+
+# Repetition: word (CJK: character) shingles compared via MinHash
+SHINGLE_SIZE = 3
+MIN_SHINGLES = 4
+MINHASH_PERMUTATIONS = 64
+REPETITION_SIMILARITY = 0.8
+
+_MERSENNE_PRIME = (1 << 31) - 1
+_rng = np.random.default_rng(0x5EED)
+_MINHASH_A = _rng.integers(1, _MERSENNE_PRIME, MINHASH_PERMUTATIONS, dtype=np.int64)
+_MINHASH_B = _rng.integers(0, _MERSENNE_PRIME, MINHASH_PERMUTATIONS, dtype=np.int64)
+
+_TOKEN_RE = re.compile(r"[\u3400-\u9fff]|[^\W_]+(?:'[^\W_]+)*")
+
+# How often each detection path settled a response, for monitoring
+_path_counts = {
+    "rule_silence": 0,
+    "rule_confusion": 0,
+    "rule_repetition": 0,
+    "llm": 0,
+}
+
+
+def get_struggle_detection_stats() -> dict:
+    """Counts of responses settled by each detection path."""
+    total = sum(_path_counts.values())
+    rules = total - _path_counts["llm"]
+    return {
+        **_path_counts,
+        "total": total,
+        "rule_rate": rules / total if total else 0.0,
+    }
+
+
+def _tokens(text: str) -> list[str]:
+    """Lowercased words, with each CJK character as its own token."""
+    text = unicodedata.normalize("NFKC", text).lower().replace("\u2019", "'")
+    return _TOKEN_RE.findall(text)
+
+
+def _remove_phrases(tokens: list[str], phrases: list[tuple[str, ...]]) -> tuple[list[str], bool]:
+    """Remove every occurrence of the given token sequences."""
+    found = False
+    for phrase in phrases:
+        n = len(phrase)
+        i = 0
+        while i + n <= len(tokens):
+            if tuple(tokens[i:i + n]) == phrase:
+                del tokens[i:i + n]
+                found = True
+            else:
+                i += 1
+    return tokens, found
+
+
+_DONT_KNOW = sorted({tuple(_tokens(p)) for p in DONT_KNOW_PHRASES}, key=len, reverse=True)
+_CONFUSION = sorted({tuple(_tokens(p)) for p in CONFUSION_PHRASES}, key=len, reverse=True)
+
+
+@lru_cache(maxsize=1024)
+def _minhash(text: str) -> Optional[np.ndarray]:
+    """MinHash signature of a text's shingles, or None if it is too short to compare."""
+    tokens = _tokens(text)
+    shingles = {" ".join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+    if len(shingles) < MIN_SHINGLES:
+        return None
+
+    hashes = np.array(
+        [
+            int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "little") % _MERSENNE_PRIME
+            for s in shingles
+        ],
+        dtype=np.int64,
+    )
+    return ((np.outer(_MINHASH_A, hashes) + _MINHASH_B[:, None]) % _MERSENNE_PRIME).min(axis=1)
+
+
+def _rule_event(struggle_type: StruggleType, severity: Severity, reasoning: str) -> StruggleEvent:
+    return StruggleEvent(
+        id="",  # Will be set when persisted
+        session_id="",
+        transcript_entry_id="",
+        struggle_type=struggle_type,
+        severity=severity,
+        llm_reasoning=reasoning,
+    )
+
+
+def classify_struggle_locally(
+    response: str,
+    history: list[TranscriptEntry],
+) -> Optional[StruggleEvent]:
+    """
+    Settle clear-cut struggle cases without the LLM.
+
+    Only positive decisions are made locally: an answer that looks fine may
+    still be incorrect or off topic, which needs the LLM to judge.
+
+    Args:
+        response: Student's response text
+        history: Previous transcript entries (not including this response)
+
+    Returns:
+        StruggleEvent if the rules are confident, None if the LLM must decide
+    """
+    tokens = [t for t in _tokens(response) if t not in FILLER_WORDS]
+    if not tokens:
+        return _rule_event(
+            StruggleType.SILENCE, Severity.HIGH, "Student gave no substantive response"
+        )
+
+    residual, confused = _remove_phrases(list(tokens), _CONFUSION)
+    residual, dont_know = _remove_phrases(residual, _DONT_KNOW)
+    if (confused or dont_know) and all(t in HEDGE_WORDS for t in residual):
+        if confused:
+            return _rule_event(
+                StruggleType.CONFUSION, Severity.MEDIUM, "Student said they did not understand the question"
+            )
+        return _rule_event(
+            StruggleType.SILENCE, Severity.MEDIUM, "Student said they did not know the answer"
+        )
+
+    signature = _minhash(response)
+    if signature is not None:
+        for entry in history:
+            if entry.entry_type != EntryType.RESPONSE:
+                continue
+            previous = _minhash(entry.content)
+            if previous is None:
+                continue
+            similarity = float(np.mean(signature == previous))
+            if similarity >= REPETITION_SIMILARITY:
+                return _rule_event(
+                    StruggleType.REPETITION,
+                    Severity.MEDIUM,
+                    f"Response repeats an earlier answer ({similarity:.0%} similar)",
+                )
+
+    return None
+
+
 async def detect_struggle(
     response: str,
     question: str,
     history: list[TranscriptEntry],
+    compiled: Optional[CompiledRubric] = None,
+    summary: Optional[TranscriptSummary] = None,
 ) -> Optional[StruggleEvent]:
     """
     Analyze a student response for signs of struggling.
 
+    Clear-cut cases are classified by local rules; the rest go to the LLM.
+
     Args:
         response: Student's response text
         question: The question that was asked
         history: Previous transcript entries for context
+        compiled: Compiled rubric of the exam; its prompt prefix gives the
+            LLM the exam context and is shared with the other exam prompts
+        summary: Rolling summary of the session's earlier transcript
 
     Returns:
         StruggleEvent if struggle detected, None otherwise
     """
+    settings = get_settings()
+    if settings.struggle_rules_enabled:
+        event = classify_struggle_locally(response, history)
+        if event is not None:
+            _path_counts[f"rule_{event.struggle_type.value}"] += 1
+            logger.debug("Struggle settled by local rules: %s", event.struggle_type.value)
+            return event
+
+    _path_counts["llm"] += 1
     client = get_llm_client()
 
-    # Build history context (last 4 exchanges)
-    recent_history = history[-8:] if len(history) > 8 else history
-    history_text = "\n".join([
-        f"[{e.entry_type.value}]: {e.content[:200]}..."
-        if len(e.content) > 200 else f"[{e.entry_type.value}]: {e.content}"
-        for e in recent_history
-    ]) or "No previous history"
+    history_text = render_history(
+        history,
+        budget_tokens=settings.prompt_history_tokens_struggle,
+        entry_max_tokens=settings.prompt_entry_max_tokens,
+        summary=summary,
+    )
+    response = truncate_to_tokens(response, settings.prompt_response_max_tokens)
 
     prompt = f"""Analyze this student response for signs of struggle:
 
+RECENT CONVERSATION HISTORY:
+{history_text}
+
 QUESTION ASKED:
 {question}
 
 STUDENT RESPONSE:
 {response}
 
-RECENT CONVERSATION HISTORY:
-{history_text}
-
 Determine if the student is struggling and classify the type and severity."""
 
     result = await client.complete_json(
         prompt=prompt,
         system_prompt=DETECT_STRUGGLE_SYSTEM_PROMPT,
         temperature=0.3,
+        cached_prefix=compiled.prompt_prefix if compiled else None,
+        call_site="struggle",
     )
 
     if not result.get("struggle_detected", False):
@@ -154,6 +393,7 @@ async def generate_adapted_question(
     original_question: str,
     struggle_event: StruggleEvent,
     history: list[TranscriptEntry],
+    summary: Optional[TranscriptSummary] = None,
 ) -> str:
     """
     Generate an adapted version of a question for a struggling student.
@@ -162,18 +402,20 @@ async def generate_adapted_question(
         original_question: The question that caused difficulty
         struggle_event: Details about the struggle
         history: Conversation history for context
+        summary: Rolling summary of the session's earlier transcript
 
     Returns:
         Adapted question text
     """
     client = get_llm_client()
 
-    recent_history = history[-4:] if len(history) > 4 else history
-    history_text = "\n".join([
-        f"[{e.entry_type.value}]: {e.content[:150]}..."
-        if len(e.content) > 150 else f"[{e.entry_type.value}]: {e.content}"
-        for e in recent_history
-    ]) or "No previous history"
+    settings = get_settings()
+    history_text = render_history(
+        history,
+        budget_tokens=settings.prompt_history_tokens_adapt,
+        entry_max_tokens=settings.prompt_entry_max_tokens,
+        summary=summary,
+    )
 
     prompt = f"""Adapt this question for a struggling student:
 
@@ -193,11 +435,13 @@ Provide an adapted version of the question that helps the student engage better.
         prompt=prompt,
         system_prompt=ADAPT_QUESTION_SYSTEM_PROMPT,
         temperature=0.5,
+        call_site="adapt_question",
     )
 
     return adapted.strip()
 
 
+@timed_db
 def create_struggle_event(
     session_id: str,
     transcript_entry_id: str,
@@ -257,6 +501,7 @@ def create_struggle_event(
     )
 
 
+@timed_db
 def mark_teacher_notified(event_id: str) -> None:
     """Mark a struggle event as having notified the teacher."""
     with get_db() as conn:
@@ -266,6 +511,7 @@ def mark_teacher_notified(event_id: str) -> None:
         )
 
 
+@timed_db
 def mark_question_adapted(event_id: str) -> None:
     """Mark a struggle event as having an adapted question."""
     with get_db() as conn:
@@ -275,6 +521,22 @@ def mark_question_adapted(event_id: str) -> None:
         )
 
 
+MARK_QUESTION_ADAPTED_JOB = "mark_question_adapted"
+
+
+def enqueue_mark_question_adapted(event_id: str) -> str:
+    """Queue mark_question_adapted to run off the response path. Returns the job ID."""
+    return jobs.enqueue(MARK_QUESTION_ADAPTED_JOB, {"event_id": event_id})
+
+
+async def _mark_question_adapted_job(payload: dict) -> None:
+    mark_question_adapted(payload["event_id"])
+
+
+jobs.register_handler(MARK_QUESTION_ADAPTED_JOB, _mark_question_adapted_job)
+
+
+@timed_db
 def get_struggle_events_for_session(session_id: str) -> list[StruggleEvent]:
     """Get all struggle events for a session."""
     with get_db() as conn:
@@ -305,6 +567,7 @@ def get_struggle_events_for_session(session_id: str) -> list[StruggleEvent]:
         ]
 
 
+@timed_db
 def get_unnotified_struggles_for_exam(exam_id: str) -> list[StruggleEvent]:
     """Get all unnotified struggle events for an exam."""
     with get_db() as conn:
@@ -337,6 +600,7 @@ def get_unnotified_struggles_for_exam(exam_id: str) -> list[StruggleEvent]:
         ]
 
 
+@timed_db
 def get_all_struggles_for_exam(exam_id: str) -> list[StruggleEvent]:
     """Get all struggle events for an exam."""
     with get_db() as conn:
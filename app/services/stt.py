@@ -0,0 +1,319 @@
+"""Speech-to-Text service using ElevenLabs API."""
+
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import time
+from typing import AsyncIterator
+
+import httpx
+from fastapi import HTTPException, Request, UploadFile
+from starlette.datastructures import FormData
+from starlette.formparsers import MultiPartException, MultiPartParser
+from uuid_extensions import uuid7
+
+from app.config import get_settings
+from app.services import audio_preprocess
+from app.services.http_client import get_http_client
+
+logger = logging.getLogger(__name__)
+
+# ElevenLabs Speech-to-Text constants
+ELEVENLABS_STT_URL = "https://api.elevenlabs.io/v1/speech-to-text"
+ELEVENLABS_MODEL_ID = "scribe_v1"
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Client-supplied file names and MIME types go into the multipart headers
+_UNSAFE_FILENAME_CHARS = re.compile(r"[^\w.\- ]")
+_CONTENT_TYPE = re.compile(r"[\w.+-]+/[\w.+-]+")
+
+# Latency metrics for monitoring
+_stats = {
+    "requests": 0,
+    "errors": 0,
+    "bytes": 0,
+    "total_seconds": 0.0,
+    "max_seconds": 0.0,
+    "silent_skipped": 0,
+    "preprocessed_bytes_saved": 0,
+}
+
+
+class _AudioMultiPartParser(MultiPartParser):
+    """Multipart parser with its own spool threshold for uploaded files."""
+
+    def __init__(self, *args, spool_max_size: int, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.spool_max_size = spool_max_size
+
+
+async def read_audio_form(request: Request) -> FormData:
+    """
+    Parse an audio upload's multipart form, keeping files in memory.
+
+    Starlette rolls uploaded files over to a temporary file after 1 MB; a
+    typical answer recording is larger than that, so audio routes parse
+    their form with the STT_SPOOL_MAX_BYTES threshold instead. The form is
+    cached on the request, where the endpoint's File/Form parameters are
+    read from.
+    """
+    if not request.headers.get("content-type", "").lower().startswith("multipart/form-data"):
+        return await request.form()
+
+    parser = _AudioMultiPartParser(
+        request.headers,
+        request.stream(),
+        spool_max_size=get_settings().stt_spool_max_bytes,
+    )
+    try:
+        form = await parser.parse()
+    except MultiPartException as exc:
+        raise HTTPException(status_code=400, detail=exc.message)
+    request._form = form
+    return form
+
+
+def get_stt_stats() -> dict:
+    """STT request counts and latency, for monitoring."""
+    requests = _stats["requests"]
+    return {
+        **_stats,
+        "avg_seconds": _stats["total_seconds"] / requests if requests else 0.0,
+    }
+
+
+def _record(duration: float, size: int, ok: bool) -> None:
+    _stats["requests"] += 1
+    _stats["bytes"] += size
+    _stats["total_seconds"] += duration
+    _stats["max_seconds"] = max(_stats["max_seconds"], duration)
+    if not ok:
+        _stats["errors"] += 1
+
+
+async def transcribe_upload(audio: UploadFile) -> str:
+    """
+    Transcribe an uploaded audio file via ElevenLabs without blocking the event loop.
+
+    The upload is streamed to ElevenLabs as a multipart body in chunks, using
+    the shared pooled HTTP client. WAV uploads are buffered and preprocessed
+    first (see transcribe_bytes) when preprocessing is enabled.
+
+    Args:
+        audio: The uploaded audio file
+
+    Returns:
+        The transcribed text, stripped of surrounding whitespace; empty if
+        the recording contained no speech
+
+    Raises:
+        HTTPException: If the upload is too large or transcription fails
+    """
+    settings = get_settings()
+
+    size = audio.size
+    if size is not None and size > settings.stt_max_upload_bytes:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Audio upload exceeds {settings.stt_max_upload_bytes} bytes",
+        )
+
+    if settings.audio_preprocess_enabled and audio_preprocess.looks_like_wav(
+        audio.filename, audio.content_type
+    ):
+        data = await read_upload(audio, settings.stt_max_upload_bytes)
+        return await transcribe_bytes(
+            data,
+            filename=audio.filename or "audio.wav",
+            content_type=audio.content_type or "audio/wav",
+        )
+
+    await audio.seek(0)
+    return await transcribe_stream(
+        _read_upload(audio, settings.stt_max_upload_bytes),
+        filename=audio.filename or "audio.wav",
+        content_type=audio.content_type or "audio/wav",
+        size=size,
+    )
+
+
+async def transcribe_stream(
+    chunks: AsyncIterator[bytes],
+    filename: str = "audio.wav",
+    content_type: str = "audio/wav",
+    size: int | None = None,
+) -> str:
+    """
+    Transcribe audio from an async stream of chunks via ElevenLabs.
+
+    Args:
+        chunks: Audio bytes, yielded in order
+        filename: File name reported to ElevenLabs
+        content_type: MIME type of the audio
+        size: Total audio size if known (sent as Content-Length instead of chunked)
+
+    Returns:
+        The transcribed text, stripped of surrounding whitespace
+
+    Raises:
+        HTTPException: If transcription fails
+    """
+    api_key = os.environ.get("ELEVENLABS_API_KEY")
+    if not api_key:
+        raise HTTPException(
+            status_code=500,
+            detail="ELEVENLABS_API_KEY is not configured",
+        )
+
+    filename = _safe_filename(filename)
+    if not _CONTENT_TYPE.fullmatch(content_type):
+        content_type = "application/octet-stream"
+
+    boundary = uuid7().hex
+    head = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="model_id"\r\n\r\n'
+        f"{ELEVENLABS_MODEL_ID}\r\n"
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        f"Content-Type: {content_type}\r\n\r\n"
+    ).encode()
+    tail = f"\r\n--{boundary}--\r\n".encode()
+
+    sent = 0
+
+    async def _body() -> AsyncIterator[bytes]:
+        nonlocal sent
+        yield head
+        async for chunk in chunks:
+            sent += len(chunk)
+            yield chunk
+        yield tail
+
+    headers = {
+        "xi-api-key": api_key,
+        "Content-Type": f"multipart/form-data; boundary={boundary}",
+    }
+    if size is not None:
+        headers["Content-Length"] = str(len(head) + size + len(tail))
+
+    client = get_http_client()
+    started = time.perf_counter()
+    ok = False
+
+    try:
+        response = await client.post(
+            ELEVENLABS_STT_URL,
+            headers=headers,
+            content=_body(),
+        )
+
+        if response.status_code != 200:
+            msg = response.text or response.reason_phrase
+            raise HTTPException(
+                status_code=502,
+                detail=f"ElevenLabs STT failed ({response.status_code}): {msg}",
+            )
+
+        body = response.json()
+        transcript = body.get("text")
+        if transcript is None:
+            raise HTTPException(
+                status_code=502,
+                detail="ElevenLabs response missing 'text' field",
+            )
+
+        ok = True
+        return transcript.strip()
+
+    except httpx.TimeoutException:
+        raise HTTPException(
+            status_code=504,
+            detail="Transcription request timed out",
+        )
+    except httpx.RequestError as e:
+        raise HTTPException(
+            status_code=502,
+            detail=f"Failed to connect to ElevenLabs: {str(e)}",
+        )
+    finally:
+        duration = time.perf_counter() - started
+        _record(duration, sent, ok)
+        logger.info("STT %s in %.3fs (%d bytes)", "ok" if ok else "failed", duration, sent)
+
+
+async def transcribe_bytes(
+    data: bytes,
+    filename: str = "audio.wav",
+    content_type: str = "audio/wav",
+) -> str:
+    """
+    Transcribe audio that is already in memory via ElevenLabs.
+
+    When preprocessing is enabled, WAV audio is downmixed, trimmed and
+    resampled first, and near-silent audio is not sent at all.
+
+    Returns:
+        The transcribed text; empty if the audio contained no speech
+    """
+    if get_settings().audio_preprocess_enabled:
+        # NumPy work is short but CPU-bound; keep it off the event loop
+        processed = await asyncio.to_thread(audio_preprocess.preprocess_audio, data, content_type)
+        if processed.is_silent:
+            _stats["silent_skipped"] += 1
+            logger.info("STT skipped: no speech in %d bytes of audio", len(data))
+            return ""
+        _stats["preprocessed_bytes_saved"] += len(data) - len(processed.data)
+        data, content_type = processed.data, processed.content_type
+
+    async def _once() -> AsyncIterator[bytes]:
+        yield data
+
+    return await transcribe_stream(_once(), filename=filename, content_type=content_type, size=len(data))
+
+
+def _safe_filename(filename: str) -> str:
+    """Reduce a client file name to a base name that is safe in a quoted header."""
+    name = filename.replace("\\", "/").rsplit("/", 1)[-1]
+    name = _UNSAFE_FILENAME_CHARS.sub("_", name).strip(" .")
+    return name or "audio.wav"
+
+
+async def read_upload(audio: UploadFile, max_bytes: int) -> bytes:
+    """Read a whole upload into memory, enforcing the maximum upload size."""
+    await audio.seek(0)
+    return b"".join([chunk async for chunk in _read_upload(audio, max_bytes)])
+
+
+async def hash_upload(audio: UploadFile) -> str:
+    """
+    SHA-256 of an upload's content, leaving it ready to be read again.
+
+    Raises:
+        HTTPException: If the upload is too large
+    """
+    digest = hashlib.sha256()
+    await audio.seek(0)
+    async for chunk in _read_upload(audio, get_settings().stt_max_upload_bytes):
+        digest.update(chunk)
+    await audio.seek(0)
+    return digest.hexdigest()
+
+
+async def _read_upload(audio: UploadFile, max_bytes: int) -> AsyncIterator[bytes]:
+    """Yield an upload in chunks, enforcing the maximum upload size."""
+    total = 0
+    while True:
+        chunk = await audio.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            return
+        total += len(chunk)
+        if total > max_bytes:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Audio upload exceeds {max_bytes} bytes",
+            )
+        yield chunk
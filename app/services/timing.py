@@ -0,0 +1,141 @@
+"""
+Pipeline Stage Timing
+
+Measures how long each stage of a request pipeline (an answer, a skip, the
+start of a session) takes, and keeps per-stage totals and latency histograms
+so slow stages show up without a profiler. Student routes also return each
+request's timings in a Server-Timing header.
+
+Usage:
+    timer = StageTimer("skip")
+    with timer.stage("completion"):
+        ...
+    generated = await timer.timed("generate", generate_question(...))
+    timings = timer.finish()
+"""
+
+import bisect
+import logging
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Awaitable, Iterator, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Histogram bucket upper bounds in milliseconds (plus an overflow bucket)
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+def _new_stats() -> dict:
+    return {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "buckets": [0] * (len(LATENCY_BUCKETS_MS) + 1)}
+
+
+# pipeline -> stage -> {"count", "total_ms", "max_ms", "buckets"}
+_stage_stats: dict[str, dict[str, dict]] = defaultdict(lambda: defaultdict(_new_stats))
+
+
+def record_stage(pipeline: str, name: str, ms: float) -> None:
+    """Add one duration to a stage's totals and histogram."""
+    stats = _stage_stats[pipeline][name]
+    stats["count"] += 1
+    stats["total_ms"] += ms
+    stats["max_ms"] = max(stats["max_ms"], ms)
+    stats["buckets"][bisect.bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+
+
+class StageTimer:
+    """Wall-clock durations (in milliseconds) of the named stages of one request."""
+
+    def __init__(self, pipeline: str):
+        self.pipeline = pipeline
+        self.stages: dict[str, float] = {}
+        self._started = time.perf_counter()
+
+    def _add(self, name: str, started: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + (time.perf_counter() - started) * 1000
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as stage `name`."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._add(name, started)
+
+    async def timed(self, name: str, awaitable: Awaitable[T]) -> T:
+        """Await `awaitable`, timing it as stage `name` (works inside concurrent tasks)."""
+        started = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self._add(name, started)
+
+    def finish(self) -> dict[str, float]:
+        """
+        Record the stage durations and the request total.
+
+        Returns:
+            Stage name -> milliseconds, including "total"
+        """
+        timings = {name: round(ms, 2) for name, ms in self.stages.items()}
+        timings["total"] = round((time.perf_counter() - self._started) * 1000, 2)
+
+        for name, ms in timings.items():
+            record_stage(self.pipeline, name, ms)
+
+        logger.debug("%s stage timings: %s", self.pipeline, timings)
+        return timings
+
+
+def _percentile(buckets: list[int], count: int, fraction: float) -> float:
+    """Upper bound of the bucket holding the given fraction of durations."""
+    if count == 0:
+        return 0.0
+    rank = fraction * count
+    seen = 0
+    for bound, n in zip(LATENCY_BUCKETS_MS, buckets):
+        seen += n
+        if seen >= rank:
+            return float(bound)
+    return float("inf")
+
+
+def get_stage_stats() -> dict:
+    """
+    Stage timing totals per pipeline.
+
+    Returns:
+        Dict of pipeline -> stage -> count, total, average and max
+        milliseconds, bucket counts ("buckets", per LATENCY_BUCKETS_MS plus
+        overflow) and p50/p95 bucket bounds
+    """
+    return {
+        pipeline: {
+            name: {
+                **stats,
+                "buckets": list(stats["buckets"]),
+                "avg_ms": stats["total_ms"] / stats["count"] if stats["count"] else 0.0,
+                "p50_ms": _percentile(stats["buckets"], stats["count"], 0.5),
+                "p95_ms": _percentile(stats["buckets"], stats["count"], 0.95),
+            }
+            for name, stats in stages.items()
+        }
+        for pipeline, stages in _stage_stats.items()
+    }
+
+
+def server_timing_header(timings: dict[str, float]) -> str:
+    """
+    Format stage timings as a Server-Timing header value.
+
+    Args:
+        timings: Stage name -> milliseconds (as returned by StageTimer.finish)
+
+    Returns:
+        e.g. "load;dur=3.1, coverage;dur=1820.4, total;dur=2410.0"
+    """
+    return ", ".join(f"{name};dur={ms:.1f}" for name, ms in timings.items())
@@ -4,15 +4,29 @@ Transcript Management Service
 Handles storage and retrieval of transcript entries.
 """
 
+import logging
 from datetime import datetime
-from typing import Optional
+from typing import Callable, Optional
 
 from uuid_extensions import uuid7
 
 from app.database import get_db
 from app.models.domain import TranscriptEntry, EntryType
+from app.services.metrics import timed_db
 
+logger = logging.getLogger(__name__)
 
+# Callbacks run after a question is recorded (e.g. prefetching translation and TTS)
+_question_listeners: list[Callable[[TranscriptEntry], None]] = []
+
+
+def register_question_listener(listener: Callable[[TranscriptEntry], None]) -> None:
+    """Register a callback invoked with every newly added question entry."""
+    if listener not in _question_listeners:
+        _question_listeners.append(listener)
+
+
+@timed_db
 def add_transcript_entry(
     session_id: str,
     entry_type: EntryType,
@@ -50,6 +64,7 @@ def add_transcript_entry(
     )
 
 
+@timed_db
 def get_transcript_entry(entry_id: str) -> Optional[TranscriptEntry]:
     """Get a transcript entry by ID."""
     with get_db() as conn:
@@ -70,6 +85,7 @@ def get_transcript_entry(entry_id: str) -> Optional[TranscriptEntry]:
         )
 
 
+@timed_db
 def get_session_transcript(session_id: str) -> list[TranscriptEntry]:
     """
     Get all transcript entries for a session in chronological order.
@@ -103,6 +119,7 @@ def get_session_transcript(session_id: str) -> list[TranscriptEntry]:
         ]
 
 
+@timed_db
 def get_student_visible_transcript(session_id: str) -> list[TranscriptEntry]:
     """
     Get transcript entries visible to students (excludes system notes).
@@ -137,6 +154,7 @@ def get_student_visible_transcript(session_id: str) -> list[TranscriptEntry]:
         ]
 
 
+@timed_db
 def get_last_question(session_id: str) -> Optional[TranscriptEntry]:
     """Get the most recent question for a session."""
     with get_db() as conn:
@@ -163,6 +181,34 @@ def get_last_question(session_id: str) -> Optional[TranscriptEntry]:
         )
 
 
+@timed_db
+def find_question(session_id: str, content: str) -> Optional[TranscriptEntry]:
+    """Get the most recent question for a session with the given text."""
+    with get_db() as conn:
+        result = conn.execute(
+            """
+            SELECT id, session_id, entry_type, content, timestamp
+            FROM transcript_entries
+            WHERE session_id = ? AND entry_type = 'question' AND content = ?
+            ORDER BY timestamp DESC
+            LIMIT 1
+            """,
+            [session_id, content]
+        ).fetchone()
+
+        if result is None:
+            return None
+
+        return TranscriptEntry(
+            id=result[0],
+            session_id=result[1],
+            entry_type=EntryType(result[2]),
+            content=result[3],
+            timestamp=result[4],
+        )
+
+
+@timed_db
 def count_questions(session_id: str) -> int:
     """Count the number of questions asked in a session."""
     with get_db() as conn:
@@ -174,8 +220,16 @@ def count_questions(session_id: str) -> int:
 
 
 def add_question(session_id: str, question: str) -> TranscriptEntry:
-    """Add a question to the transcript."""
-    return add_transcript_entry(session_id, EntryType.QUESTION, question)
+    """Add a question to the transcript and notify question listeners."""
+    entry = add_transcript_entry(session_id, EntryType.QUESTION, question)
+
+    for listener in _question_listeners:
+        try:
+            listener(entry)
+        except Exception:
+            logger.exception("Question listener failed for session %s", session_id)
+
+    return entry
 
 
 def add_response(session_id: str, response: str) -> TranscriptEntry:
@@ -193,6 +247,7 @@ def add_teacher_message(session_id: str, message: str) -> TranscriptEntry:
     return add_transcript_entry(session_id, EntryType.TEACHER_MESSAGE, message)
 
 
+@timed_db
 def get_recent_entries(session_id: str, limit: int = 10) -> list[TranscriptEntry]:
     """Get the most recent transcript entries for a session."""
     with get_db() as conn:
@@ -0,0 +1,148 @@
+"""
+Transcript Summary Service
+
+Keeps a rolling summary of each session's transcript so prompts can carry the
+whole exam's context in a bounded number of tokens. Every few exchanges the
+entries that have aged out of the recent tail are folded into the stored
+summary by a background LLM call; prompt builders then send summary plus
+recent tail (see prompt_budget.render_history).
+"""
+
+import asyncio
+import logging
+from typing import Optional
+
+from app.config import get_settings
+from app.models.domain import StudentSession, TranscriptSummary
+from app.services import exam as exam_service
+from app.services import transcript as transcript_service
+from app.services.llm_client import get_llm_client
+from app.services.prompt_budget import render_history, truncate_to_tokens
+
+logger = logging.getLogger(__name__)
+
+SUMMARIZE_TRANSCRIPT_SYSTEM_PROMPT = """You maintain a running summary of an oral exam between an examiner and a student.
+
+Given the previous summary and the exchanges that followed it, write an updated summary that:
+- Records the topics asked about and what the student demonstrated or got wrong
+- Notes difficulties (confusion, skipped questions, silence) and how they were handled
+- Keeps concrete facts, names, and terms the student used
+- Is written in the third person, in plain prose, without headings
+
+Return only the updated summary.
+"""
+
+# Keep references so in-flight updates aren't garbage collected
+_background_tasks: set[asyncio.Task] = set()
+# Sessions with an update in flight (one at a time per session)
+_in_flight: set[str] = set()
+
+
+def summary_due(summary: TranscriptSummary, entry_count: int) -> bool:
+    """
+    Whether enough entries have aged out of the tail to update the summary.
+
+    Args:
+        summary: The session's current summary
+        entry_count: Number of entries in the session's transcript
+
+    Returns:
+        True if an update should run
+    """
+    settings = get_settings()
+    aged_out = entry_count - settings.transcript_summary_tail_entries - summary.entry_count
+    # An exchange is a question and its response
+    return aged_out >= 2 * settings.transcript_summary_interval
+
+
+def schedule_summary_update(session: StudentSession, entry_count: int) -> Optional[asyncio.Task]:
+    """
+    Start a background summary update for a session if one is due.
+
+    Args:
+        session: The student session
+        entry_count: Number of entries in the session's transcript
+
+    Returns:
+        The scheduled task, or None if no update is due
+    """
+    if not get_settings().transcript_summary_enabled:
+        return None
+    if session.id in _in_flight or not summary_due(session.transcript_summary, entry_count):
+        return None
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+    _in_flight.add(session.id)
+    task = loop.create_task(_run_update(session.id))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+async def _run_update(session_id: str) -> None:
+    try:
+        await update_transcript_summary(session_id)
+    except Exception:
+        # The previous summary stays valid; the next exchange retries
+        logger.exception("Transcript summary update failed for session %s", session_id)
+    finally:
+        _in_flight.discard(session_id)
+
+
+async def update_transcript_summary(session_id: str) -> Optional[TranscriptSummary]:
+    """
+    Fold the entries that aged out of the recent tail into the session summary.
+
+    Args:
+        session_id: Student session ID
+
+    Returns:
+        The updated summary, or None if there was nothing new to summarize
+    """
+    session = exam_service.get_student_session(session_id)
+    if session is None:
+        return None
+
+    settings = get_settings()
+    transcript = transcript_service.get_session_transcript(session_id)
+    previous = session.transcript_summary
+    upto = len(transcript) - settings.transcript_summary_tail_entries
+    if upto <= previous.entry_count:
+        return None
+
+    # The summary prompt gets a larger budget than the per-answer prompts
+    new_entries = render_history(
+        transcript[previous.entry_count:upto],
+        budget_tokens=settings.transcript_summary_max_tokens * 8,
+        entry_max_tokens=settings.prompt_entry_max_tokens * 3,
+    )
+
+    prompt = f"""Update the running summary of this oral exam.
+
+PREVIOUS SUMMARY:
+{previous.text or "None yet - this is the start of the exam."}
+
+NEW EXCHANGES:
+{new_entries}
+
+Write the updated summary in at most {settings.transcript_summary_max_tokens * 3 // 4} words."""
+
+    client = get_llm_client()
+    text = await client.complete(
+        prompt=prompt,
+        system_prompt=SUMMARIZE_TRANSCRIPT_SYSTEM_PROMPT,
+        temperature=0.2,
+        max_tokens=settings.transcript_summary_max_tokens * 2,
+        call_site="transcript_summary",
+    )
+
+    summary = TranscriptSummary(
+        text=truncate_to_tokens(text.strip(), settings.transcript_summary_max_tokens),
+        entry_count=upto,
+    )
+    exam_service.update_session_summary(session_id, summary)
+    return summary
@@ -1,17 +1,31 @@
 """Text-to-Speech service using ElevenLabs API."""
 
+import asyncio
+import hashlib
+import json
+import logging
 import os
-from typing import Optional
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Optional
 
 import httpx
 from fastapi import HTTPException
 
+from app.config import get_settings
+from app.services.http_client import get_http_client
 from app.services.llm_client import get_llm_client
 
+logger = logging.getLogger(__name__)
+
 # ElevenLabs TTS configuration
 ELEVENLABS_TTS_URL = "https://api.elevenlabs.io/v1/text-to-speech"
 DEFAULT_VOICE_ID = "21m00Tcm4TlvDq8ikWAM"  # Rachel
 DEFAULT_MODEL = "eleven_flash_v2_5"
+DEFAULT_OUTPUT_FORMAT = "mp3_44100_128"
+TTS_TIMEOUT = 30.0  # Seconds, per request on the shared HTTP client
 
 # Supported language codes for eleven_flash_v2_5
 SUPPORTED_LANGUAGES = {"en", "es", "fr", "de", "zh"}
@@ -26,22 +40,157 @@ LANGUAGE_NAMES = {
 }
 
 
-async def translate_text(text: str, target_language: str) -> str:
+class TranslationMemo:
     """
-    Translate text to the target language using Gemini.
-
-    Args:
-        text: The text to translate.
-        target_language: Target language code (es, fr, de, zh).
+    Bounded LRU memo of translations keyed by (text hash, language).
 
-    Returns:
-        Translated text.
+    Shared by /translate, TTS synthesis and question prefetching so each
+    question is translated into a given language at most once.
     """
-    if target_language == "en" or target_language not in LANGUAGE_NAMES:
-        return text
 
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, str], str] = OrderedDict()
+        self._inflight: dict[tuple[str, str], asyncio.Task] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.llm_calls = 0
+        self.batch_calls = 0
+
+    @staticmethod
+    def key(text: str, language: str) -> tuple[str, str]:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest(), language
+
+    def get(self, text: str, language: str) -> Optional[str]:
+        key = self.key(text, language)
+        translated = self._entries.get(key)
+        if translated is not None:
+            self._entries.move_to_end(key)
+        return translated
+
+    def put(self, text: str, language: str, translated: str) -> None:
+        key = self.key(text, language)
+        self._entries[key] = translated
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_or_create(
+        self,
+        text: str,
+        language: str,
+        factory: Callable[[], Awaitable[str]],
+    ) -> str:
+        """
+        Return the translation of ``text``, producing it with ``factory`` on a miss.
+
+        Only one translation runs per text and language at a time; other callers wait for it.
+        """
+        translated = self.get(text, language)
+        if translated is not None:
+            self.hits += 1
+            return translated
+
+        task = self._inflight.get(self.key(text, language))
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = self._start(text, language, factory())
+        return await asyncio.shield(task)
+
+    async def get_or_create_many(
+        self,
+        text: str,
+        languages: list[str],
+        batch_factory: Callable[[list[str]], Awaitable[dict[str, str]]],
+        factory: Callable[[str], Awaitable[str]],
+    ) -> dict[str, str]:
+        """
+        Return translations of ``text`` into several languages.
+
+        Misses are produced together by one ``batch_factory`` call (or by
+        ``factory`` when there is only one), and languages the batch leaves out
+        fall back to ``factory``. Translations already in flight are waited
+        for, and single lookups made while the batch runs wait for it too.
+        """
+        results: dict[str, str] = {}
+        tasks: dict[str, asyncio.Task] = {}
+        missing: list[str] = []
+
+        for language in languages:
+            translated = self.get(text, language)
+            if translated is not None:
+                self.hits += 1
+                results[language] = translated
+                continue
+            task = self._inflight.get(self.key(text, language))
+            if task is not None:
+                self.coalesced += 1
+                tasks[language] = task
+            else:
+                self.misses += 1
+                missing.append(language)
+
+        if len(missing) == 1:
+            tasks[missing[0]] = self._start(text, missing[0], factory(missing[0]))
+        elif missing:
+            batch = asyncio.ensure_future(batch_factory(missing))
+            for language in missing:
+                tasks[language] = self._start(text, language, self._from_batch(batch, language, factory))
+
+        translated = await asyncio.gather(*(asyncio.shield(task) for task in tasks.values()))
+        results.update(zip(tasks, translated))
+        return {language: results[language] for language in languages}
+
+    def _start(self, text: str, language: str, translation: Awaitable[str]) -> asyncio.Task:
+        key = self.key(text, language)
+        task = asyncio.ensure_future(self._fill(text, language, translation))
+        self._inflight[key] = task
+        task.add_done_callback(lambda _t: self._inflight.pop(key, None))
+        return task
+
+    async def _fill(self, text: str, language: str, translation: Awaitable[str]) -> str:
+        translated = await translation
+        self.put(text, language, translated)
+        return translated
+
+    @staticmethod
+    async def _from_batch(
+        batch: asyncio.Future,
+        language: str,
+        factory: Callable[[str], Awaitable[str]],
+    ) -> str:
+        translated = (await asyncio.shield(batch)).get(language)
+        if translated is None:
+            translated = await factory(language)
+        return translated
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+            "llm_calls": self.llm_calls,
+            "batch_calls": self.batch_calls,
+            "entries": len(self._entries),
+        }
+
+
+@lru_cache
+def get_translation_memo() -> TranslationMemo:
+    """Get the translation memo singleton."""
+    return TranslationMemo(get_settings().translation_cache_max_entries)
+
+
+async def _translate_with_llm(text: str, target_language: str) -> str:
     target_name = LANGUAGE_NAMES[target_language]
     llm = get_llm_client()
+    get_translation_memo().llm_calls += 1
 
     prompt = f"""Translate the following text to {target_name}.
 Return ONLY the translated text, nothing else. Do not include any explanations or notes.
@@ -53,32 +202,114 @@ Text to translate:
         prompt=prompt,
         temperature=0.3,
         max_tokens=500,
+        call_site="translate",
     )
 
     return translated.strip()
 
 
-async def generate_speech(
+async def _translate_batch_with_llm(text: str, languages: list[str]) -> dict[str, str]:
+    """Translate text into several languages in one call; failed languages are left out."""
+    llm = get_llm_client()
+    get_translation_memo().batch_calls += 1
+
+    targets = "\n".join(f"- {code}: {LANGUAGE_NAMES[code]}" for code in languages)
+    prompt = f"""Translate the following text into each of these languages:
+{targets}
+
+Return ONLY valid JSON mapping each language code to its translation, for example:
+{{"es": "...", "fr": "..."}}
+
+Text to translate:
+{text}"""
+
+    try:
+        batch = await llm.complete_json(
+            prompt=prompt,
+            temperature=0.3,
+            max_tokens=500 * len(languages),
+            call_site="translate",
+        )
+    except (ValueError, KeyError, httpx.HTTPError) as e:
+        logger.warning("Batch translation failed, translating individually: %s", e)
+        return {}
+
+    if not isinstance(batch, dict):
+        return {}
+
+    return {
+        language: batch[language].strip()
+        for language in languages
+        if isinstance(batch.get(language), str) and batch[language].strip()
+    }
+
+
+async def translate_text(text: str, target_language: str) -> str:
+    """
+    Translate text to the target language using Gemini.
+
+    Results are memoized, and concurrent requests for the same translation
+    share one LLM call.
+
+    Args:
+        text: The text to translate.
+        target_language: Target language code (es, fr, de, zh).
+
+    Returns:
+        Translated text.
+    """
+    if target_language == "en" or target_language not in LANGUAGE_NAMES:
+        return text
+
+    return await get_translation_memo().get_or_create(
+        text, target_language, lambda: _translate_with_llm(text, target_language)
+    )
+
+
+async def translate_text_batch(
     text: str,
-    language: str = "en",
-    voice_id: Optional[str] = None,
-) -> bytes:
+    languages: Optional[list[str]] = None,
+) -> dict[str, str]:
     """
-    Generate MP3 audio from text using ElevenLabs TTS.
+    Translate text into several languages with a single structured LLM call.
 
-    If language is not English, the text is first translated to the target language
-    before being converted to speech.
+    Languages already in the memo are not requested again. Any language the
+    LLM leaves out of its answer falls back to a per-language translation.
 
     Args:
-        text: The text to convert to speech.
-        language: Language code for TTS (en, es, fr, de, zh). Defaults to "en".
-        voice_id: Optional ElevenLabs voice ID. If not provided, uses default.
+        text: The text to translate.
+        languages: Target language codes. Defaults to all non-English SUPPORTED_LANGUAGES.
 
     Returns:
-        Raw MP3 audio bytes.
+        Dict mapping language code -> translated text (English maps to the original).
+    """
+    if languages is None:
+        languages = sorted(SUPPORTED_LANGUAGES)
+
+    targets = [language for language in languages if language != "en" and language in LANGUAGE_NAMES]
+    translations = await get_translation_memo().get_or_create_many(
+        text,
+        targets,
+        lambda missing: _translate_batch_with_llm(text, missing),
+        lambda language: _translate_with_llm(text, language),
+    )
+    return {language: translations.get(language, text) for language in languages}
+
+
+async def _prepare_tts_request(
+    text: str,
+    language: str,
+    voice_id: Optional[str],
+    translated_text: Optional[str] = None,
+) -> tuple[str, dict, dict]:
+    """
+    Build the ElevenLabs voice ID, headers and payload for a TTS request.
+
+    Translates the text first when the language is not English, unless the
+    caller already has the translation.
 
     Raises:
-        HTTPException: If TTS generation fails.
+        HTTPException: If the ElevenLabs API key is not configured.
     """
     api_key = os.environ.get("ELEVENLABS_API_KEY")
     if not api_key:
@@ -93,12 +324,11 @@ async def generate_speech(
 
     # Translate text if not English
     if language != "en":
-        text = await translate_text(text, language)
+        text = translated_text or await translate_text(text, language)
 
     # Use provided voice_id, or fall back to env var, or default
     if voice_id is None:
         voice_id = os.environ.get("ELEVENLABS_VOICE_ID", DEFAULT_VOICE_ID)
-    url = f"{ELEVENLABS_TTS_URL}/{voice_id}"
 
     headers = {
         "xi-api-key": api_key,
@@ -108,13 +338,44 @@ async def generate_speech(
     payload = {
         "text": text,
         "model_id": DEFAULT_MODEL,
-        "output_format": "mp3_44100_128",
+        "output_format": DEFAULT_OUTPUT_FORMAT,
         "language_code": language,
     }
 
+    return voice_id, headers, payload
+
+
+async def generate_speech(
+    text: str,
+    language: str = "en",
+    voice_id: Optional[str] = None,
+    translated_text: Optional[str] = None,
+) -> bytes:
+    """
+    Generate MP3 audio from text using ElevenLabs TTS.
+
+    If language is not English, the text is first translated to the target language
+    before being converted to speech.
+
+    Args:
+        text: The text to convert to speech.
+        language: Language code for TTS (en, es, fr, de, zh). Defaults to "en".
+        voice_id: Optional ElevenLabs voice ID. If not provided, uses default.
+        translated_text: Optional existing translation of text, skips translating again.
+
+    Returns:
+        Raw MP3 audio bytes.
+
+    Raises:
+        HTTPException: If TTS generation fails.
+    """
+    voice_id, headers, payload = await _prepare_tts_request(
+        text, language, voice_id, translated_text
+    )
+    url = f"{ELEVENLABS_TTS_URL}/{voice_id}"
+
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(url, json=payload, headers=headers)
+        response = await get_http_client().post(url, json=payload, headers=headers, timeout=TTS_TIMEOUT)
 
         if response.status_code != 200:
             detail = response.text or response.reason_phrase
@@ -135,3 +396,446 @@ async def generate_speech(
             status_code=502,
             detail=f"Failed to connect to ElevenLabs: {str(e)}",
         )
+
+
+async def open_speech_stream(
+    text: str,
+    language: str = "en",
+    voice_id: Optional[str] = None,
+) -> AsyncIterator[bytes]:
+    """
+    Start streaming MP3 audio from the ElevenLabs streaming endpoint.
+
+    The upstream status is checked before returning, so errors surface as
+    HTTPExceptions rather than as a truncated audio stream.
+
+    Args:
+        text: The text to convert to speech.
+        language: Language code for TTS (en, es, fr, de, zh). Defaults to "en".
+        voice_id: Optional ElevenLabs voice ID. If not provided, uses default.
+
+    Returns:
+        Async iterator over MP3 chunks as they arrive from ElevenLabs.
+
+    Raises:
+        HTTPException: If the stream cannot be opened.
+    """
+    voice_id, headers, payload = await _prepare_tts_request(text, language, voice_id)
+    url = f"{ELEVENLABS_TTS_URL}/{voice_id}/stream"
+
+    client = get_http_client()
+    try:
+        request = client.build_request("POST", url, json=payload, headers=headers, timeout=TTS_TIMEOUT)
+        response = await client.send(request, stream=True)
+
+        if response.status_code != 200:
+            await response.aread()
+            await response.aclose()
+            detail = response.text or response.reason_phrase
+            raise HTTPException(
+                status_code=502,
+                detail=f"ElevenLabs TTS failed ({response.status_code}): {detail}",
+            )
+
+    except httpx.TimeoutException:
+        raise HTTPException(
+            status_code=504,
+            detail="TTS request timed out",
+        )
+    except httpx.RequestError as e:
+        raise HTTPException(
+            status_code=502,
+            detail=f"Failed to connect to ElevenLabs: {str(e)}",
+        )
+
+    async def _relay() -> AsyncIterator[bytes]:
+        try:
+            async for chunk in response.aiter_bytes():
+                yield chunk
+        finally:
+            await response.aclose()
+
+    return _relay()
+
+
+def speech_cache_key(
+    text: str,
+    language: str,
+    voice_id: str,
+    model: str = DEFAULT_MODEL,
+    output_format: str = DEFAULT_OUTPUT_FORMAT,
+) -> str:
+    """Content address for a synthesized clip: SHA-256 of everything that affects the audio."""
+    material = json.dumps([text, language, voice_id, model, output_format], ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def _normalize_speech_params(language: str, voice_id: Optional[str]) -> tuple[str, str]:
+    """Apply the same language and voice fallbacks as generate_speech."""
+    if language not in SUPPORTED_LANGUAGES:
+        language = "en"
+    if voice_id is None:
+        voice_id = os.environ.get("ELEVENLABS_VOICE_ID", DEFAULT_VOICE_ID)
+    return language, voice_id
+
+
+def resolve_speech_cache_key(
+    text: str,
+    language: str = "en",
+    voice_id: Optional[str] = None,
+) -> str:
+    """Cache key (and ETag) a TTS request will use, without touching the cache."""
+    language, voice_id = _normalize_speech_params(language, voice_id)
+    return speech_cache_key(text, language, voice_id)
+
+
+# Partial clip files older than this are leftovers from a crashed write
+STALE_TEMP_FILE_SECONDS = 300
+
+
+class TTSCache:
+    """
+    Content-addressed on-disk cache of synthesized audio.
+
+    Clips are stored as ``<key>.mp3`` files in ``directory``. An in-memory index
+    (rebuilt from disk on startup) tracks recency and sizes so the least recently
+    used clips are evicted once ``max_bytes`` is exceeded. Concurrent misses for
+    the same key share a single synthesis call.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._index: OrderedDict[str, int] = OrderedDict()  # key -> size in bytes
+        self._total_bytes = 0
+        self._inflight: dict[str, asyncio.Future] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self) -> None:
+        """Rebuild the index from files already on disk, oldest first."""
+        self._remove_stale_temp_files()
+
+        files = []
+        for path in self.directory.glob("*.mp3"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, path.stem, stat.st_size))
+
+        for _, key, size in sorted(files):
+            self._index[key] = size
+            self._total_bytes += size
+
+        self._evict()
+
+    def _remove_stale_temp_files(self) -> None:
+        """Delete partial clips left behind by a crash mid-write."""
+        cutoff = time.time() - STALE_TEMP_FILE_SECONDS
+        for pattern in ("*.tmp", "*.part"):
+            for path in self.directory.glob(pattern):
+                try:
+                    # Recent files may belong to another worker still writing them
+                    if path.stat().st_mtime < cutoff:
+                        path.unlink()
+                except OSError:
+                    continue
+
+    def path_for(self, key: str) -> Path:
+        return self.directory / f"{key}.mp3"
+
+    def get(self, key: str) -> Optional[Path]:
+        """Return the cached clip path and mark it recently used, or None on a miss."""
+        if key not in self._index:
+            return None
+
+        path = self.path_for(key)
+        if not path.exists():
+            # File removed behind our back; forget it
+            self._total_bytes -= self._index.pop(key)
+            return None
+
+        self._index.move_to_end(key)
+        return path
+
+    def put(self, key: str, data: bytes) -> Path:
+        """Store a clip, replacing any previous entry for the key."""
+        tmp_path = self.path_for(key).with_suffix(".tmp")
+        tmp_path.write_bytes(data)
+        return self._commit(key, tmp_path, len(data))
+
+    def _commit(self, key: str, tmp_path: Path, size: int) -> Path:
+        """Atomically move a fully written clip into place and index it."""
+        path = self.path_for(key)
+        os.replace(tmp_path, path)
+
+        if key in self._index:
+            self._total_bytes -= self._index.pop(key)
+        self._index[key] = size
+        self._total_bytes += size
+
+        self._evict(keep=key)
+        return path
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        """Drop least recently used clips until the byte budget is respected."""
+        while self._total_bytes > self.max_bytes and self._index:
+            key = next(iter(self._index))
+            if key == keep:
+                if len(self._index) == 1:
+                    break
+                self._index.move_to_end(key)
+                continue
+
+            size = self._index.pop(key)
+            self._total_bytes -= size
+            self.evictions += 1
+            try:
+                self.path_for(key).unlink()
+            except OSError:
+                pass
+
+    async def get_or_create(
+        self,
+        key: str,
+        factory: Callable[[], Awaitable[bytes]],
+    ) -> Path:
+        """
+        Return the clip for ``key``, synthesizing it with ``factory`` on a miss.
+
+        Only one ``factory`` call runs per key at a time; other callers wait for it.
+        """
+        path = self.get(key)
+        if path is not None:
+            self.hits += 1
+            return path
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.ensure_future(self._fill(key, factory))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _t: self._inflight.pop(key, None))
+
+        # Shield so a disconnecting client doesn't cancel synthesis for everyone else
+        return await asyncio.shield(task)
+
+    async def _fill(self, key: str, factory: Callable[[], Awaitable[bytes]]) -> Path:
+        data = await factory()
+        return self.put(key, data)
+
+    def is_inflight(self, key: str) -> bool:
+        return key in self._inflight
+
+    async def wait_inflight(self, key: str) -> Optional[Path]:
+        """Wait for an in-progress fill of ``key``; None if nothing is in flight."""
+        task = self._inflight.get(key)
+        if task is None:
+            return None
+        self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def fill_from_stream(
+        self,
+        key: str,
+        chunks: AsyncIterator[bytes],
+        listener: asyncio.Queue,
+    ) -> asyncio.Task:
+        """
+        Write a streamed clip through to the cache in a background task.
+
+        Each chunk is forwarded to ``listener`` as it is written, followed by
+        ``None`` on completion or the exception on failure. The fill keeps going
+        if the listener stops reading, so an aborted playback still warms the cache.
+        """
+        self.misses += 1
+        task = asyncio.ensure_future(self._fill_from_stream(key, chunks, listener))
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._finish_stream_fill(key, t))
+        return task
+
+    def _finish_stream_fill(self, key: str, task: asyncio.Task) -> None:
+        self._inflight.pop(key, None)
+        # Nobody may be awaiting a streamed fill, so surface failures here
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("TTS cache fill for %s failed: %s", key, task.exception())
+
+    async def _fill_from_stream(
+        self,
+        key: str,
+        chunks: AsyncIterator[bytes],
+        listener: asyncio.Queue,
+    ) -> Path:
+        tmp_path = self.path_for(key).with_suffix(".part")
+        size = 0
+        try:
+            with open(tmp_path, "wb") as f:
+                async for chunk in chunks:
+                    f.write(chunk)
+                    size += len(chunk)
+                    listener.put_nowait(chunk)
+        except BaseException as e:
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+            listener.put_nowait(e)
+            raise
+
+        path = self._commit(key, tmp_path, size)
+        listener.put_nowait(None)
+        return path
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current size, for monitoring."""
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+            "entries": len(self._index),
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+@lru_cache
+def get_tts_cache() -> TTSCache:
+    """Get the TTS cache singleton."""
+    settings = get_settings()
+    return TTSCache(Path(settings.tts_cache_dir), settings.tts_cache_max_bytes)
+
+
+async def get_cached_speech(
+    text: str,
+    language: str = "en",
+    voice_id: Optional[str] = None,
+    translated_text: Optional[str] = None,
+) -> tuple[Path, str]:
+    """
+    Get MP3 audio for text from the TTS cache, synthesizing it on a miss.
+
+    The cache key covers the source text, language, voice, model and output format,
+    so a hit also skips the translation step for non-English languages.
+
+    Args:
+        text: The text to convert to speech.
+        language: Language code for TTS (en, es, fr, de, zh). Defaults to "en".
+        voice_id: Optional ElevenLabs voice ID. If not provided, uses default.
+        translated_text: Optional existing translation of text, used on a miss.
+
+    Returns:
+        Tuple of (path to the cached MP3 file, cache key).
+
+    Raises:
+        HTTPException: If TTS generation fails.
+    """
+    language, voice_id = _normalize_speech_params(language, voice_id)
+    key = speech_cache_key(text, language, voice_id)
+    cache = get_tts_cache()
+
+    path = await cache.get_or_create(
+        key,
+        lambda: generate_speech(
+            text, language=language, voice_id=voice_id, translated_text=translated_text
+        ),
+    )
+    return path, key
+
+
+async def stream_cached_speech(
+    text: str,
+    language: str = "en",
+    voice_id: Optional[str] = None,
+) -> tuple[Optional[Path], str, Optional[AsyncIterator[bytes]]]:
+    """
+    Get MP3 audio for text, streaming it from ElevenLabs on a cache miss.
+
+    On a hit (or when another request is already synthesizing the same clip)
+    the cached file path is returned. On a miss, chunks are relayed as they
+    arrive while being written through to the cache.
+
+    Args:
+        text: The text to convert to speech.
+        language: Language code for TTS (en, es, fr, de, zh). Defaults to "en".
+        voice_id: Optional ElevenLabs voice ID. If not provided, uses default.
+
+    Returns:
+        Tuple of (cached file path or None, cache key, chunk iterator or None).
+        Exactly one of the path and the iterator is set.
+
+    Raises:
+        HTTPException: If the TTS stream cannot be opened or fails before any audio.
+    """
+    language, voice_id = _normalize_speech_params(language, voice_id)
+    key = speech_cache_key(text, language, voice_id)
+    cache = get_tts_cache()
+
+    path = cache.get(key)
+    if path is not None:
+        cache.hits += 1
+        return path, key, None
+
+    if cache.is_inflight(key):
+        return await _wait_for_fill(text, language, voice_id, key), key, None
+
+    upstream = await open_speech_stream(text, language=language, voice_id=voice_id)
+
+    # Another request may have started the same clip while we were connecting
+    if cache.is_inflight(key):
+        await upstream.aclose()
+        return await _wait_for_fill(text, language, voice_id, key), key, None
+
+    listener: asyncio.Queue = asyncio.Queue()
+    cache.fill_from_stream(key, upstream, listener)
+
+    # Wait for the first chunk, so a stream that fails before any audio
+    # becomes a 502 instead of an empty 200
+    first = await listener.get()
+    if isinstance(first, HTTPException):
+        raise first
+    if isinstance(first, BaseException):
+        raise HTTPException(status_code=502, detail=f"ElevenLabs TTS stream failed: {first}")
+    if first is None:
+        return cache.get(key), key, None
+
+    async def _relay() -> AsyncIterator[bytes]:
+        yield first
+        while True:
+            item = await listener.get()
+            if item is None:
+                return
+            if isinstance(item, BaseException):
+                # Headers are already sent: abort the response rather than
+                # ending it cleanly with a truncated clip
+                logger.warning("TTS stream for %s aborted: %s", key, item)
+                raise RuntimeError(f"TTS stream for {key} aborted") from item
+            yield item
+
+    return None, key, _relay()
+
+
+async def _wait_for_fill(text: str, language: str, voice_id: str, key: str) -> Path:
+    """Wait for another request's fill of ``key``, synthesizing afresh if it failed."""
+    cache = get_tts_cache()
+    try:
+        path = await cache.wait_inflight(key)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.warning("TTS cache fill for %s failed, synthesizing again: %s", key, e)
+        path = None
+    if path is None:
+        path, _ = await get_cached_speech(text, language=language, voice_id=voice_id)
+    return path
@@ -9,6 +9,7 @@ import httpx
 from uuid_extensions import uuid7
 
 from app.database import get_db
+from app.services.metrics import InstrumentedTransport, timed_db
 
 logger = logging.getLogger(__name__)
 
@@ -34,7 +35,7 @@ async def fetch_elevenlabs_voices() -> list[dict]:
     params = {"voice_type": "default", "page_size": 100}
 
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with httpx.AsyncClient(timeout=30.0, transport=InstrumentedTransport()) as client:
             response = await client.get(url, headers=headers, params=params)
 
         if response.status_code != 200:
@@ -88,6 +89,7 @@ async def get_available_voices(teacher_id: Optional[str] = None) -> list[dict]:
     return result
 
 
+@timed_db
 def get_custom_voices(teacher_id: str) -> list[dict]:
     """Get custom voices added by a teacher."""
     with get_db() as conn:
@@ -113,6 +115,7 @@ def get_custom_voices(teacher_id: str) -> list[dict]:
     ]
 
 
+@timed_db
 def add_custom_voice(teacher_id: str, voice_id: str, voice_name: Optional[str] = None) -> dict:
     """Add a custom voice ID for a teacher."""
     now = datetime.utcnow()
@@ -161,6 +164,7 @@ def add_custom_voice(teacher_id: str, voice_id: str, voice_name: Optional[str] =
     }
 
 
+@timed_db
 def remove_custom_voice(teacher_id: str, voice_id: str) -> bool:
     """Remove a custom voice for a teacher."""
     with get_db() as conn:
@@ -174,6 +178,7 @@ def remove_custom_voice(teacher_id: str, voice_id: str) -> bool:
         return result.rowcount > 0
 
 
+@timed_db
 def get_voice_preferences(teacher_id: str) -> dict[str, dict]:
     """
     Get all voice preferences for a teacher.
@@ -200,6 +205,7 @@ def get_voice_preferences(teacher_id: str) -> dict[str, dict]:
     return preferences
 
 
+@timed_db
 def get_voice_for_language(teacher_id: str, language_code: str) -> str:
     """
     Get the voice_id for a specific teacher and language.
@@ -221,6 +227,7 @@ def get_voice_for_language(teacher_id: str, language_code: str) -> str:
     return DEFAULT_VOICE_ID
 
 
+@timed_db
 def update_voice_preference(
     teacher_id: str,
     language_code: str,
@@ -44,6 +44,7 @@ export default function StudentJoinPage() {
         room_code: formData.room_code.toUpperCase(),
         student_id: formData.student_id,
         student_name: formData.student_name,
+        language: formData.language,
       })
 
       // Store session info in sessionStorage for the exam page
@@ -78,6 +78,7 @@ export interface JoinExamRequest {
   room_code: string
   student_name: string
   student_id: string
+  language?: string
 }
 
 export interface JoinExamResponse {
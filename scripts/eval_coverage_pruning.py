@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Evaluate criterion pruning for coverage analysis on recorded transcripts.
+
+For every recorded coverage analysis, rebuilds the coverage prompt with all
+rubric criteria and with only the criteria the relevance index selects, then
+reports the prompt size saved and how many of the criteria the LLM actually
+marked as covered would still have been sent (recall).
+
+The question's target criteria are not recorded, so they are not added to
+the pruned set; recall here is a lower bound.
+
+Usage:
+    python scripts/eval_coverage_pruning.py
+
+Options:
+    --top-k     Criteria kept per response (default: from .env / settings)
+    --db-path   Path to the DuckDB database file (default: from .env)
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+CHARS_PER_TOKEN = 4  # Rough estimate for English prose
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure prompt size and recall of coverage criterion pruning"
+    )
+    parser.add_argument(
+        "--top-k",
+        type=int,
+        default=None,
+        help="Criteria kept per response (default: COVERAGE_TOP_K setting)"
+    )
+    parser.add_argument(
+        "--db-path",
+        default=None,
+        help="Path to the DuckDB database file (overrides .env setting)"
+    )
+
+    args = parser.parse_args()
+
+    # Override settings (must be done before importing app modules)
+    if args.db_path:
+        os.environ["DUCKDB_PATH"] = args.db_path
+    if args.top_k is not None:
+        os.environ["COVERAGE_TOP_K"] = str(args.top_k)
+
+    from app.database import get_db, get_connection, close_connection
+    from app.models.domain import CoverageMap, ParsedRubric
+    from app.services import coverage as coverage_service
+
+    get_connection()
+    try:
+        with get_db() as conn:
+            rows = conn.execute(
+                """
+                SELECT r.content, ca.criteria_covered, ru.parsed_criteria,
+                    (SELECT q.content FROM transcript_entries q
+                     WHERE q.session_id = r.session_id AND q.entry_type = 'question'
+                       AND q.timestamp <= r.timestamp
+                     ORDER BY q.timestamp DESC LIMIT 1) AS question
+                FROM coverage_analyses ca
+                JOIN transcript_entries r ON r.id = ca.transcript_entry_id
+                JOIN student_sessions s ON s.id = r.session_id
+                JOIN exams e ON e.id = s.exam_id
+                JOIN rubrics ru ON ru.id = e.rubric_id
+                WHERE ru.parsed_criteria IS NOT NULL
+                """
+            ).fetchall()
+    finally:
+        close_connection()
+
+    full_tokens = 0
+    pruned_tokens = 0
+    covered_total = 0
+    covered_kept = 0
+    criteria_sent = 0
+    criteria_total = 0
+
+    for response, covered_json, parsed_json, question in rows:
+        rubric = ParsedRubric.model_validate_json(parsed_json)
+        covered = set(json.loads(covered_json) if covered_json else [])
+        question = question or ""
+
+        selected = coverage_service.select_coverage_criteria(response, question, rubric)
+        selected_ids = {c.id for c in selected}
+
+        empty = CoverageMap()
+        full = coverage_service.build_coverage_prompt(response, question, rubric.criteria, empty)
+        pruned = coverage_service.build_coverage_prompt(response, question, selected, empty)
+
+        full_tokens += len(full) // CHARS_PER_TOKEN
+        pruned_tokens += len(pruned) // CHARS_PER_TOKEN
+        covered_total += len(covered)
+        covered_kept += len(covered & selected_ids)
+        criteria_sent += len(selected)
+        criteria_total += len(rubric.criteria)
+
+    report = {
+        "responses": len(rows),
+        "prompt_tokens_full": full_tokens,
+        "prompt_tokens_pruned": pruned_tokens,
+        "prompt_token_reduction": 1 - pruned_tokens / full_tokens if full_tokens else 0.0,
+        "criteria_sent_fraction": criteria_sent / criteria_total if criteria_total else 0.0,
+        "covered_criteria": covered_total,
+        "covered_criteria_recall": covered_kept / covered_total if covered_total else 1.0,
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,519 @@
+#!/usr/bin/env python3
+"""
+Simulated-classroom load test.
+
+Runs the real FastAPI app in-process (httpx ASGITransport, with its lifespan
+and background workers) against a throwaway database. Upstream services are
+replaced by latency models:
+
+- LLM: a fake client answering each call site with a plausible reply after a
+  log-normally distributed delay (usage is still recorded per call site)
+- ElevenLabs STT/TTS: a fake HTTP transport with its own latency models
+
+A teacher registers, creates a rubric and starts an exam. Then N students
+join and answer (by text or audio), occasionally skip, fetch question audio
+and their transcript, while M teachers poll the monitor endpoints. The
+report (JSON) has throughput and p50/p95/p99 latency and error rate per
+endpoint, so runs can be compared.
+
+Usage:
+    python scripts/load_test.py --students 30 --teachers 2
+
+Options:
+    --students        Concurrent students (default: 30)
+    --teachers        Teachers polling the monitor (default: 1)
+    --answers         Answers per student before leaving (default: 6)
+    --think-time      Mean seconds between a student's actions (default: 1.0)
+    --poll-interval   Seconds between monitor polls (default: 2.0)
+    --skip-rate       Chance a student skips instead of answering (default: 0.1)
+    --audio-rate      Chance an answer is sent as audio (default: 0.3)
+    --tts-rate        Chance a student fetches question audio (default: 0.5)
+    --transcript-rate Chance a student fetches the transcript (default: 0.3)
+    --latency-scale   Multiplier for all fake upstream latencies; 0 measures
+                      the app alone (default: 1.0)
+    --languages       Comma-separated languages students pick from (default: en)
+    --async-answers   Submit answers with "Prefer: respond-async" and poll
+    --slo-ms          p95 answer latency objective to check (default: 3000)
+    --seed            Random seed (default: 1)
+    --output          Write the JSON report to this file instead of stdout
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Optional
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import httpx
+
+RUBRIC = """# Biology Exam - Photosynthesis
+
+## Understanding of Process (30 points)
+- Explain the light-dependent reactions
+- Describe the Calvin cycle
+- Identify the role of chlorophyll
+
+## Application (20 points)
+- Compare photosynthesis and cellular respiration
+- Explain the importance in the ecosystem
+
+## Critical Thinking (10 points)
+- Analyze what would happen if photosynthesis stopped
+"""
+
+# Median upstream latency in milliseconds (log-normal, sigma below)
+LLM_LATENCY_MS = {
+    "coverage": 900,
+    "struggle": 600,
+    "completion": 700,
+    "question": 1200,
+    "first_question": 1200,
+    "synthesis_question": 1200,
+    "adapt_question": 800,
+    "translate": 500,
+    "transcript_summary": 900,
+}
+DEFAULT_LLM_LATENCY_MS = 800
+STT_LATENCY_MS = 700
+TTS_LATENCY_MS = 400
+LATENCY_SIGMA = 0.35
+
+# Bytes of fake MP3 per TTS clip
+TTS_CLIP_BYTES = 24_000
+
+# The fake STT recovers the spoken answer from the uploaded "audio"
+AUDIO_MARKER = re.compile(rb"SIMULATED-ANSWER:(.*?):END", re.DOTALL)
+
+
+class LatencyModel:
+    """Log-normal upstream latencies around fixed medians."""
+
+    def __init__(self, scale: float, rng: random.Random):
+        self.scale = scale
+        self.rng = rng
+
+    async def wait(self, median_ms: float) -> None:
+        if self.scale <= 0:
+            await asyncio.sleep(0)
+            return
+        ms = self.rng.lognormvariate(math.log(median_ms), LATENCY_SIGMA) * self.scale
+        await asyncio.sleep(ms / 1000)
+
+
+def make_fake_llm_client(latency: LatencyModel, rng: random.Random):
+    """An LLMClient whose completions come from canned replies per call site."""
+    from app.services import llm_client
+
+    class FakeLLMClient(llm_client.LLMClient):
+        criterion_ids: list[str] = []
+
+        async def complete(
+            self,
+            prompt: str,
+            system_prompt: Optional[str] = None,
+            temperature: float = 0.7,
+            max_tokens: int = 2048,
+            cached_prefix: Optional[str] = None,
+            call_site: str = "other",
+        ) -> str:
+            started = time.perf_counter()
+            await latency.wait(LLM_LATENCY_MS.get(call_site, DEFAULT_LLM_LATENCY_MS))
+            reply = self._reply(call_site, system_prompt or "", prompt)
+            prompt_tokens = (len(prompt) + len(system_prompt or "") + len(cached_prefix or "")) // 4
+            llm_client._record_usage(
+                call_site,
+                {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": len(reply) // 4,
+                    "prompt_tokens_details": {"cached_tokens": len(cached_prefix or "") // 4},
+                },
+                time.perf_counter() - started,
+            )
+            return reply
+
+        def _reply(self, call_site: str, system_prompt: str, prompt: str) -> str:
+            n = rng.randint(1, 10_000)
+            if call_site == "coverage":
+                covered = rng.sample(self.criterion_ids, k=min(len(self.criterion_ids), rng.randint(0, 2)))
+                return json.dumps({
+                    "coverage_updates": {cid: round(rng.uniform(0.4, 1.0), 2) for cid in covered},
+                    "reasoning": "Simulated coverage analysis",
+                })
+            if call_site == "struggle":
+                if rng.random() < 0.1:
+                    return json.dumps({
+                        "struggle_detected": True,
+                        "struggle_type": "confusion",
+                        "severity": "medium",
+                        "reasoning": "Simulated struggle",
+                    })
+                return json.dumps({"struggle_detected": False})
+            if call_site == "completion":
+                return json.dumps({"is_complete": False, "missing_criteria": [], "coverage_summary": ""})
+            if call_site in ("question", "first_question"):
+                question = f"Simulated question {n}: how does this process work?"
+                if "JSON" in system_prompt:
+                    return json.dumps({"question": question, "simplified": f"Simulated simple question {n}?"})
+                return question
+            if call_site == "translate":
+                if "valid JSON" in prompt:
+                    languages = re.findall(r"^- (\w+): ", prompt, re.MULTILINE)
+                    return json.dumps({language: f"[{language}] translated {n}" for language in languages})
+                return f"Translated text {n}"
+            if call_site == "transcript_summary":
+                return "The student has discussed the simulated topics so far."
+            return f"Simulated reply {n}"
+
+    return FakeLLMClient()
+
+
+def install_fake_elevenlabs(latency: LatencyModel, rng: random.Random) -> None:
+    """Answer every real (non-ASGI) HTTP request with the fake ElevenLabs API."""
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if request.url.host == "api.elevenlabs.io" and path == "/v1/speech-to-text":
+            body = await request.aread()
+            await latency.wait(STT_LATENCY_MS)
+            match = AUDIO_MARKER.search(body)
+            text = match.group(1).decode() if match else ""
+            return httpx.Response(200, json={"text": text}, request=request)
+        if request.url.host == "api.elevenlabs.io" and path.startswith("/v1/text-to-speech/"):
+            await request.aread()
+            await latency.wait(TTS_LATENCY_MS)
+            return httpx.Response(200, content=rng.randbytes(TTS_CLIP_BYTES), request=request)
+        return httpx.Response(404, json={"detail": "Not simulated"}, request=request)
+
+    httpx.AsyncHTTPTransport.handle_async_request = handle_async_request
+
+
+class Recorder:
+    """Latency samples and outcomes per endpoint."""
+
+    def __init__(self):
+        self.samples: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self.statuses: dict[str, dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        # Submission to next question, including polling in async mode
+        self.answer_ms: list[float] = []
+        self.answer_errors = 0
+
+    async def call(
+        self,
+        client: httpx.AsyncClient,
+        endpoint: str,
+        method: str,
+        url: str,
+        ok: tuple[int, ...] = (200,),
+        **kwargs,
+    ) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+            await response.aread()
+        except Exception:
+            self.samples[endpoint].append((time.perf_counter() - started) * 1000)
+            self.errors[endpoint] += 1
+            self.statuses[endpoint][0] += 1
+            return None
+        self.samples[endpoint].append((time.perf_counter() - started) * 1000)
+        self.statuses[endpoint][response.status_code] += 1
+        if response.status_code not in ok:
+            self.errors[endpoint] += 1
+        return response
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(values: list[float], errors: int) -> dict:
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "errors": errors,
+        "error_rate": round(errors / len(ordered), 4) if ordered else 0.0,
+        "p50_ms": round(percentile(ordered, 0.50), 1),
+        "p95_ms": round(percentile(ordered, 0.95), 1),
+        "p99_ms": round(percentile(ordered, 0.99), 1),
+        "max_ms": round(ordered[-1], 1) if ordered else 0.0,
+    }
+
+
+async def set_up_exam(client: httpx.AsyncClient, fake_llm) -> tuple[dict, str]:
+    """Register a teacher, create the rubric and start the exam."""
+    credentials = {"username": "load-test-teacher", "password": "load-test-password"}
+    (await client.post("/internal/auth/register", json=credentials)).raise_for_status()
+    login = await client.post("/internal/auth/login", json=credentials)
+    login.raise_for_status()
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    rubric = await client.post(
+        "/internal/rubrics", json={"title": "Photosynthesis", "content": RUBRIC}, headers=headers
+    )
+    rubric.raise_for_status()
+    parsed = rubric.json()["parsed_criteria"]
+    if not parsed:
+        raise RuntimeError("Load test rubric was not parsed")
+    fake_llm.criterion_ids = [criterion["id"] for criterion in parsed["criteria"]]
+
+    exam = await client.post("/internal/exams", json={"rubric_id": rubric.json()["id"]}, headers=headers)
+    exam.raise_for_status()
+    return headers, exam.json()
+
+
+async def run_student(
+    client: httpx.AsyncClient,
+    recorder: Recorder,
+    args: argparse.Namespace,
+    rng: random.Random,
+    room_code: str,
+    index: int,
+) -> int:
+    """One student's exam; returns the number of answers given."""
+
+    language = rng.choice(args.languages)
+
+    async def think():
+        await asyncio.sleep(rng.expovariate(1 / args.think_time) if args.think_time > 0 else 0)
+
+    joined = await recorder.call(
+        client, "POST /join", "POST", "/api/v1/join",
+        json={
+            "room_code": room_code,
+            "student_name": f"Student {index}",
+            "student_id": f"S{index:04d}",
+            "language": language,
+        },
+    )
+    if joined is None or joined.status_code != 200:
+        return 0
+    session_id = joined.json()["session_id"]
+    question = joined.json()["first_question"]
+    base = f"/api/v1/session/{session_id}"
+
+    answers = 0
+    while answers < args.answers:
+        if rng.random() < args.tts_rate:
+            await recorder.call(
+                client, "GET /session/{id}/tts", "GET", f"{base}/tts",
+                params={"text": question, "language": language},
+            )
+        await think()
+
+        if rng.random() < args.skip_rate:
+            response = await recorder.call(
+                client, "POST /session/{id}/skip", "POST", f"{base}/skip", ok=(200, 400)
+            )
+        else:
+            answer = f"Answer {answers + 1} from student {index} about chlorophyll and the Calvin cycle"
+            submitted = time.perf_counter()
+            headers = {"Prefer": "respond-async"} if args.async_answers else {}
+            if rng.random() < args.audio_rate:
+                audio = f"SIMULATED-ANSWER:{answer}:END".encode()
+                response = await recorder.call(
+                    client, "POST /session/{id}/audio", "POST", f"{base}/audio",
+                    ok=(200, 202),
+                    files={"audio": ("answer.webm", audio, "audio/webm")},
+                    data={"question": question},
+                    headers=headers,
+                )
+            else:
+                response = await recorder.call(
+                    client, "POST /session/{id}/response", "POST", f"{base}/response",
+                    ok=(200, 202),
+                    json={"session_id": session_id, "question": question, "response": answer},
+                    headers=headers,
+                )
+            if response is not None and response.status_code == 202:
+                job_id = response.json()["job_id"]
+                response = await recorder.call(
+                    client, "GET /session/{id}/answers/{job_id}", "GET", f"{base}/answers/{job_id}",
+                    params={"wait": 30},
+                )
+                if response is not None and response.status_code == 200:
+                    result = response.json().get("result")
+                    response = httpx.Response(200, json=result) if result else None
+            recorder.answer_ms.append((time.perf_counter() - submitted) * 1000)
+            if response is None or response.status_code != 200:
+                recorder.answer_errors += 1
+            answers += 1
+
+        if response is None or response.status_code != 200:
+            break
+        body = response.json()
+        if body.get("is_final"):
+            break
+        question = body["question_text"]
+
+        if rng.random() < args.transcript_rate:
+            await recorder.call(client, "GET /session/{id}/transcript", "GET", f"{base}/transcript")
+        await think()
+
+    await recorder.call(client, "POST /session/{id}/leave", "POST", f"{base}/leave", ok=(200, 400))
+    return answers
+
+
+async def run_teacher(
+    client: httpx.AsyncClient,
+    recorder: Recorder,
+    args: argparse.Namespace,
+    headers: dict,
+    exam_id: str,
+    done: asyncio.Event,
+) -> None:
+    """Poll the monitor views until every student has finished."""
+    while not done.is_set():
+        await recorder.call(
+            client, "GET /exams/{id}/sessions", "GET", f"/internal/exams/{exam_id}/sessions", headers=headers
+        )
+        await recorder.call(
+            client, "GET /exams/{id}/struggles", "GET", f"/internal/exams/{exam_id}/struggles", headers=headers
+        )
+        try:
+            await asyncio.wait_for(done.wait(), timeout=args.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run(args: argparse.Namespace) -> dict:
+    from app.main import app
+    from app.services import llm_client
+    from app.services import metrics
+
+    rng = random.Random(args.seed)
+    latency = LatencyModel(args.latency_scale, random.Random(args.seed + 1))
+    fake_llm = make_fake_llm_client(latency, random.Random(args.seed + 2))
+    llm_client._llm_client = fake_llm
+    install_fake_elevenlabs(latency, random.Random(args.seed + 3))
+
+    recorder = Recorder()
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=120.0) as client:
+            headers, exam = await set_up_exam(client, fake_llm)
+
+            done = asyncio.Event()
+            teachers = [
+                asyncio.create_task(run_teacher(client, recorder, args, headers, exam["id"], done))
+                for _ in range(args.teachers)
+            ]
+            started = time.perf_counter()
+            answers = await asyncio.gather(*(
+                run_student(client, recorder, args, random.Random(rng.random()), exam["room_code"], index)
+                for index in range(args.students)
+            ))
+            elapsed = time.perf_counter() - started
+            done.set()
+            await asyncio.gather(*teachers)
+
+    endpoints = {
+        endpoint: {
+            **summarize(values, recorder.errors[endpoint]),
+            "statuses": dict(sorted(recorder.statuses[endpoint].items())),
+        }
+        for endpoint, values in sorted(recorder.samples.items())
+    }
+    answer_summary = summarize(recorder.answer_ms, recorder.answer_errors)
+    total_requests = sum(len(values) for values in recorder.samples.values())
+    total_errors = sum(recorder.errors.values())
+
+    return {
+        "config": {
+            key: getattr(args, key)
+            for key in (
+                "students", "teachers", "answers", "think_time", "poll_interval", "skip_rate", "audio_rate",
+                "tts_rate", "transcript_rate", "languages", "latency_scale", "async_answers", "slo_ms", "seed",
+            )
+        },
+        "duration_seconds": round(elapsed, 3),
+        "requests": total_requests,
+        "errors": total_errors,
+        "error_rate": round(total_errors / total_requests, 4) if total_requests else 0.0,
+        "throughput_rps": round(total_requests / elapsed, 2) if elapsed else 0.0,
+        "answers": sum(answers),
+        "answers_per_second": round(sum(answers) / elapsed, 2) if elapsed else 0.0,
+        "slo": {
+            "p95_answer_ms": answer_summary["p95_ms"],
+            "target_ms": args.slo_ms,
+            "met": answer_summary["p95_ms"] <= args.slo_ms,
+        },
+        "answer": answer_summary,
+        "endpoints": endpoints,
+        "llm_calls": {
+            call_site: int(stats["requests"])
+            for call_site, stats in llm_client.get_llm_usage_stats().items()
+            if call_site != "total"
+        },
+        "answers_per_minute_gauge": metrics.answers_per_minute(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Simulate a classroom against the app and report latency per endpoint"
+    )
+    parser.add_argument("--students", type=int, default=30, help="Concurrent students")
+    parser.add_argument("--teachers", type=int, default=1, help="Teachers polling the monitor")
+    parser.add_argument("--answers", type=int, default=6, help="Answers per student before leaving")
+    parser.add_argument("--think-time", type=float, default=1.0, help="Mean seconds between a student's actions")
+    parser.add_argument("--poll-interval", type=float, default=2.0, help="Seconds between monitor polls")
+    parser.add_argument("--skip-rate", type=float, default=0.1, help="Chance a student skips a question")
+    parser.add_argument("--audio-rate", type=float, default=0.3, help="Chance an answer is sent as audio")
+    parser.add_argument("--tts-rate", type=float, default=0.5, help="Chance a student fetches question audio")
+    parser.add_argument("--transcript-rate", type=float, default=0.3, help="Chance a student fetches the transcript")
+    parser.add_argument(
+        "--latency-scale",
+        type=float,
+        default=1.0,
+        help="Multiplier for fake upstream latencies (0 measures the app alone)"
+    )
+    parser.add_argument(
+        "--languages",
+        type=lambda value: value.split(","),
+        default=["en"],
+        help="Comma-separated languages students pick from"
+    )
+    parser.add_argument("--async-answers", action="store_true", help="Submit answers with Prefer: respond-async")
+    parser.add_argument("--slo-ms", type=float, default=3000.0, help="p95 answer latency objective")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed")
+    parser.add_argument("--output", default=None, help="Write the JSON report to this file")
+
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="speakup-load-") as tmp:
+        # Override settings (must be done before importing app modules)
+        os.environ["DUCKDB_PATH"] = str(Path(tmp) / "load_test.duckdb")
+        os.environ["TTS_CACHE_DIR"] = str(Path(tmp) / "tts_cache")
+        os.environ["MAX_STUDENTS_PER_EXAM"] = str(max(args.students, 1))
+        os.environ["OPENROUTER_API_KEY"] = "load-test"
+        os.environ["ELEVENLABS_API_KEY"] = "load-test"
+        os.environ["METRICS_ENABLED"] = "true"
+
+        report = asyncio.run(run(args))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,9 @@
 Seed script to import sample rubrics into the database.
 
 This script creates a demo teacher account (if it doesn't exist) and imports
-the sample rubrics from data/rubrics/ into the database.
+the sample rubrics from data/rubrics/ into the database. Rubrics are parsed
+with the local markdown parser (or reuse a stored parse of identical
+content), so seeding needs no LLM access.
 
 Usage:
     python scripts/seed_rubrics.py
@@ -77,6 +79,7 @@ def main():
     # Import app modules after setting environment
     from app.database import get_db, get_connection, close_connection
     from app.services.auth import register_teacher
+    from app.services.coverage import parse_rubric_offline
     from app.services.rubric import create_rubric, list_rubrics
 
     print("=== Speak Up Rubric Seed Script ===\n")
@@ -102,6 +105,7 @@ def main():
             get_db,
             create_rubric,
             list_rubrics,
+            parse_rubric_offline,
         )
 
     finally:
@@ -133,7 +137,14 @@ def get_or_create_demo_teacher(username: str, password: str, get_db, register_te
     return teacher.id
 
 
-def import_rubrics(teacher_id: str, force: bool, get_db, create_rubric, list_rubrics) -> None:
+def import_rubrics(
+    teacher_id: str,
+    force: bool,
+    get_db,
+    create_rubric,
+    list_rubrics,
+    parse_rubric_offline,
+) -> None:
     """Import rubric markdown files into the database."""
     # Get existing rubric titles
     rubrics = list_rubrics(teacher_id)
@@ -172,14 +183,17 @@ def import_rubrics(teacher_id: str, force: bool, get_db, create_rubric, list_rub
                 print(f"Deleted existing rubric: {title}")
 
         content = rubric_file.read_text(encoding="utf-8")
+        parsed = parse_rubric_offline(content)
 
         rubric = create_rubric(
             teacher_id=teacher_id,
             title=title,
             content=content,
+            parsed_criteria=parsed,
         )
 
-        print(f"Imported: {title} (ID: {rubric.id})")
+        status = f"{len(parsed.criteria)} criteria" if parsed else "not parsed"
+        print(f"Imported: {title} (ID: {rubric.id}, {status})")
         imported_count += 1
 
     print(f"\nSummary: {imported_count} imported, {skipped_count} skipped")
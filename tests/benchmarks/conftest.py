@@ -0,0 +1,142 @@
+"""
+Shared fixtures for the data-path benchmarks.
+
+The seeded database is built once per module with set-based SQL, at a size
+set by environment variables (defaults: 2,000 exams, 20,000 sessions and
+1,000,000 transcript entries):
+
+    BENCHMARK_TEACHERS, BENCHMARK_EXAMS, BENCHMARK_SESSIONS_PER_EXAM,
+    BENCHMARK_ENTRIES_PER_SESSION
+
+The benchmarks are marked `benchmark` and deselected by default. Regressions
+are checked against a run saved earlier on the same machine:
+
+    pytest -m benchmark tests/benchmarks --benchmark-autosave
+    pytest -m benchmark tests/benchmarks --benchmark-compare --benchmark-compare-fail=median:100%
+"""
+
+import json
+import os
+
+import pytest
+
+from app.config import get_settings
+from app.database import close_connection, get_db
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.environ.get(name, default))
+
+
+SCALE = {
+    "teachers": _env_int("BENCHMARK_TEACHERS", 20),
+    "exams": _env_int("BENCHMARK_EXAMS", 2000),
+    "sessions_per_exam": _env_int("BENCHMARK_SESSIONS_PER_EXAM", 10),
+    "entries_per_session": _env_int("BENCHMARK_ENTRIES_PER_SESSION", 50),
+}
+
+PARSED_CRITERIA = json.dumps({
+    "criteria": [
+        {"id": f"c{n}", "name": f"Criterion {n}", "description": f"Description {n}", "points": 10}
+        for n in range(1, 6)
+    ],
+    "total_points": 50,
+})
+
+
+def seed_database(conn, teachers: int, exams: int, sessions_per_exam: int, entries_per_session: int) -> None:
+    """
+    Fill the schema with a synthetic school's worth of exams.
+
+    Exams are spread round-robin over teachers and the first exam of each
+    teacher is active. Sessions alternate question/response entries one
+    second apart, and every session has two struggle events.
+    """
+    sessions = exams * sessions_per_exam
+    entries = sessions * entries_per_session
+
+    conn.execute(
+        """
+        INSERT INTO teachers (id, username, password_hash, display_name)
+        SELECT 'teacher-' || i, 'teacher' || i, 'x', 'Teacher ' || i FROM range(?) t(i)
+        """,
+        [teachers],
+    )
+    conn.execute(
+        """
+        INSERT INTO rubrics (id, teacher_id, title, content, parsed_criteria)
+        SELECT 'rubric-' || i, 'teacher-' || i, 'Rubric ' || i, 'Content', ? FROM range(?) t(i)
+        """,
+        [PARSED_CRITERIA, teachers],
+    )
+    conn.execute(
+        """
+        INSERT INTO exams (id, teacher_id, rubric_id, room_code, status, started_at, ended_at, created_at)
+        SELECT 'exam-' || i, 'teacher-' || (i % $teachers), 'rubric-' || (i % $teachers),
+               'R' || lpad(i::VARCHAR, 7, '0'),
+               CASE WHEN i < $teachers THEN 'active' ELSE 'completed' END,
+               TIMESTAMP '2026-01-01' + to_hours(i),
+               CASE WHEN i < $teachers THEN NULL ELSE TIMESTAMP '2026-01-01' + to_hours(i) + to_minutes(50) END,
+               TIMESTAMP '2026-01-01' + to_hours(i)
+        FROM range($exams) t(i)
+        """,
+        {"teachers": teachers, "exams": exams},
+    )
+    conn.execute(
+        """
+        INSERT INTO student_sessions
+            (id, exam_id, student_name, student_id, status, rubric_coverage, skip_state, started_at, ended_at)
+        SELECT 'session-' || i, 'exam-' || (i // $per_exam), 'Student ' || i, 'S' || i,
+               CASE WHEN i % $per_exam = 0 THEN 'active' ELSE 'completed' END,
+               '{"covered_criteria": {"c1": 0.8, "c2": 0.5, "c3": 0.3}}',
+               '{}',
+               TIMESTAMP '2026-01-01' + to_hours(i // $per_exam) + to_seconds(i % $per_exam),
+               CASE WHEN i % $per_exam = 0 THEN NULL
+                    ELSE TIMESTAMP '2026-01-01' + to_hours(i // $per_exam) + to_minutes(30) END
+        FROM range($sessions) t(i)
+        """,
+        {"per_exam": sessions_per_exam, "sessions": sessions},
+    )
+    conn.execute(
+        """
+        INSERT INTO transcript_entries (id, session_id, entry_type, content, timestamp)
+        SELECT 'entry-' || i, 'session-' || (i // $per_session),
+               CASE WHEN i % 2 = 0 THEN 'question' ELSE 'response' END,
+               CASE WHEN i % 2 = 0
+                    THEN 'Can you explain how the light-dependent reactions feed the Calvin cycle? ' || i
+                    ELSE 'The light reactions make ATP and NADPH, which the Calvin cycle uses to fix '
+                         || 'carbon dioxide into sugars in the stroma of the chloroplast. ' || i END,
+               TIMESTAMP '2026-01-01' + to_hours((i // $per_session) // $per_exam)
+                   + to_seconds(i % $per_session)
+        FROM range($entries) t(i)
+        """,
+        {"per_session": entries_per_session, "per_exam": sessions_per_exam, "entries": entries},
+    )
+    conn.execute(
+        """
+        INSERT INTO struggle_events
+            (id, session_id, transcript_entry_id, struggle_type, severity, llm_reasoning, timestamp)
+        SELECT 'struggle-' || i || '-' || n, 'session-' || i,
+               'entry-' || (i * $per_session + 2 * n + 1),
+               CASE n WHEN 0 THEN 'confusion' ELSE 'silence' END, 'medium', 'Seeded',
+               TIMESTAMP '2026-01-01' + to_hours(i // $per_exam) + to_seconds(2 * n + 1)
+        FROM range($sessions) t(i), range(2) s(n)
+        """,
+        {"per_session": entries_per_session, "per_exam": sessions_per_exam, "sessions": sessions},
+    )
+
+
+@pytest.fixture(scope="module")
+def seeded_db(tmp_path_factory):
+    """A database seeded at benchmark scale; yields the scale used."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("DUCKDB_PATH", str(tmp_path_factory.mktemp("bench") / "bench.duckdb"))
+        get_settings.cache_clear()
+        close_connection()
+
+        with get_db() as conn:
+            seed_database(conn, **SCALE)
+        yield SCALE
+
+        close_connection()
+        get_settings.cache_clear()
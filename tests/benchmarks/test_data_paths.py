@@ -0,0 +1,78 @@
+"""
+Benchmarks of the service-layer data paths against a seeded database.
+
+    pytest -m benchmark tests/benchmarks
+
+Skipped when pytest-benchmark is not installed.
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from app.api.routes import internal
+from app.services import exam as exam_service
+from app.services import struggle as struggle_service
+from app.services import transcript as transcript_service
+
+pytestmark = pytest.mark.benchmark
+
+
+@pytest.fixture(scope="module")
+def ids(seeded_db):
+    """IDs of a session, exam and teacher in the middle of the seeded data."""
+    sessions = seeded_db["exams"] * seeded_db["sessions_per_exam"]
+    return {
+        "session": f"session-{sessions // 2}",
+        "exam": f"exam-{seeded_db['exams'] // 2}",
+        "teacher": f"teacher-{(seeded_db['exams'] // 2) % seeded_db['teachers']}",
+    }
+
+
+@pytest.fixture
+def run():
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.close()
+
+
+def test_get_session_transcript(benchmark, seeded_db, ids):
+    entries = benchmark(transcript_service.get_session_transcript, ids["session"])
+    assert len(entries) == seeded_db["entries_per_session"]
+
+
+def test_get_last_question(benchmark, ids):
+    entry = benchmark(transcript_service.get_last_question, ids["session"])
+    assert entry is not None
+
+
+def test_count_questions(benchmark, seeded_db, ids):
+    count = benchmark(transcript_service.count_questions, ids["session"])
+    assert count == seeded_db["entries_per_session"] // 2
+
+
+def test_list_exam_sessions(benchmark, seeded_db, ids):
+    sessions = benchmark(exam_service.list_exam_sessions, ids["exam"])
+    assert len(sessions) == seeded_db["sessions_per_exam"]
+
+
+def test_get_all_struggles_for_exam(benchmark, seeded_db, ids):
+    events = benchmark(struggle_service.get_all_struggles_for_exam, ids["exam"])
+    assert len(events) == 2 * seeded_db["sessions_per_exam"]
+
+
+def test_exam_analytics(benchmark, seeded_db, ids, run):
+    analytics = benchmark(lambda: run(internal.get_exam_analytics(ids["exam"], ids["teacher"])))
+    assert analytics.total_students == seeded_db["sessions_per_exam"]
+
+
+def test_analytics_overview(benchmark, seeded_db, ids, run):
+    overview = benchmark(lambda: run(internal.get_analytics_overview(ids["teacher"])))
+    assert overview["total_exams"] == seeded_db["exams"] // seeded_db["teachers"]
+
+
+def test_generate_room_code(benchmark, seeded_db):
+    code = benchmark(exam_service.generate_room_code)
+    assert len(code) == 6
@@ -12,6 +12,9 @@ from app.services import auth as auth_service
 def client(tmp_path, monkeypatch):
     db_path = tmp_path / "test.duckdb"
     monkeypatch.setenv("DUCKDB_PATH", str(db_path))
+    # Tests drain queued jobs themselves (jobs.run_pending) on their own event loop
+    monkeypatch.setenv("JOB_WORKERS", "0")
+    monkeypatch.setenv("ANSWER_JOB_WORKERS", "0")
 
     get_settings.cache_clear()
     close_connection()
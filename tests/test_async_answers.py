@@ -0,0 +1,132 @@
+import asyncio
+
+import pytest
+
+from app.models.domain import JobStatus
+from app.services import auth as auth_service
+from app.services import exam as exam_service
+from app.services import jobs
+from app.services import orchestrator
+from app.services import rubric as rubric_service
+from app.services import transcript as transcript_service
+
+ASYNC = {"Prefer": "respond-async"}
+
+
+def _create_session(client):
+    teacher_id = auth_service.decode_token(client.headers["Authorization"].split(" ")[1])
+    rubric = rubric_service.create_rubric(teacher_id, "Title", "Content")
+    exam = exam_service.create_exam(teacher_id, rubric.id)
+    session = exam_service.create_student_session(exam.id, "Student", "S1")
+    transcript_service.add_question(session.id, "Question 1")
+    return session
+
+
+def _submit(client, session_id, answer="Answer 1", question="Question 1"):
+    return client.post(
+        f"/api/v1/session/{session_id}/response",
+        json={"session_id": session_id, "question": question, "response": answer},
+        headers=ASYNC,
+    )
+
+
+@pytest.mark.asyncio
+async def test_async_answer_is_accepted_once_and_polled(client, monkeypatch):
+    session = _create_session(client)
+    processed = []
+
+    async def _fake_process(session_id, response_text, no_speech=False):
+        processed.append(response_text)
+        transcript_service.add_question(session_id, "Question 2")
+        return orchestrator.ProcessedResponse(
+            next_question="Question 2",
+            question_number=2,
+            is_final=False,
+            is_adapted=False,
+            coverage_pct=0.5,
+            struggle_event=None,
+            teacher_message=None,
+        )
+
+    monkeypatch.setattr(orchestrator, "process_student_response", _fake_process)
+
+    accepted = _submit(client, session.id)
+    assert accepted.status_code == 202
+    job_id = accepted.json()["job_id"]
+    assert accepted.json()["status"] == "pending"
+    assert accepted.headers["Location"] == f"/api/v1/session/{session.id}/answers/{job_id}"
+
+    # A client retry of the same answer joins the queued job
+    assert _submit(client, session.id).json()["job_id"] == job_id
+
+    await jobs.run_pending()
+
+    polled = client.get(f"/api/v1/session/{session.id}/answers/{job_id}", params={"wait": 1})
+    assert polled.status_code == 200
+    body = polled.json()
+    assert body["status"] == "done"
+    assert body["result"]["question_text"] == "Question 2"
+    assert body["result"]["question_number"] == 2
+    assert processed == ["Answer 1"]
+
+    # Retried after it was processed and the next question asked: still the
+    # same job, not a second answer
+    assert _submit(client, session.id).json()["job_id"] == job_id
+    assert await jobs.run_pending() == 0
+    assert processed == ["Answer 1"]
+
+    # An answer to a question that was never current is rejected
+    assert _submit(client, session.id, question="Question 7").status_code == 409
+
+    other = _create_session(client)
+    assert client.get(f"/api/v1/session/{other.id}/answers/{job_id}").status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_failed_answer_job_reports_error_and_can_be_resubmitted(client, monkeypatch):
+    session = _create_session(client)
+
+    async def _failing_process(session_id, response_text, no_speech=False):
+        raise ValueError("Rubric not found or not parsed")
+
+    monkeypatch.setattr(orchestrator, "process_student_response", _failing_process)
+
+    job_id = _submit(client, session.id).json()["job_id"]
+    assert await jobs.run_pending() == 1  # Answers are never retried automatically
+
+    body = client.get(f"/api/v1/session/{session.id}/answers/{job_id}").json()
+    assert body["status"] == "failed"
+    assert body["error"] == "ValueError: Rubric not found or not parsed"
+
+    assert _submit(client, session.id).json()["job_id"] != job_id
+
+
+@pytest.mark.asyncio
+async def test_answer_workers_wake_long_polls_and_interrupted_answers_are_not_rerun(client, monkeypatch):
+    session = _create_session(client)
+    release = asyncio.Event()
+
+    async def _slow_process(session_id, response_text, no_speech=False):
+        await release.wait()
+        return orchestrator.ProcessedResponse("Question 2", 2, False, False, 0.5, None, None)
+
+    monkeypatch.setattr(orchestrator, "process_student_response", _slow_process)
+
+    jobs.start_workers({orchestrator.ANSWER_QUEUE: 1})
+    try:
+        job_id = orchestrator.submit_response_job(session.id, "Question 1", "Answer 1")
+        asyncio.get_running_loop().call_later(0.05, release.set)
+        job = await jobs.wait_for_job(job_id, timeout=5)
+        assert job.status == JobStatus.DONE
+        assert job.result["next_question"] == "Question 2"
+
+        release.clear()
+        transcript_service.add_question(session.id, "Question 2")
+        interrupted = orchestrator.submit_response_job(session.id, "Question 2", "Answer 2")
+        await asyncio.sleep(0.05)
+    finally:
+        await jobs.stop_workers(timeout=0.1)
+
+    job = jobs.get_job(interrupted)
+    assert job.status == JobStatus.FAILED
+    assert job.last_error == "Interrupted by shutdown"
@@ -0,0 +1,303 @@
+import io
+import wave
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+from app.config import get_settings
+from app.services import auth as auth_service
+from app.services import exam as exam_service
+from app.services import orchestrator
+from app.services import rubric as rubric_service
+from app.services import stt as stt_service
+
+
+def _create_session(client):
+    token = client.headers["Authorization"].split(" ")[1]
+    teacher_id = auth_service.decode_token(token)
+    rubric = rubric_service.create_rubric(teacher_id, "Title", "Content")
+    exam = exam_service.create_exam(teacher_id, rubric.id)
+    return exam_service.create_student_session(exam.id, "Student", "S1")
+
+
+def _fake_processing(monkeypatch, captured):
+    async def _fake_process_student_response(session_id, response_text, **kwargs):
+        captured["response_text"] = response_text
+        captured.update(kwargs)
+        return orchestrator.ProcessedResponse(
+            next_question="Question 2",
+            question_number=2,
+            is_final=False,
+            is_adapted=False,
+            coverage_pct=0.0,
+            struggle_event=None,
+            teacher_message=None,
+        )
+
+    monkeypatch.setattr(orchestrator, "process_student_response", _fake_process_student_response)
+
+
+def _wav(samples, rate, channels=1):
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes((np.asarray(samples) * 32767).astype("<i2").tobytes())
+    return buffer.getvalue()
+
+
+def test_audio_upload_is_streamed_to_stt(client, monkeypatch, httpx_mock):
+    monkeypatch.setenv("ELEVENLABS_API_KEY", "test-key")
+    session = _create_session(client)
+    captured = {}
+    _fake_processing(monkeypatch, captured)
+
+    httpx_mock.add_response(url=stt_service.ELEVENLABS_STT_URL, json={"text": "  my answer  "})
+
+    audio = b"RIFF" + b"\x01" * 200_000
+    response = client.post(
+        f"/api/v1/session/{session.id}/audio",
+        files={"audio": ("answer.webm", audio, "audio/webm")},
+        data={"question": "Question 1"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["question_text"] == "Question 2"
+    assert captured["response_text"] == "my answer"
+
+    request = httpx_mock.get_request()
+    assert request.headers["xi-api-key"] == "test-key"
+    assert int(request.headers["content-length"]) == len(request.content)
+    assert audio in request.content
+    assert b'name="model_id"\r\n\r\nscribe_v1' in request.content
+    assert b'filename="answer.webm"' in request.content
+
+    stats = stt_service.get_stt_stats()
+    assert stats["requests"] >= 1
+    assert stats["bytes"] >= len(audio)
+
+
+def test_audio_upload_rejects_oversized_file(client, monkeypatch):
+    monkeypatch.setenv("ELEVENLABS_API_KEY", "test-key")
+    monkeypatch.setenv("STT_MAX_UPLOAD_BYTES", "1000")
+    get_settings.cache_clear()
+    session = _create_session(client)
+
+    response = client.post(
+        f"/api/v1/session/{session.id}/audio",
+        files={"audio": ("answer.wav", b"\x00" * 2000, "audio/wav")},
+        data={"question": "Question 1"},
+    )
+
+    assert response.status_code == 413
+
+
+def test_audio_request_over_the_limit_is_rejected_before_transcription(client, monkeypatch):
+    monkeypatch.setattr(get_settings(), "stt_max_upload_bytes", 1000)
+    session = _create_session(client)
+
+    async def _fail_transcribe_upload(audio):
+        raise AssertionError("should not be transcribed")
+
+    monkeypatch.setattr(stt_service, "transcribe_upload", _fail_transcribe_upload)
+
+    response = client.post(
+        f"/api/v1/session/{session.id}/audio",
+        files={"audio": ("answer.webm", b"\x00" * 100_000, "audio/webm")},
+        data={"question": "Question 1"},
+    )
+
+    assert response.status_code == 413
+
+
+def test_audio_upload_is_kept_in_memory_up_to_the_spool_limit(client, monkeypatch):
+    session = _create_session(client)
+    _fake_processing(monkeypatch, {})
+    rolled_over = []
+
+    async def _fake_transcribe_upload(audio):
+        rolled_over.append(audio.file._rolled)
+        return "my answer"
+
+    monkeypatch.setattr(stt_service, "transcribe_upload", _fake_transcribe_upload)
+
+    def _upload(size):
+        return client.post(
+            f"/api/v1/session/{session.id}/audio",
+            files={"audio": ("answer.webm", b"\x01" * size, "audio/webm")},
+            data={"question": "Question 1"},
+            headers={"Idempotency-Key": str(size)},
+        )
+
+    assert _upload(3 * 1024 * 1024).status_code == 200  # Past Starlette's 1 MB default
+    monkeypatch.setattr(get_settings(), "stt_spool_max_bytes", 1024)
+    assert _upload(2048).status_code == 200
+    assert rolled_over == [False, True]
+
+
+@pytest.mark.asyncio
+async def test_client_file_name_cannot_inject_multipart_headers(monkeypatch, httpx_mock):
+    monkeypatch.setenv("ELEVENLABS_API_KEY", "test-key")
+    httpx_mock.add_response(url=stt_service.ELEVENLABS_STT_URL, json={"text": "my answer"})
+
+    async def _chunks():
+        yield b"RIFF"
+
+    transcript = await stt_service.transcribe_stream(
+        _chunks(),
+        filename='../answer"\r\nX-Injected: 1.webm',
+        content_type="audio/webm\r\nX-Injected: 1",
+    )
+
+    assert transcript == "my answer"
+    content = httpx_mock.get_request().content
+    assert b"\r\nX-Injected" not in content
+    assert b'filename="answer___X-Injected_ 1.webm"' in content
+    assert b"Content-Type: application/octet-stream\r\n" in content
+
+
+def test_chunked_upload_transcribes_segments_incrementally(client, monkeypatch):
+    session = _create_session(client)
+    captured = {}
+    _fake_processing(monkeypatch, captured)
+
+    transcribed = []
+
+    async def _fake_transcribe_stream(chunks, filename="audio.wav", content_type="audio/wav", size=None):
+        data = b"".join([chunk async for chunk in chunks])
+        transcribed.append(data)
+        return data.decode()
+
+    monkeypatch.setattr(stt_service, "transcribe_stream", _fake_transcribe_stream)
+
+    url = f"/api/v1/session/{session.id}/audio"
+    for seq, word, received in [(1, b"two", 1), (0, b"one", 2), (0, b"one", 2)]:
+        ack = client.post(
+            f"{url}/chunk",
+            files={"audio": ("segment.webm", word, "audio/webm")},
+            data={"upload_id": "u1", "seq": str(seq)},
+        )
+        assert ack.status_code == 202
+        assert ack.json()["segments_received"] == received
+
+    assert sorted(transcribed) == [b"one", b"two"]  # retry of segment 0 not re-transcribed
+
+    response = client.post(
+        f"{url}/finish",
+        files={"audio": ("segment.webm", b"three", "audio/webm")},
+        data={"upload_id": "u1", "seq": "2"},
+    )
+
+    assert response.status_code == 200
+    assert captured["response_text"] == "one two three"
+
+    # Finishing the upload again replays the response instead of reprocessing it
+    captured.clear()
+    again = client.post(f"{url}/finish", data={"upload_id": "u1"})
+    assert again.status_code == 200
+    assert again.json() == response.json()
+    assert captured == {}
+
+    # The upload itself is gone once finished
+    unknown = client.post(f"{url}/finish", data={"upload_id": "u1"}, headers={"Idempotency-Key": "k1"})
+    assert unknown.status_code == 404
+
+
+def test_failed_segment_can_be_resent_and_the_upload_finished(client, monkeypatch):
+    monkeypatch.setattr(get_settings(), "stt_max_upload_bytes", 8)
+    session = _create_session(client)
+    captured = {}
+    _fake_processing(monkeypatch, captured)
+
+    attempts = []
+
+    async def _flaky_transcribe_bytes(data, filename="audio.wav", content_type="audio/wav"):
+        attempts.append(data)
+        if len(attempts) == 2:
+            raise HTTPException(status_code=502, detail="STT failed")
+        return data.decode()
+
+    monkeypatch.setattr(stt_service, "transcribe_bytes", _flaky_transcribe_bytes)
+
+    url = f"/api/v1/session/{session.id}/audio"
+    for seq, word in [(0, b"one"), (1, b"two")]:
+        ack = client.post(
+            f"{url}/chunk",
+            files={"audio": ("segment.webm", word, "audio/webm")},
+            data={"upload_id": "u1", "seq": str(seq)},
+        )
+        assert ack.status_code == 202
+
+    failed = client.post(f"{url}/finish", data={"upload_id": "u1"})
+    assert failed.status_code == 502
+
+    # Re-sending the failed segment does not count its bytes twice (3 + 3 + 3 > 8 would be 413)
+    resent = client.post(
+        f"{url}/chunk",
+        files={"audio": ("segment.webm", b"two", "audio/webm")},
+        data={"upload_id": "u1", "seq": "1"},
+    )
+    assert resent.status_code == 202
+
+    response = client.post(f"{url}/finish", data={"upload_id": "u1"})
+    assert response.status_code == 200
+    assert captured["response_text"] == "one two"
+    assert attempts == [b"one", b"two", b"two"]
+
+
+def test_silent_wav_skips_stt(client, monkeypatch, httpx_mock):
+    monkeypatch.setenv("ELEVENLABS_API_KEY", "test-key")
+    session = _create_session(client)
+    captured = {}
+    _fake_processing(monkeypatch, captured)
+
+    noise = np.random.default_rng(0).normal(0, 0.001, 48000 * 2)  # ~-60 dBFS
+    response = client.post(
+        f"/api/v1/session/{session.id}/audio",
+        files={"audio": ("answer.wav", _wav(noise, 48000), "audio/wav")},
+        data={"question": "Question 1"},
+    )
+
+    assert response.status_code == 200
+    assert captured["response_text"] == ""
+    assert captured["no_speech"] is True
+    assert httpx_mock.get_requests() == []
+
+
+def test_wav_is_downmixed_trimmed_and_resampled(client, monkeypatch):
+    session = _create_session(client)
+    captured = {}
+    _fake_processing(monkeypatch, captured)
+
+    sent = {}
+
+    async def _fake_transcribe_stream(chunks, filename="audio.wav", content_type="audio/wav", size=None):
+        sent["data"] = b"".join([chunk async for chunk in chunks])
+        return "an answer"
+
+    monkeypatch.setattr(stt_service, "transcribe_stream", _fake_transcribe_stream)
+
+    rate = 48000
+    t = np.arange(rate) / rate
+    speech = 0.5 * np.sin(2 * np.pi * 220 * t)
+    mono = np.concatenate([np.zeros(rate), speech, np.zeros(rate)])
+    stereo = np.repeat(mono, 2)
+    original = _wav(stereo, rate, channels=2)
+
+    response = client.post(
+        f"/api/v1/session/{session.id}/audio",
+        files={"audio": ("answer.wav", original, "audio/wav")},
+        data={"question": "Question 1"},
+    )
+
+    assert response.status_code == 200
+    assert captured["response_text"] == "an answer"
+    assert captured["no_speech"] is False
+
+    with wave.open(io.BytesIO(sent["data"]), "rb") as wav:
+        assert wav.getnchannels() == 1
+        assert wav.getframerate() == 16000
+        assert 1.0 <= wav.getnframes() / 16000 <= 1.5  # silence trimmed, padding kept
+    assert len(sent["data"]) < len(original) / 10
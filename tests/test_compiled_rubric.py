@@ -0,0 +1,71 @@
+from app.models.domain import CoverageMap, Criterion, ParsedRubric
+from app.services import auth as auth_service
+from app.services import rubric as rubric_service
+
+
+def _parsed():
+    return ParsedRubric(
+        criteria=[
+            Criterion(id="grammar", name="Grammar", description="Correct tenses", points=30),
+            Criterion(id="fluency", name="Fluency", description="Speaks smoothly", points=10),
+        ],
+        total_points=40,
+    )
+
+
+def _create_rubric(client):
+    teacher_id = auth_service.decode_token(client.headers["Authorization"].split(" ")[1])
+    return rubric_service.create_rubric(teacher_id, "French", "Content", parsed_criteria=_parsed())
+
+
+def test_compiled_rubric_is_cached_until_the_rubric_changes(client, monkeypatch):
+    rubric = _create_rubric(client)
+
+    loads = []
+    original_get_rubric = rubric_service.get_rubric
+
+    def _counting_get_rubric(*args, **kwargs):
+        loads.append(args)
+        return original_get_rubric(*args, **kwargs)
+
+    monkeypatch.setattr(rubric_service, "get_rubric", _counting_get_rubric)
+
+    first = rubric_service.get_compiled_rubric(rubric.id)
+    assert rubric_service.get_compiled_rubric(rubric.id) is first
+    assert len(loads) == 1
+
+    reparsed = _parsed()
+    reparsed.criteria[1].description = "Speaks without long pauses"
+    rubric_service.update_rubric_parsed_criteria(rubric.id, reparsed)
+
+    second = rubric_service.get_compiled_rubric(rubric.id)
+    assert second is not first
+    assert second.by_id["fluency"].description == "Speaks without long pauses"
+    assert len(loads) == 2
+
+
+def test_compiled_rubric_renders_prompt_blocks(client):
+    rubric = _create_rubric(client)
+    compiled = rubric_service.get_compiled_rubric(rubric.id)
+    coverage = CoverageMap(covered_criteria={"grammar": 0.5})
+
+    assert compiled.title == "French"
+    assert compiled.weights == {"grammar": 0.75, "fluency": 0.25}
+    assert compiled.question_block == "- Grammar: Correct tenses\n- Fluency: Speaks smoothly"
+    assert compiled.coverage_block(compiled.criteria[1:]) == "- fluency: Fluency - Speaks smoothly"
+    assert compiled.targets_block(compiled.criteria[:1], coverage) == "- Grammar: Correct tenses (coverage: 50%)"
+    assert compiled.status_block(compiled.criteria, coverage) == (
+        "- grammar: Grammar (covered: 50%)\n- fluency: Fluency (covered: 0%)"
+    )
+    assert compiled.prompt_prefix.startswith("EXAM RUBRIC: French\n\nRUBRIC CRITERIA:\n- grammar: Grammar (30 points)")
+
+
+def test_unparsed_or_deleted_rubric_has_no_compiled_form(client):
+    teacher_id = auth_service.decode_token(client.headers["Authorization"].split(" ")[1])
+    unparsed = rubric_service.create_rubric(teacher_id, "Draft", "Content")
+    assert rubric_service.get_compiled_rubric(unparsed.id) is None
+
+    rubric = _create_rubric(client)
+    assert rubric_service.get_compiled_rubric(rubric.id) is not None
+    rubric_service.delete_rubric(rubric.id, teacher_id)
+    assert rubric_service.get_compiled_rubric(rubric.id) is None
@@ -0,0 +1,94 @@
+import pytest
+
+from app.config import get_settings
+from app.models.domain import CoverageMap, Criterion, ParsedRubric, Rubric
+from app.services import coverage as coverage_service
+from app.services import relevance as relevance_service
+from app.services.compiled_rubric import compile_rubric
+
+
+def _rubric():
+    topics = [
+        ("causes", "Causes of the war", "Explains the political and economic causes of World War II"),
+        ("blitzkrieg", "Blitzkrieg tactics", "Describes German lightning war tactics with tanks and aircraft"),
+        ("holocaust", "The Holocaust", "Discusses the genocide of European Jews and its consequences"),
+        ("pearl_harbor", "Pearl Harbor", "Explains the Japanese attack on Pearl Harbor and US entry into the war"),
+        ("d_day", "D-Day", "Describes the Normandy landings and the opening of the western front"),
+        ("home_front", "Home front", "Describes rationing, women in factories and civilian life"),
+        ("atomic_bomb", "Atomic bomb", "Discusses Hiroshima, Nagasaki and the decision to use nuclear weapons"),
+        ("united_nations", "Aftermath", "Explains the founding of the United Nations and the postwar order"),
+        ("stalingrad", "Eastern front", "Describes the battle of Stalingrad and the Soviet counteroffensive"),
+        ("sources", "Use of sources", "Supports claims with dates, names and primary sources"),
+    ]
+    return ParsedRubric(criteria=[Criterion(id=i, name=n, description=d) for i, n, d in topics])
+
+
+def test_relevant_criteria_and_targets_are_selected():
+    rubric = _rubric()
+    response = "The Normandy landings on D-Day opened a western front, with troops landing on the beaches."
+
+    selected = relevance_service.select_relevant_criteria(
+        rubric, relevance_service.CriteriaIndex(rubric.criteria), response, k=3, always_include=["sources"]
+    )
+    ids = [c.id for c in selected]
+
+    assert "d_day" in ids
+    assert "sources" in ids
+    assert len(ids) <= 4
+    assert ids == [c.id for c in rubric.criteria if c.id in ids]  # rubric order kept
+
+
+def test_weak_lexical_match_keeps_all_criteria():
+    rubric = _rubric()
+
+    selected = relevance_service.select_relevant_criteria(
+        rubric, relevance_service.CriteriaIndex(rubric.criteria), "Je pense que oui", k=3
+    )
+
+    assert len(selected) == len(rubric.criteria)
+
+
+def test_compiled_rubric_index_is_reused(monkeypatch):
+    compiled = compile_rubric(Rubric(id="r1", teacher_id="t1", title="WWII", content="", parsed_criteria=_rubric()))
+    monkeypatch.setattr(get_settings(), "coverage_top_k", 3)
+
+    def _no_rebuild(*_args):
+        raise AssertionError("index rebuilt")
+
+    monkeypatch.setattr(relevance_service.CriteriaIndex, "__init__", _no_rebuild)
+
+    selected = coverage_service.select_coverage_criteria(
+        "The Normandy landings on D-Day opened a western front.", "", compiled.parsed, compiled=compiled
+    )
+
+    assert "d_day" in [c.id for c in selected]
+
+
+@pytest.mark.asyncio
+async def test_analyze_coverage_sends_only_selected_criteria(monkeypatch):
+    monkeypatch.setattr(get_settings(), "coverage_top_k", 1)
+
+    captured = {}
+
+    class _FakeLLMClient:
+        async def complete_json(self, prompt, **_kwargs):
+            captured["prompt"] = prompt
+            return {"newly_covered": ["atomic_bomb"], "coverage_updates": {"atomic_bomb": 0.8}, "reasoning": ""}
+
+    monkeypatch.setattr(coverage_service, "get_llm_client", lambda: _FakeLLMClient())
+
+    result = await coverage_service.analyze_coverage(
+        response="Truman decided to drop the atomic bomb on Hiroshima and Nagasaki to end the war.",
+        question="Why were nuclear weapons used?",
+        rubric=_rubric(),
+        current_coverage=CoverageMap(covered_criteria={"causes": 0.5}),
+        target_criteria=["united_nations"],
+    )
+
+    prompt = captured["prompt"]
+    assert "atomic_bomb:" in prompt
+    assert "united_nations:" in prompt
+    assert "home_front:" not in prompt
+    assert "causes:" not in prompt
+    assert result.updated_coverage.covered_criteria == {"causes": 0.5, "atomic_bomb": 0.8}
+    assert result.total_coverage_pct == pytest.approx(0.13)
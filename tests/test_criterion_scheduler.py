@@ -0,0 +1,71 @@
+from app.models.domain import CoverageMap, Criterion, ParsedRubric, Rubric
+from app.services.compiled_rubric import compile_rubric
+from app.services.criterion_scheduler import CriterionScheduler
+
+
+def _compiled():
+    parsed = ParsedRubric(
+        criteria=[
+            Criterion(id="grammar", name="Grammar", description="Tenses", points=30),
+            Criterion(id="fluency", name="Fluency", description="Pace", points=10),
+            Criterion(id="vocabulary", name="Vocabulary", description="Range", points=60),
+        ],
+        total_points=100,
+    )
+    return compile_rubric(Rubric(id="r1", teacher_id="t1", title="French", content="", parsed_criteria=parsed))
+
+
+def _ids(criteria):
+    return [c.id for c in criteria]
+
+
+def test_targets_are_ranked_by_weighted_deficit():
+    scheduler = CriterionScheduler(_compiled(), CoverageMap())
+
+    assert _ids(scheduler.top_k(3)) == ["vocabulary", "grammar", "fluency"]
+
+    # 60 * 0.6 = 24 < grammar's 30
+    scheduler.update_coverage(CoverageMap(covered_criteria={"vocabulary": 0.6}))
+    assert _ids(scheduler.top_k(2)) == ["grammar", "vocabulary"]
+
+    # Satisfied criteria drop out while anything else still needs a question
+    scheduler.update_coverage(CoverageMap(covered_criteria={"vocabulary": 0.9}))
+    assert _ids(scheduler.top_k(3)) == ["grammar", "fluency"]
+
+
+def test_recently_targeted_criteria_are_penalized_until_the_window_passes():
+    scheduler = CriterionScheduler(_compiled(), CoverageMap())
+
+    scheduler.mark_targeted(["vocabulary"])
+    # 60 * 0.5 = 30 ties grammar's 30; rubric order breaks the tie
+    assert _ids(scheduler.top_k(3)) == ["grammar", "vocabulary", "fluency"]
+
+    scheduler.mark_targeted(["grammar"])
+    assert _ids(scheduler.top_k(1)) == ["vocabulary"]
+
+    scheduler.mark_targeted(["fluency"])
+    scheduler.mark_targeted(["fluency"])
+    assert _ids(scheduler.top_k(3)) == ["vocabulary", "grammar", "fluency"]
+    assert scheduler.recency_state() == {"target_turn": 4, "last_targeted": {"fluency": 4}}
+
+
+def test_exclusions_and_fully_covered_rubric():
+    covered = CoverageMap(covered_criteria={"grammar": 1.0, "fluency": 0.8, "vocabulary": 0.7})
+    scheduler = CriterionScheduler(_compiled(), CoverageMap())
+
+    assert _ids(scheduler.top_k(3, exclude=["vocabulary", "grammar"])) == ["fluency"]
+    assert scheduler.top_k(3, exclude=["vocabulary", "grammar", "fluency"]) == []
+
+    scheduler.update_coverage(covered)
+    assert _ids(scheduler.top_k(2)) == ["grammar", "fluency"]
+
+
+def test_heap_stays_bounded_under_many_updates():
+    scheduler = CriterionScheduler(_compiled(), CoverageMap())
+
+    for step in range(200):
+        scheduler.update_coverage(CoverageMap(covered_criteria={"grammar": step / 400}))
+        scheduler.mark_targeted(["fluency"])
+
+    assert len(scheduler._heap) <= 4 * 3 + 16
+    assert _ids(scheduler.top_k(1)) == ["vocabulary"]
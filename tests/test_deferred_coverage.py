@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+
+from app.config import get_settings
+from app.models.domain import CoverageMap, CoverageResult, Criterion, EntryType, ParsedRubric, SessionStatus
+from app.services import auth as auth_service
+from app.services import coverage as coverage_service
+from app.services import exam as exam_service
+from app.services import orchestrator
+from app.services import questions as question_service
+from app.services import rubric as rubric_service
+from app.services import struggle as struggle_service
+from app.services import transcript as transcript_service
+
+
+@pytest.mark.asyncio
+async def test_next_question_does_not_wait_for_coverage(client, monkeypatch):
+    monkeypatch.setattr(get_settings(), "coverage_mode", "deferred")
+
+    teacher_id = auth_service.decode_token(client.headers["Authorization"].split(" ")[1])
+    parsed = ParsedRubric(criteria=[
+        Criterion(id="c1", name="Criterion 1", description="Desc 1"),
+        Criterion(id="c2", name="Criterion 2", description="Desc 2"),
+    ])
+    rubric = rubric_service.create_rubric(teacher_id, "Title", "Content", parsed_criteria=parsed)
+    exam = exam_service.create_exam(teacher_id, rubric.id)
+    session = exam_service.create_student_session(exam.id, "Student", "S1")
+    transcript_service.add_question(session.id, "Question 1")
+
+    release = asyncio.Event()
+    analyzed = []
+
+    async def _slow_analyze_coverage(**kwargs):
+        analyzed.append(kwargs["response"])
+        await release.wait()
+        return CoverageResult(
+            newly_covered=["c1", "c2"],
+            updated_coverage=CoverageMap(covered_criteria={"c1": 0.9, "c2": 0.8}),
+            reasoning="",
+            total_coverage_pct=0.85,
+        )
+
+    async def _fake_generate_question(**_kwargs):
+        return question_service.GeneratedQuestion(text="Question 2")
+
+    async def _fake_detect_struggle(**_kwargs):
+        return None
+
+    async def _no_llm_completion(**_kwargs):
+        raise AssertionError("completion is clear-cut here")
+
+    monkeypatch.setattr(coverage_service, "analyze_coverage", _slow_analyze_coverage)
+    monkeypatch.setattr(coverage_service, "check_completion", _no_llm_completion)
+    monkeypatch.setattr(question_service, "generate_question", _fake_generate_question)
+    monkeypatch.setattr(struggle_service, "detect_struggle", _fake_detect_struggle)
+
+    first = await orchestrator.process_student_response(session.id, "Answer 1")
+
+    assert first.next_question == "Question 2"
+    assert first.is_final is False
+    assert exam_service.get_student_session(session.id).rubric_coverage == CoverageMap()
+
+    release.set()
+    final = await orchestrator.process_student_response(session.id, "Answer 2")
+
+    # The reconciled coverage completes the exam; the second answer is the final turn
+    assert final.is_final is True
+    session = exam_service.get_student_session(session.id)
+    assert session.status == SessionStatus.COMPLETED
+    assert session.rubric_coverage.covered_criteria == {"c1": 0.9, "c2": 0.8}
+    entries = transcript_service.get_session_transcript(session.id)
+    assert [e.entry_type for e in entries][-1] == EntryType.RESPONSE
+    assert not orchestrator._deferred_coverage
+
+    # The final answer's analysis still completes in the background
+    await asyncio.gather(*orchestrator._unreconciled_tasks)
+    assert analyzed == ["Answer 1", "Answer 2"]
+
+
+@pytest.mark.asyncio
+async def test_failed_analysis_of_abandoned_session_is_dropped_and_logged(client, monkeypatch, caplog):
+    monkeypatch.setattr(get_settings(), "coverage_mode", "deferred")
+
+    teacher_id = auth_service.decode_token(client.headers["Authorization"].split(" ")[1])
+    parsed = ParsedRubric(criteria=[Criterion(id="c1", name="Criterion 1", description="Desc 1")])
+    rubric = rubric_service.create_rubric(teacher_id, "Title", "Content", parsed_criteria=parsed)
+    exam = exam_service.create_exam(teacher_id, rubric.id)
+    session = exam_service.create_student_session(exam.id, "Student", "S1")
+    transcript_service.add_question(session.id, "Question 1")
+
+    async def _failing_analyze_coverage(**_kwargs):
+        raise RuntimeError("LLM unavailable")
+
+    async def _fake_generate_question(**_kwargs):
+        return question_service.GeneratedQuestion(text="Question 2")
+
+    async def _fake_detect_struggle(**_kwargs):
+        return None
+
+    monkeypatch.setattr(coverage_service, "analyze_coverage", _failing_analyze_coverage)
+    monkeypatch.setattr(question_service, "generate_question", _fake_generate_question)
+    monkeypatch.setattr(struggle_service, "detect_struggle", _fake_detect_struggle)
+
+    await orchestrator.process_student_response(session.id, "Answer 1")
+    task = orchestrator._deferred_coverage[session.id]
+
+    # The student never answers again
+    await asyncio.wait([task])
+    await asyncio.sleep(0)
+
+    assert session.id not in orchestrator._deferred_coverage
+    assert "Deferred coverage analysis failed" in caplog.text
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from app.config import get_settings
+from app.database import close_connection, get_db
+from app.models.domain import JobStatus
+from app.services import auth as auth_service
+from app.services import coverage as coverage_service
+from app.services import exam as exam_service
+from app.services import jobs
+from app.services import rubric as rubric_service
+from app.services import transcript as transcript_service
+
+
+@pytest.fixture
+def handled(monkeypatch):
+    calls = []
+
+    async def _record(payload):
+        calls.append(payload["n"])
+
+    monkeypatch.setitem(jobs._handlers, "test_record", _record)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_jobs_run_by_priority_and_dedupe_by_key(client, handled):
+    jobs.enqueue("test_record", {"n": 1}, priority=jobs.PRIORITY_LOW)
+    jobs.enqueue("test_record", {"n": 2})
+    first = jobs.enqueue("test_record", {"n": 3}, priority=jobs.PRIORITY_HIGH, job_key="k")
+    assert jobs.enqueue("test_record", {"n": 4}, priority=jobs.PRIORITY_HIGH, job_key="k") == first
+    jobs.enqueue("test_record", {"n": 5}, delay=60)
+
+    assert await jobs.run_pending() == 3
+    assert handled == [3, 2, 1]
+    assert jobs.get_job(first) is None  # Finished jobs are deleted
+    assert jobs.get_job_stats()["pending"] == 1  # Not due yet
+
+
+@pytest.mark.asyncio
+async def test_failed_job_is_retried_then_marked_failed(client, monkeypatch):
+    monkeypatch.setattr(get_settings(), "job_retry_backoff", 0.0)
+    attempts = []
+
+    async def _flaky(payload):
+        attempts.append(payload)
+        raise RuntimeError("upstream down")
+
+    monkeypatch.setitem(jobs._handlers, "test_flaky", _flaky)
+    job_id = jobs.enqueue("test_flaky", {}, max_attempts=2)
+
+    assert await jobs.run_pending() == 2
+    job = jobs.get_job(job_id)
+    assert len(attempts) == 2
+    assert job.status == JobStatus.FAILED
+    assert job.attempts == 2
+    assert job.last_error == "RuntimeError: upstream down"
+
+
+@pytest.mark.asyncio
+async def test_queued_and_interrupted_jobs_survive_a_restart(client, handled):
+    jobs.enqueue("test_record", {"n": 1})
+    interrupted = jobs.enqueue("test_record", {"n": 2})
+    with get_db() as conn:
+        conn.execute("UPDATE jobs SET status = 'running' WHERE id = ?", [interrupted])
+
+    close_connection()  # Simulated restart
+
+    assert jobs.recover_jobs() == 1
+    assert await jobs.run_pending() == 2
+    assert sorted(handled) == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_workers_run_offloaded_work_and_drain_on_shutdown(client, handled):
+    teacher_id = auth_service.decode_token(client.headers["Authorization"].split(" ")[1])
+    rubric = rubric_service.create_rubric(teacher_id, "Title", "Content")
+    exam = exam_service.create_exam(teacher_id, rubric.id)
+    session = exam_service.create_student_session(exam.id, "Student", "S1")
+    entry = transcript_service.add_response(session.id, "Answer 1")
+
+    jobs.start_workers({jobs.DEFAULT_QUEUE: 2})
+    try:
+        job_id = coverage_service.enqueue_coverage_analysis(entry.id, ["c1"], "Covered c1", 0.5)
+        for n in range(5):
+            jobs.enqueue("test_record", {"n": n})
+    finally:
+        await jobs.stop_workers(timeout=5)
+
+    assert sorted(handled) == [0, 1, 2, 3, 4]
+    assert jobs.get_job(job_id) is None
+    with get_db() as conn:
+        row = conn.execute(
+            "SELECT criteria_covered, total_coverage_pct FROM coverage_analyses WHERE transcript_entry_id = ?",
+            [entry.id],
+        ).fetchone()
+    assert row == ('["c1"]', 0.5)
+    assert jobs.get_job_stats()["workers"] == {}
+    assert not asyncio.all_tasks() - {asyncio.current_task()}
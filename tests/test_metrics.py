@@ -0,0 +1,112 @@
+import re
+
+import httpx
+import pytest
+
+from app.config import get_settings
+from app.services import auth as auth_service
+from app.services import exam as exam_service
+from app.services import metrics
+from app.services import rubric as rubric_service
+from app.services import transcript as transcript_service
+
+
+def _sample(text, name, **labels):
+    """Value of one exposition sample, or None when it is missing."""
+    label_text = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    pattern = "^" + re.escape(f"{name}{{{label_text}}}" if labels else name) + r" (\S+)$"
+    match = re.search(pattern, text, re.MULTILINE)
+    return float(match.group(1)) if match else None
+
+
+def test_metrics_endpoint_reports_routes_db_and_domain_gauges(client, monkeypatch):
+    monkeypatch.setattr(get_settings(), "metrics_enabled", True)
+    teacher_id = auth_service.decode_token(client.headers["Authorization"].split(" ")[1])
+    rubric = rubric_service.create_rubric(teacher_id, "Title", "Content")
+    exam = exam_service.create_exam(teacher_id, rubric.id)
+    session = exam_service.create_student_session(exam.id, "Student", "S1")
+    transcript_service.add_question(session.id, "Question 1")
+
+    before = _sample(
+        client.get("/metrics").text,
+        "speakup_http_request_duration_seconds_count",
+        method="GET", route="/api/v1/session/{session_id}/question", status="200",
+    ) or 0
+    assert client.get(f"/api/v1/session/{session.id}/question").status_code == 200
+    client.get("/no/such/path")
+
+    response = client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+
+    # Labeled by route template, not by the session ID in the path
+    assert _sample(
+        text, "speakup_http_request_duration_seconds_count",
+        method="GET", route="/api/v1/session/{session_id}/question", status="200",
+    ) == before + 1
+    assert session.id not in text
+    assert _sample(
+        text, "speakup_http_request_duration_seconds_count", method="GET", route="unmatched", status="404"
+    ) >= 1
+    assert _sample(text, "speakup_http_requests_in_flight") == 1  # The scrape itself
+
+    assert _sample(text, "speakup_db_duration_seconds_count", function="exam.create_student_session") >= 1
+    assert _sample(text, "speakup_active_exams") == 1
+    assert _sample(text, "speakup_active_sessions") == 1
+    assert "# TYPE speakup_stage_duration_seconds histogram" in text
+
+
+def test_metrics_endpoint_is_disabled_by_default(client):
+    assert client.get("/metrics").status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_upstream_latency_and_errors_are_counted(client, httpx_mock):
+    httpx_mock.add_response(url="https://api.elevenlabs.io/v1/voices", status_code=503)
+    httpx_mock.add_exception(httpx.ConnectTimeout("timed out"), url="https://openrouter.ai/api/v1/models")
+
+    text = metrics.render_metrics()
+    before = {
+        "503": _sample(text, "speakup_upstream_requests_total", upstream="elevenlabs", status="503") or 0,
+        "timeout": _sample(text, "speakup_upstream_errors_total", upstream="openrouter", error="ConnectTimeout") or 0,
+        "count": _sample(text, "speakup_upstream_request_duration_seconds_count", upstream="openrouter") or 0,
+    }
+
+    async with httpx.AsyncClient(transport=metrics.InstrumentedTransport()) as client:
+        assert (await client.get("https://api.elevenlabs.io/v1/voices")).status_code == 503
+        with pytest.raises(httpx.ConnectTimeout):
+            await client.get("https://openrouter.ai/api/v1/models")
+
+    text = metrics.render_metrics()
+    assert _sample(text, "speakup_upstream_requests_total", upstream="elevenlabs", status="503") == before["503"] + 1
+    assert _sample(text, "speakup_upstream_errors_total", upstream="elevenlabs", error="http_503") >= 1
+    assert _sample(
+        text, "speakup_upstream_errors_total", upstream="openrouter", error="ConnectTimeout"
+    ) == before["timeout"] + 1
+    assert _sample(
+        text, "speakup_upstream_request_duration_seconds_count", upstream="openrouter"
+    ) == before["count"] + 1
+
+
+def test_histogram_buckets_are_cumulative_and_labels_escaped(monkeypatch):
+    monkeypatch.setattr(metrics, "_metrics", [])
+    monkeypatch.setattr(metrics, "_collectors", [])
+    histogram = metrics.Histogram("test_seconds", "Test", ("name",), buckets=(0.1, 1.0))
+    counter = metrics.Counter("test_total", "Test", ("name",))
+
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, 'a"b')
+    counter.inc("x\\y", amount=2)
+
+    assert metrics.render_metrics().splitlines() == [
+        "# HELP speakup_test_seconds Test",
+        "# TYPE speakup_test_seconds histogram",
+        'speakup_test_seconds_bucket{name="a\\"b",le="0.1"} 1',
+        'speakup_test_seconds_bucket{name="a\\"b",le="1"} 2',
+        'speakup_test_seconds_bucket{name="a\\"b",le="+Inf"} 3',
+        'speakup_test_seconds_sum{name="a\\"b"} 5.55',
+        'speakup_test_seconds_count{name="a\\"b"} 3',
+        "# HELP speakup_test_total Test",
+        "# TYPE speakup_test_total counter",
+        'speakup_test_total{name="x\\\\y"} 2',
+    ]
@@ -0,0 +1,90 @@
+import json
+
+import pytest
+
+from app.models.domain import CoverageMap, Criterion, ParsedRubric, Rubric
+from app.services import coverage as coverage_service
+from app.services import llm_client
+from app.services import struggle as struggle_service
+from app.services.compiled_rubric import compile_rubric
+
+CHAT_URL = "https://openrouter.ai/api/v1/chat/completions"
+
+
+def _compiled():
+    parsed = ParsedRubric(
+        criteria=[
+            Criterion(id="grammar", name="Grammar", description="Correct tenses", points=30),
+            Criterion(id="fluency", name="Fluency", description="Speaks smoothly", points=10),
+        ],
+        total_points=40,
+    )
+    return compile_rubric(Rubric(id="r1", teacher_id="t1", title="French", content="", parsed_criteria=parsed))
+
+
+def _reply(content, prompt_tokens, cached_tokens):
+    return {
+        "choices": [{"message": {"content": json.dumps(content)}}],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": 20,
+            "prompt_tokens_details": {"cached_tokens": cached_tokens},
+        },
+    }
+
+
+@pytest.mark.asyncio
+async def test_exam_prompts_share_a_cacheable_prefix(monkeypatch, httpx_mock):
+    monkeypatch.setattr(llm_client, "_usage", llm_client.defaultdict(llm_client._usage.default_factory))
+    client = llm_client.LLMClient()
+    client.base_url = "https://openrouter.ai/api/v1"
+    monkeypatch.setattr(coverage_service, "get_llm_client", lambda: client)
+    monkeypatch.setattr(struggle_service, "get_llm_client", lambda: client)
+    monkeypatch.setattr(struggle_service.get_settings(), "struggle_rules_enabled", False)
+
+    httpx_mock.add_response(url=CHAT_URL, json=_reply({"coverage_updates": {"grammar": 0.5}}, 400, 0))
+    httpx_mock.add_response(url=CHAT_URL, json=_reply({"coverage_updates": {"fluency": 0.5}}, 420, 384))
+    httpx_mock.add_response(url=CHAT_URL, json=_reply({"struggle_detected": False}, 380, 0))
+
+    compiled = _compiled()
+    await coverage_service.analyze_coverage(
+        "Je suis allé au marché", "Qu'as-tu fait hier ?", compiled.parsed, CoverageMap(), compiled=compiled,
+    )
+    await coverage_service.analyze_coverage(
+        "Je parle sans pause", "Raconte tes vacances", compiled.parsed, CoverageMap(), compiled=compiled,
+    )
+    await struggle_service.detect_struggle("Euh, le marché", "Qu'as-tu fait hier ?", [], compiled=compiled)
+
+    bodies = [json.loads(r.content) for r in httpx_mock.get_requests()]
+    first, second, struggle = (body["messages"] for body in bodies)
+
+    # Same exam, same bytes up to the user message; only the variable part differs
+    assert first[0] == second[0]
+    assert first[1] != second[1]
+    assert first[0]["content"][-1] == {
+        "type": "text",
+        "text": compiled.prompt_prefix,
+        "cache_control": {"type": "ephemeral"},
+    }
+    assert struggle[0]["content"][-1]["text"] == compiled.prompt_prefix
+    # The full criteria only travel in the prefix
+    assert "Correct tenses" not in first[1]["content"]
+    assert first[1]["content"].rstrip().endswith("to what degree.")
+    assert all(body["usage"] == {"include": True} for body in bodies)
+
+    stats = llm_client.get_llm_usage_stats()
+    assert stats["coverage"]["requests"] == 2
+    assert stats["coverage"]["cached_tokens"] == 384
+    assert stats["coverage"]["cached_requests"] == 1
+    assert stats["coverage"]["cached_token_rate"] == pytest.approx(384 / 820)
+    assert stats["struggle"]["prompt_tokens"] == 380
+    assert stats["total"]["requests"] == 3
+
+
+def test_cache_hints_can_be_disabled():
+    messages = llm_client.build_messages("Hi", "System", "Rubric", cache_control=False)
+
+    assert messages == [
+        {"role": "system", "content": "System\n\nRubric"},
+        {"role": "user", "content": "Hi"},
+    ]
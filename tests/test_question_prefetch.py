@@ -0,0 +1,163 @@
+import asyncio
+
+import pytest
+
+from app.config import get_settings
+from app.services import auth as auth_service
+from app.services import exam as exam_service
+from app.services import jobs
+from app.services import prefetch
+from app.services import rubric as rubric_service
+from app.services import transcript as transcript_service
+from app.services import tts as tts_service
+from app.services import voice as voice_service
+
+
+def _create_session(client, language):
+    token = client.headers["Authorization"].split(" ")[1]
+    teacher_id = auth_service.decode_token(token)
+    rubric = rubric_service.create_rubric(teacher_id, "Title", "Content")
+    exam = exam_service.create_exam(teacher_id, rubric.id)
+    voice_service.update_voice_preference(teacher_id, language, "teacher_voice")
+    return exam_service.create_student_session(exam.id, "Student", "S1", language=language)
+
+
+@pytest.mark.asyncio
+async def test_new_question_is_translated_and_synthesized_in_background(client, monkeypatch):
+    monkeypatch.setenv("ELEVENLABS_API_KEY", "test-key")
+    session = _create_session(client, "es")
+    assert exam_service.get_student_session(session.id).language == "es"
+
+    calls = []
+
+    async def _fake_translate_text(text, target_language):
+        calls.append(("translate", text, target_language))
+        return "Pregunta 1"
+
+    async def _fake_get_cached_speech(text, language="en", voice_id=None, translated_text=None):
+        calls.append(("speech", text, language, voice_id, translated_text))
+
+    monkeypatch.setattr(tts_service, "translate_text", _fake_translate_text)
+    monkeypatch.setattr(tts_service, "get_cached_speech", _fake_get_cached_speech)
+
+    scheduled = []
+    monkeypatch.setattr(
+        transcript_service,
+        "_question_listeners",
+        [lambda entry: scheduled.append(prefetch.schedule_question_prefetch(entry))],
+    )
+
+    transcript_service.add_question(session.id, "Question 1")
+    assert len(scheduled) == 1
+    await asyncio.gather(*scheduled)
+    assert await jobs.run_pending() == 0  # Prefetch does not go through the job queue
+
+    assert calls == [
+        ("translate", "Question 1", "es"),
+        ("speech", "Question 1", "es", "teacher_voice", "Pregunta 1"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_prefetch_skipped_for_english_without_tts_key(client, monkeypatch):
+    monkeypatch.delenv("ELEVENLABS_API_KEY", raising=False)
+    session = _create_session(client, "en")
+    entry = transcript_service.add_transcript_entry(
+        session.id, transcript_service.EntryType.QUESTION, "Question 1"
+    )
+
+    assert prefetch.schedule_question_prefetch(entry) is None
+
+
+@pytest.mark.asyncio
+async def test_prefetches_run_with_bounded_concurrency(client, monkeypatch):
+    monkeypatch.setattr(get_settings(), "question_prefetch_concurrency", 2)
+    monkeypatch.setattr(prefetch, "_semaphore", None)
+    session = _create_session(client, "es")
+
+    running = 0
+    peak = 0
+
+    async def _fake_prefetch_question(question, language, voice_id):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    monkeypatch.setattr(prefetch, "prefetch_question", _fake_prefetch_question)
+
+    tasks = [
+        prefetch.schedule_question_prefetch(
+            transcript_service.add_transcript_entry(session.id, transcript_service.EntryType.QUESTION, f"Q{n}")
+        )
+        for n in range(5)
+    ]
+    await asyncio.gather(*tasks)
+
+    assert peak == 2
+    monkeypatch.setattr(prefetch, "_semaphore", None)
+
+
+class _FakeLLM:
+    def __init__(self):
+        self.calls = []
+
+    async def complete(self, prompt, **_kwargs):
+        self.calls.append(("complete", prompt))
+        return "Bonjour"
+
+    async def complete_json(self, prompt, **_kwargs):
+        self.calls.append(("complete_json", prompt))
+        return {"es": "Hola", "de": "Hallo"}  # "zh" missing on purpose
+
+
+@pytest.mark.asyncio
+async def test_translation_memo_shared_and_batch_uses_one_call(monkeypatch):
+    llm = _FakeLLM()
+    monkeypatch.setattr(tts_service, "get_llm_client", lambda: llm)
+    tts_service.get_translation_memo.cache_clear()
+
+    assert await tts_service.translate_text("Hello", "fr") == "Bonjour"
+    assert await tts_service.translate_text("Hello", "fr") == "Bonjour"
+    assert len(llm.calls) == 1
+
+    translations = await tts_service.translate_text_batch("Hello")
+    assert translations["en"] == "Hello"
+    assert translations["fr"] == "Bonjour"  # memo hit, not requested again
+    assert translations["es"] == "Hola"
+    assert translations["de"] == "Hallo"
+    assert translations["zh"] == "Bonjour"  # fell back to a single translation
+
+    kinds = [kind for kind, _ in llm.calls]
+    assert kinds == ["complete", "complete_json", "complete"]
+    assert "- fr:" not in llm.calls[1][1]
+
+    # Subsequent single-language lookups are memo hits
+    assert await tts_service.translate_text("Hello", "es") == "Hola"
+    assert len(llm.calls) == 3
+    tts_service.get_translation_memo.cache_clear()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_translations_share_the_batch_call(monkeypatch):
+    llm = _FakeLLM()
+    monkeypatch.setattr(tts_service, "get_llm_client", lambda: llm)
+    tts_service.get_translation_memo.cache_clear()
+
+    batch, single, again = await asyncio.gather(
+        tts_service.translate_text_batch("Hello", ["es", "de"]),
+        tts_service.translate_text("Hello", "es"),
+        tts_service.translate_text_batch("Hello", ["de", "fr"]),
+    )
+
+    assert batch == {"es": "Hola", "de": "Hallo"}
+    assert single == "Hola"
+    assert again == {"de": "Hallo", "fr": "Bonjour"}
+    assert [kind for kind, _ in llm.calls] == ["complete_json", "complete"]
+
+    stats = tts_service.get_translation_memo().stats()
+    assert stats["misses"] == 3  # es and de in the batch, fr on its own
+    assert stats["coalesced"] == 2
+    assert stats["hits"] == 0
+    tts_service.get_translation_memo.cache_clear()
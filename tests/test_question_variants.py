@@ -0,0 +1,106 @@
+import json
+
+import pytest
+
+from app.models.domain import CoverageMap, Criterion, ParsedRubric
+from app.services import auth as auth_service
+from app.services import exam as exam_service
+from app.services import orchestrator
+from app.services import questions as question_service
+from app.services import rubric as rubric_service
+from app.services import struggle as struggle_service
+from app.services import transcript as transcript_service
+
+
+def _parsed():
+    return ParsedRubric(
+        criteria=[
+            Criterion(id="c1", name="Criterion 1", description="Desc 1"),
+            Criterion(id="c2", name="Criterion 2", description="Desc 2"),
+        ]
+    )
+
+
+@pytest.mark.asyncio
+async def test_question_and_variant_come_from_one_structured_call(monkeypatch):
+    calls = []
+
+    class _FakeLLMClient:
+        async def complete_json(self, prompt, **kwargs):
+            calls.append(kwargs["system_prompt"])
+            return {"question": " Explain c1. ", "simplified": " What is c1? "}
+
+    monkeypatch.setattr(question_service, "get_llm_client", lambda: _FakeLLMClient())
+
+    generated = await question_service.generate_question([], CoverageMap(), _parsed().criteria)
+
+    assert generated == question_service.GeneratedQuestion(text="Explain c1.", simplified="What is c1?")
+    assert calls == [question_service.GENERATE_QUESTION_WITH_VARIANT_SYSTEM_PROMPT]
+    assert '"simplified"' in calls[0]
+
+
+@pytest.mark.asyncio
+async def test_unparseable_structured_reply_falls_back_to_plain_question(monkeypatch):
+    class _FakeLLMClient:
+        async def complete_json(self, prompt, **_kwargs):
+            return json.loads("Explain c1.")
+
+        async def complete(self, prompt, **kwargs):
+            assert kwargs["system_prompt"] == question_service.GENERATE_QUESTION_SYSTEM_PROMPT
+            return "Explain c1."
+
+    monkeypatch.setattr(question_service, "get_llm_client", lambda: _FakeLLMClient())
+
+    generated = await question_service.generate_question([], CoverageMap(), _parsed().criteria)
+
+    assert generated == question_service.GeneratedQuestion(text="Explain c1.")
+
+
+async def _start_session(client, monkeypatch):
+    teacher_id = auth_service.decode_token(client.headers["Authorization"].split(" ")[1])
+    rubric = rubric_service.create_rubric(teacher_id, "Title", "Content", parsed_criteria=_parsed())
+    exam = exam_service.create_exam(teacher_id, rubric.id)
+    session = exam_service.create_student_session(exam.id, "Student", "S1")
+
+    async def _fake_first_question(rubric, compiled=None):
+        return question_service.GeneratedQuestion(text="Explain c1.", simplified="What is c1?")
+
+    monkeypatch.setattr(question_service, "generate_first_question", _fake_first_question)
+    compiled = rubric_service.get_compiled_rubric(rubric.id)
+    started = await orchestrator.start_student_session(session.id, compiled)
+    assert started.next_question == "Explain c1."
+    assert set(started.stage_timings) == {"generate", "write", "total"}
+    return session
+
+
+@pytest.mark.asyncio
+async def test_first_skip_serves_stored_variant(client, monkeypatch):
+    session = await _start_session(client, monkeypatch)
+
+    async def _no_live_adaptation(**_kwargs):
+        raise AssertionError("adapted question should come from the stored variant")
+
+    monkeypatch.setattr(struggle_service, "generate_adapted_question", _no_live_adaptation)
+
+    result = await orchestrator.process_skip_request(session.id)
+
+    assert result.next_question == "What is c1?"
+    assert result.is_adapted is True
+    skip_state = exam_service.get_student_session(session.id).skip_state
+    assert orchestrator.SIMPLIFIED_VARIANT_KEY not in skip_state
+
+
+@pytest.mark.asyncio
+async def test_stale_variant_is_regenerated_live(client, monkeypatch):
+    session = await _start_session(client, monkeypatch)
+    # A question the stored variant was not generated for
+    transcript_service.add_question(session.id, "Explain c2.")
+
+    async def _live_adaptation(**kwargs):
+        return f"Simpler: {kwargs['original_question']}"
+
+    monkeypatch.setattr(struggle_service, "generate_adapted_question", _live_adaptation)
+
+    result = await orchestrator.process_skip_request(session.id)
+
+    assert result.next_question == "Simpler: Explain c2."
@@ -0,0 +1,55 @@
+from app.services import coverage as coverage_service
+from app.services import rubric as rubric_service
+
+UNSTRUCTURED = "Students should talk fluently about their summer holidays.\nUse the past tense."
+
+
+def _fake_llm(monkeypatch):
+    calls = []
+
+    class _FakeLLMClient:
+        async def complete_json(self, **kwargs):
+            calls.append(kwargs)
+            return {"criteria": [{"id": "fluency", "name": "Fluency", "description": "Speaks fluently"}]}
+
+    monkeypatch.setattr(coverage_service, "get_llm_client", lambda: _FakeLLMClient())
+    return calls
+
+
+def test_identical_content_is_parsed_once(client, monkeypatch):
+    calls = _fake_llm(monkeypatch)
+
+    first = client.post("/internal/rubrics", json={"title": "A", "content": UNSTRUCTURED})
+    # Same content modulo line endings and trailing whitespace
+    second = client.post(
+        "/internal/rubrics",
+        json={"title": "B", "content": UNSTRUCTURED.replace("\n", "  \r\n") + "\n"},
+    )
+
+    assert first.status_code == 200
+    assert second.status_code == 200
+    assert len(calls) == 1
+    assert second.json()["parsed_criteria"] == first.json()["parsed_criteria"]
+
+    rubric = rubric_service.get_rubric(first.json()["id"])
+    assert rubric.content_hash == rubric_service.rubric_content_hash(UNSTRUCTURED)
+
+
+def test_update_and_reparse_reuse_stored_parse(client, monkeypatch):
+    calls = _fake_llm(monkeypatch)
+    rubric_id = client.post("/internal/rubrics", json={"title": "A", "content": UNSTRUCTURED}).json()["id"]
+
+    updated = client.put(f"/internal/rubrics/{rubric_id}", json={"title": "Renamed", "content": UNSTRUCTURED})
+    assert updated.status_code == 200
+    assert updated.json()["parsed_criteria"]["criteria"][0]["id"] == "fluency"
+
+    reparsed = client.post(f"/internal/rubrics/{rubric_id}/parse")
+    assert reparsed.status_code == 200
+    assert len(calls) == 1
+
+    forced = client.post(f"/internal/rubrics/{rubric_id}/parse", params={"force": "true"})
+    assert forced.status_code == 200
+    assert len(calls) == 2
+
+    client.put(f"/internal/rubrics/{rubric_id}", json={"content": UNSTRUCTURED + "\nSpeak for two minutes."})
+    assert len(calls) == 3
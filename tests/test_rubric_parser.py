@@ -0,0 +1,90 @@
+from pathlib import Path
+
+import pytest
+
+from app.services import coverage as coverage_service
+from app.services.rubric_parser import parse_rubric_markdown
+
+RUBRICS_DIR = Path(__file__).parent.parent / "data" / "rubrics"
+
+
+@pytest.mark.parametrize("filename", sorted(p.name for p in RUBRICS_DIR.glob("*.md")))
+def test_sample_rubrics_parse_locally(filename):
+    result = parse_rubric_markdown((RUBRICS_DIR / filename).read_text(encoding="utf-8"))
+
+    assert result is not None
+    assert result.layout == "headings"
+    assert result.confidence >= 0.9
+    assert result.parsed.total_points == 100
+    assert len(result.parsed.criteria) == 4
+    assert all(c.points and c.description for c in result.parsed.criteria)
+    assert result.parsed.criteria[-1].name.startswith("Extra Credit")
+
+
+def test_wwii_criteria_from_headings():
+    result = parse_rubric_markdown((RUBRICS_DIR / "wwii_oral_exam_rubric.md").read_text(encoding="utf-8"))
+
+    first = result.parsed.criteria[0]
+    assert first.id == "dates_events_and_timelines"
+    assert first.name == "Dates, Events, and Timelines"
+    assert first.points == 30
+    assert first.description.startswith("Accurately identifies specific dates")
+
+
+def test_table_rubric():
+    text = """# Essay
+| Criterion | Points | Description |
+|-----------|--------|-------------|
+| Thesis | 10 | Clear, arguable thesis |
+| **Evidence** | 20 | Uses relevant quotations |
+| Total | 30 | |
+"""
+    result = parse_rubric_markdown(text)
+
+    assert result.layout == "table"
+    assert [(c.id, c.points, c.description) for c in result.parsed.criteria] == [
+        ("thesis", 10, "Clear, arguable thesis"),
+        ("evidence", 20, "Uses relevant quotations"),
+    ]
+    assert result.parsed.total_points == 30
+
+
+def test_list_rubric():
+    text = """# Lab report
+- **Hypothesis** (5 pts): States a testable hypothesis
+- Method - Describes the procedure step by step (10 points)
+"""
+    result = parse_rubric_markdown(text)
+
+    assert result.layout == "list"
+    assert [(c.id, c.points) for c in result.parsed.criteria] == [("hypothesis", 5), ("method", 10)]
+    assert result.parsed.criteria[1].description == "Describes the procedure step by step"
+
+
+@pytest.mark.asyncio
+async def test_parse_rubric_skips_llm_for_structured_markdown(client, monkeypatch):
+    def _no_llm():
+        raise AssertionError("LLM should not be called")
+
+    monkeypatch.setattr(coverage_service, "get_llm_client", _no_llm)
+
+    parsed = await coverage_service.parse_rubric((RUBRICS_DIR / "french_oral_exam_rubric.md").read_text())
+
+    assert [c.id for c in parsed.criteria][:2] == ["pronunciation", "grammar"]
+
+
+@pytest.mark.asyncio
+async def test_parse_rubric_falls_back_to_llm_for_unstructured_text(client, monkeypatch):
+    calls = []
+
+    class _FakeLLMClient:
+        async def complete_json(self, **kwargs):
+            calls.append(kwargs)
+            return {"criteria": [{"id": "fluency", "name": "Fluency", "description": "Speaks fluently"}]}
+
+    monkeypatch.setattr(coverage_service, "get_llm_client", lambda: _FakeLLMClient())
+
+    parsed = await coverage_service.parse_rubric("Students should talk fluently about their summer holidays.")
+
+    assert len(calls) == 1
+    assert [c.id for c in parsed.criteria] == ["fluency"]
@@ -0,0 +1,215 @@
+import asyncio
+
+import pytest
+
+from app.models.domain import CompletionResult, CoverageMap, CoverageResult, Criterion, ParsedRubric
+from app.services import auth as auth_service
+from app.services import coverage as coverage_service
+from app.services import exam as exam_service
+from app.services import idempotency as idempotency_service
+from app.services import orchestrator
+from app.services import rubric as rubric_service
+from app.services import session_locks
+from app.services import struggle as struggle_service
+from app.services import stt as stt_service
+from app.services import transcript as transcript_service
+
+
+def _create_session(client, parsed=None):
+    teacher_id = auth_service.decode_token(client.headers["Authorization"].split(" ")[1])
+    rubric = rubric_service.create_rubric(teacher_id, "Title", "Content", parsed_criteria=parsed)
+    exam = exam_service.create_exam(teacher_id, rubric.id)
+    session = exam_service.create_student_session(exam.id, "Student", "S1")
+    transcript_service.add_question(session.id, "Question 1")
+    return session
+
+
+def _fake_processing(monkeypatch, processed):
+    async def _fake_process_student_response(session_id, response_text, **_kwargs):
+        processed.append(response_text)
+        return orchestrator.ProcessedResponse(
+            next_question=f"Question {len(processed) + 1}",
+            question_number=len(processed) + 1,
+            is_final=False,
+            is_adapted=False,
+            coverage_pct=0.0,
+            struggle_event=None,
+            teacher_message=None,
+        )
+
+    monkeypatch.setattr(orchestrator, "process_student_response", _fake_process_student_response)
+
+
+@pytest.mark.asyncio
+async def test_session_lock_serializes_one_session_only():
+    events = []
+
+    @session_locks.serialized
+    async def _action(session_id, name):
+        events.append(f"start {name}")
+        await asyncio.sleep(0.01)
+        events.append(f"end {name}")
+
+    await asyncio.gather(_action("s1", "a"), _action("s1", "b"), _action("s2", "c"))
+
+    assert events.index("end a") < events.index("start b")
+    assert events.index("start c") < events.index("end a")
+    assert session_locks._locks == {}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_answer_after_completion_is_rejected(client, monkeypatch):
+    parsed = ParsedRubric(criteria=[Criterion(id="c1", name="Criterion 1", description="Desc 1")])
+    session = _create_session(client, parsed)
+    analyzed = []
+
+    async def _analyze_coverage(**kwargs):
+        analyzed.append(kwargs["response"])
+        await asyncio.sleep(0.01)
+        return CoverageResult(
+            newly_covered=["c1"],
+            updated_coverage=CoverageMap(covered_criteria={"c1": 1.0}),
+            reasoning="",
+            total_coverage_pct=1.0,
+        )
+
+    async def _detect_struggle(**_kwargs):
+        return None
+
+    async def _complete(**_kwargs):
+        return CompletionResult(is_complete=True, missing_criteria=[], coverage_summary="")
+
+    monkeypatch.setattr(coverage_service, "analyze_coverage", _analyze_coverage)
+    monkeypatch.setattr(struggle_service, "detect_struggle", _detect_struggle)
+    monkeypatch.setattr(coverage_service, "check_completion", _complete)
+
+    first, second = await asyncio.gather(
+        orchestrator.process_student_response(session.id, "Answer 1"),
+        orchestrator.process_student_response(session.id, "Answer 1"),
+        return_exceptions=True,
+    )
+
+    assert first.is_final is True
+    assert isinstance(second, orchestrator.SessionNotActiveError)
+    assert analyzed == ["Answer 1"]
+
+
+def test_idempotency_key_replays_the_stored_response(client, monkeypatch):
+    session = _create_session(client)
+    processed = []
+    _fake_processing(monkeypatch, processed)
+
+    url = f"/api/v1/session/{session.id}/response"
+    body = {"session_id": session.id, "question": "Question 1", "response": "Answer 1"}
+    first = client.post(url, json=body, headers={"Idempotency-Key": "k1"})
+    replay = client.post(url, json=body, headers={"Idempotency-Key": "k1"})
+    other = client.post(url, json=body, headers={"Idempotency-Key": "k2"})
+
+    assert first.status_code == replay.status_code == 200
+    assert replay.json() == first.json() == {
+        "question_text": "Question 2",
+        "question_number": 2,
+        "is_final": False,
+        "is_adapted": False,
+        "message": None,
+    }
+    assert other.json()["question_text"] == "Question 3"
+    assert processed == ["Answer 1", "Answer 1"]
+
+    exam_service.update_session_skip_state(session.id, {"has_submitted_in_session": True})
+    reused = client.post(f"/api/v1/session/{session.id}/skip", headers={"Idempotency-Key": "k1"})
+    assert reused.status_code == 422
+
+
+def test_same_audio_for_the_same_question_is_processed_once(client, monkeypatch):
+    session = _create_session(client)
+    processed = []
+    _fake_processing(monkeypatch, processed)
+    transcribed = []
+
+    async def _fake_transcribe_upload(audio):
+        data = await audio.read()
+        transcribed.append(data)
+        return data.decode()
+
+    monkeypatch.setattr(stt_service, "transcribe_upload", _fake_transcribe_upload)
+
+    def _upload(content, question="Question 1"):
+        return client.post(
+            f"/api/v1/session/{session.id}/audio",
+            files={"audio": ("answer.webm", content, "audio/webm")},
+            data={"question": question},
+        )
+
+    first = _upload(b"my answer")
+    transcript_service.add_question(session.id, "Question 2")
+    retry = _upload(b"my answer")  # Retried after the session moved on
+    assert retry.json() == first.json()
+    assert transcribed == [b"my answer"]
+
+    _upload(b"my answer", "Question 2")  # Same recording, next question: a new answer
+    _upload(b"another answer", "Question 2")
+    assert transcribed == [b"my answer", b"my answer", b"another answer"]
+    assert processed == ["my answer", "my answer", "another answer"]
+
+    transcript_service.add_question(session.id, "Question 1")  # Asked again
+    _upload(b"my answer")
+    assert processed == ["my answer", "my answer", "another answer", "my answer"]
+
+
+def test_text_answer_and_skip_retries_without_a_key_run_once(client, monkeypatch):
+    session = _create_session(client)
+    processed = []
+    _fake_processing(monkeypatch, processed)
+    skipped = []
+
+    async def _fake_process_skip_request(session_id):
+        skipped.append(session_id)
+        return orchestrator.ProcessedResponse("Question 3", 3, False, False, 0.0, None, None)
+
+    monkeypatch.setattr(orchestrator, "process_skip_request", _fake_process_skip_request)
+
+    url = f"/api/v1/session/{session.id}/response"
+    body = {"session_id": session.id, "question": "Question 1", "response": "Answer 1"}
+    first = client.post(url, json=body)
+    transcript_service.add_question(session.id, "Question 2")
+    assert client.post(url, json=body).json() == first.json()
+    assert processed == ["Answer 1"]
+
+    client.post(url, json={**body, "response": "Answer 1, revised"})
+    assert processed == ["Answer 1", "Answer 1, revised"]
+
+    # The same answer to the same question asked again later is a new answer
+    transcript_service.add_question(session.id, "Question 1")
+    client.post(url, json=body)
+    assert processed == ["Answer 1", "Answer 1, revised", "Answer 1"]
+
+    exam_service.update_session_skip_state(session.id, {"has_submitted_in_session": True})
+    # Skips are keyed on the current question entry
+    skip = client.post(f"/api/v1/session/{session.id}/skip")
+    assert client.post(f"/api/v1/session/{session.id}/skip").json() == skip.json()
+    assert len(skipped) == 1
+
+    transcript_service.add_question(session.id, "Question 3")
+    client.post(f"/api/v1/session/{session.id}/skip")
+    assert len(skipped) == 2
+
+
+@pytest.mark.asyncio
+async def test_retry_during_the_original_request_waits_for_its_response(client):
+    calls = []
+    release = asyncio.Event()
+
+    async def _action():
+        calls.append("run")
+        await release.wait()
+        return idempotency_service.StoredResponse(status_code=200, body={"n": len(calls)})
+
+    original = asyncio.create_task(idempotency_service.run_once("s1", "k1", "response", _action))
+    retry = asyncio.create_task(idempotency_service.run_once("s1", "k1", "response", _action))
+    await asyncio.sleep(0)
+    release.set()
+
+    assert (await original).body == (await retry).body == {"n": 1}
+    assert calls == ["run"]
+    assert idempotency_service.get_stored_response("s1", "k1", "response").body == {"n": 1}
@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+
+from app.models.domain import CompletionResult, CoverageMap, Criterion, ParsedRubric, SessionStatus
+from app.services import auth as auth_service
+from app.services import coverage as coverage_service
+from app.services import exam as exam_service
+from app.services import orchestrator
+from app.services import questions as question_service
+from app.services import rubric as rubric_service
+from app.services import transcript as transcript_service
+
+
+def _parsed():
+    return ParsedRubric(
+        criteria=[
+            Criterion(id="c1", name="Criterion 1", description="Desc 1", points=20),
+            Criterion(id="c2", name="Criterion 2", description="Desc 2", points=40),
+            Criterion(id="c3", name="Criterion 3", description="Desc 3", points=40),
+        ]
+    )
+
+
+def _second_skip_session(client, coverage):
+    teacher_id = auth_service.decode_token(client.headers["Authorization"].split(" ")[1])
+    rubric = rubric_service.create_rubric(teacher_id, "Title", "Content", parsed_criteria=_parsed())
+    exam = exam_service.create_exam(teacher_id, rubric.id)
+    session = exam_service.create_student_session(exam.id, "Student", "S1")
+    transcript_service.add_question(session.id, "Question 1")
+    exam_service.update_session_coverage(session.id, CoverageMap(covered_criteria=coverage))
+    exam_service.update_session_skip_state(
+        session.id,
+        {"current_question_is_adapted": True, "current_criteria": ["c1"], "skipped_criteria": []},
+    )
+    return session
+
+
+def test_local_completion_verdict():
+    rubric = _parsed()
+
+    done = coverage_service.local_completion_verdict(rubric, CoverageMap(covered_criteria={"c2": 0.8, "c3": 1.0}), ["c1"])
+    assert done.is_complete is True
+
+    far = coverage_service.local_completion_verdict(rubric, CoverageMap(covered_criteria={"c2": 0.9}), ["c1"])
+    assert far.is_complete is False
+    assert far.missing_criteria == ["c3"]
+
+    assert coverage_service.local_completion_verdict(
+        rubric, CoverageMap(covered_criteria={"c2": 0.9, "c3": 0.5}), ["c1"]
+    ) is None
+
+
+@pytest.mark.asyncio
+async def test_second_skip_completes_locally_without_llm_or_new_question(client, monkeypatch):
+    session = _second_skip_session(client, {"c2": 0.8, "c3": 0.9})
+
+    async def _unexpected(**_kwargs):
+        raise AssertionError("no LLM call expected")
+
+    monkeypatch.setattr(question_service, "generate_question_excluding_criteria", _unexpected)
+    monkeypatch.setattr(coverage_service, "check_completion_with_exclusions", _unexpected)
+
+    result = await orchestrator.process_skip_request(session.id)
+
+    assert result.is_final is True
+    assert transcript_service.count_questions(session.id) == 1
+    assert exam_service.get_student_session(session.id).status == SessionStatus.COMPLETED
+    assert {"load", "record_skip", "completion_local", "persist", "total"} <= set(result.stage_timings)
+
+
+@pytest.mark.asyncio
+async def test_llm_completion_cancels_speculative_question(client, monkeypatch):
+    session = _second_skip_session(client, {"c2": 0.9, "c3": 0.5})
+    cancelled = asyncio.Event()
+
+    async def _slow_generation(**_kwargs):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def _complete(**kwargs):
+        await asyncio.sleep(0)  # Let the speculative generation start
+        assert kwargs["excluded_criteria"] == ["c1"]
+        return CompletionResult(is_complete=True, missing_criteria=[], coverage_summary="")
+
+    monkeypatch.setattr(question_service, "generate_question_excluding_criteria", _slow_generation)
+    monkeypatch.setattr(coverage_service, "check_completion_with_exclusions", _complete)
+
+    result = await orchestrator.process_skip_request(session.id)
+    await asyncio.wait_for(cancelled.wait(), 1)
+
+    assert result.is_final is True
+    assert "completion" in result.stage_timings
+    assert transcript_service.count_questions(session.id) == 1
+    assert exam_service.get_student_session(session.id).skip_state["skipped_criteria"] == ["c1"]
+
+
+@pytest.mark.asyncio
+async def test_question_generated_concurrently_when_exam_continues(client, monkeypatch):
+    session = _second_skip_session(client, {"c2": 0.9, "c3": 0.5})
+    started = []
+
+    async def _generation(**_kwargs):
+        started.append("generate")
+        return question_service.GeneratedQuestion(text="Question 2")
+
+    async def _not_complete(**_kwargs):
+        await asyncio.sleep(0)
+        assert started == ["generate"]  # Generation was already under way
+        return CompletionResult(is_complete=False, missing_criteria=["c3"], coverage_summary="")
+
+    monkeypatch.setattr(question_service, "generate_question_excluding_criteria", _generation)
+    monkeypatch.setattr(coverage_service, "check_completion_with_exclusions", _not_complete)
+
+    result = await orchestrator.process_skip_request(session.id)
+
+    assert result.next_question == "Question 2"
+    assert result.is_final is False
+    assert transcript_service.count_questions(session.id) == 2
+    assert exam_service.get_student_session(session.id).skip_state["current_criteria"] == ["c3"]
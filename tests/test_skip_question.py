@@ -41,7 +41,7 @@ async def test_process_student_response_resets_skip_state_for_new_question(clien
         return CompletionResult(is_complete=False, missing_criteria=[], coverage_summary="")
 
     async def _fake_generate_question(**_kwargs):
-        return "Question 2"
+        return question_service.GeneratedQuestion(text="Question 2")
 
     async def _fake_detect_struggle(**_kwargs):
         return None
@@ -95,7 +95,7 @@ async def test_process_skip_request_second_skip_excludes_current_criteria(client
 
     async def _fake_generate_question_excluding_criteria(**kwargs):
         captured["exclude_criteria"] = kwargs.get("exclude_criteria")
-        return "Question 2"
+        return question_service.GeneratedQuestion(text="Question 2")
 
     async def _fake_check_completion_with_exclusions(**_kwargs):
         return CompletionResult(is_complete=False, missing_criteria=[], coverage_summary="")
@@ -0,0 +1,75 @@
+from app.models.domain import CompletionResult, CoverageMap, CoverageResult, Criterion, ParsedRubric
+from app.services import auth as auth_service
+from app.services import coverage as coverage_service
+from app.services import exam as exam_service
+from app.services import questions as question_service
+from app.services import rubric as rubric_service
+from app.services import struggle as struggle_service
+from app.services import timing
+from app.services import transcript as transcript_service
+
+
+def test_stage_histograms_and_server_timing_header(monkeypatch):
+    monkeypatch.setattr(timing, "_stage_stats", timing.defaultdict(lambda: timing.defaultdict(timing._new_stats)))
+
+    for ms in [3, 40, 45, 700, 12000]:
+        timing.record_stage("response", "coverage", ms)
+
+    stats = timing.get_stage_stats()["response"]["coverage"]
+    assert stats["count"] == 5
+    assert stats["max_ms"] == 12000
+    assert stats["buckets"][0] == 1  # <= 5 ms
+    assert stats["buckets"][timing.LATENCY_BUCKETS_MS.index(50)] == 2
+    assert stats["buckets"][-2] == 1  # <= 30 s
+    assert stats["p50_ms"] == 50.0
+    assert stats["p95_ms"] == 30000.0
+
+    header = timing.server_timing_header({"load": 3.14159, "total": 2410.0})
+    assert header == "load;dur=3.1, total;dur=2410.0"
+
+
+def test_answer_pipeline_reports_stage_timings(client, monkeypatch):
+    teacher_id = auth_service.decode_token(client.headers["Authorization"].split(" ")[1])
+    parsed = ParsedRubric(criteria=[
+        Criterion(id="c1", name="Criterion 1", description="Desc 1"),
+        Criterion(id="c2", name="Criterion 2", description="Desc 2"),
+    ])
+    rubric = rubric_service.create_rubric(teacher_id, "Title", "Content", parsed_criteria=parsed)
+    exam = exam_service.create_exam(teacher_id, rubric.id)
+    session = exam_service.create_student_session(exam.id, "Student", "S1")
+    transcript_service.add_question(session.id, "Question 1")
+
+    async def _analyze_coverage(**_kwargs):
+        return CoverageResult(
+            newly_covered=["c1"],
+            updated_coverage=CoverageMap(covered_criteria={"c1": 0.9}),
+            reasoning="",
+            total_coverage_pct=0.45,
+        )
+
+    async def _detect_struggle(**_kwargs):
+        return None
+
+    async def _not_complete(**_kwargs):
+        return CompletionResult(is_complete=False, missing_criteria=["c2"], coverage_summary="")
+
+    async def _generate_question(**_kwargs):
+        return question_service.GeneratedQuestion(text="Question 2")
+
+    monkeypatch.setattr(coverage_service, "analyze_coverage", _analyze_coverage)
+    monkeypatch.setattr(struggle_service, "detect_struggle", _detect_struggle)
+    monkeypatch.setattr(coverage_service, "check_completion", _not_complete)
+    monkeypatch.setattr(question_service, "generate_question", _generate_question)
+
+    response = client.post(
+        f"/api/v1/session/{session.id}/response",
+        json={"session_id": session.id, "question": "Question 1", "response": "Answer 1"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["question_text"] == "Question 2"
+    stages = [part.split(";")[0] for part in response.headers["Server-Timing"].split(", ")]
+    assert set(stages) == {
+        "load", "record_response", "coverage", "struggle", "persist", "completion", "generate", "write", "total",
+    }
+    assert timing.get_stage_stats()["response"]["generate"]["count"] >= 1
@@ -0,0 +1,99 @@
+from datetime import datetime
+
+import pytest
+
+from app.models.domain import EntryType, Severity, StruggleType, TranscriptEntry
+from app.services import struggle as struggle_service
+
+
+class _FakeLLMClient:
+    def __init__(self):
+        self.calls = 0
+
+    async def complete_json(self, **_kwargs):
+        self.calls += 1
+        return {"struggle_detected": False}
+
+
+def _response(content):
+    return TranscriptEntry(
+        id="e1",
+        session_id="s1",
+        entry_type=EntryType.RESPONSE,
+        content=content,
+        timestamp=datetime.utcnow(),
+    )
+
+
+@pytest.mark.parametrize(
+    "response,expected_type",
+    [
+        ("", StruggleType.SILENCE),
+        ("Um... uh", StruggleType.SILENCE),
+        ("Sorry, I really don't know.", StruggleType.SILENCE),
+        ("Honestly, I have no idea at all", StruggleType.SILENCE),
+        ("No lo sé", StruggleType.SILENCE),
+        ("Je ne comprends pas la question", StruggleType.CONFUSION),
+        ("Keine Ahnung", StruggleType.SILENCE),
+        ("什么意思？", StruggleType.CONFUSION),
+    ],
+)
+def test_lexicon_rules_classify_obvious_cases(response, expected_type):
+    event = struggle_service.classify_struggle_locally(response, [])
+
+    assert event is not None
+    assert event.struggle_type == expected_type
+
+
+@pytest.mark.parametrize(
+    "response",
+    [
+        "I don't know exactly, but I think mitochondria produce most of the ATP",
+        "I'm not sure, maybe 42",
+        "No se puede dividir por cero",
+        "I don't know, Hemingway?",
+        "I'm not sure, maybe Paris",
+        "No idea, photosynthesis?",
+        "No sé, ¿la mitocondria?",
+        "不知道，光合作用？",
+    ],
+)
+def test_uncertain_answers_fall_through(response):
+    assert struggle_service.classify_struggle_locally(response, []) is None
+
+
+def test_near_duplicate_of_earlier_response_is_repetition():
+    earlier = "Photosynthesis converts light energy into chemical energy stored in glucose"
+    history = [_response(earlier)]
+
+    event = struggle_service.classify_struggle_locally(
+        "Um, photosynthesis converts light energy into chemical energy stored in glucose.",
+        history,
+    )
+    assert event is not None
+    assert event.struggle_type == StruggleType.REPETITION
+    assert event.severity == Severity.MEDIUM
+
+    different = "Cellular respiration releases the energy in glucose using oxygen in the mitochondria"
+    assert struggle_service.classify_struggle_locally(different, history) is None
+
+
+@pytest.mark.asyncio
+async def test_detect_struggle_skips_llm_for_rule_decisions(monkeypatch):
+    client = _FakeLLMClient()
+    monkeypatch.setattr(struggle_service, "get_llm_client", lambda: client)
+    before = struggle_service.get_struggle_detection_stats()
+
+    event = await struggle_service.detect_struggle("I don't know", "What is ATP?", [])
+    assert event.struggle_type == StruggleType.SILENCE
+    assert client.calls == 0
+
+    event = await struggle_service.detect_struggle(
+        "ATP is the molecule cells use to store and transfer energy", "What is ATP?", []
+    )
+    assert event is None
+    assert client.calls == 1
+
+    after = struggle_service.get_struggle_detection_stats()
+    assert after["rule_silence"] == before["rule_silence"] + 1
+    assert after["llm"] == before["llm"] + 1
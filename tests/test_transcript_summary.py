@@ -0,0 +1,94 @@
+import pytest
+
+from app.models.domain import EntryType, TranscriptEntry, TranscriptSummary
+from app.services import auth as auth_service
+from app.services import exam as exam_service
+from app.services import rubric as rubric_service
+from app.services import transcript as transcript_service
+from app.services import transcript_summary as summary_service
+from app.services.prompt_budget import estimate_tokens, render_history, truncate_to_tokens
+
+
+def _entry(n, entry_type, content):
+    return TranscriptEntry(id=str(n), session_id="s1", entry_type=entry_type, content=content)
+
+
+def test_history_is_summary_plus_recent_tail_within_budget():
+    history = [
+        _entry(i, EntryType.QUESTION if i % 2 == 0 else EntryType.RESPONSE, f"entry {i} " + "x" * 70)
+        for i in range(10)
+    ]
+    summary = TranscriptSummary(text="The student explained causes of the war.", entry_count=4)
+
+    text = render_history(history, budget_tokens=80, entry_max_tokens=15, summary=summary)
+
+    assert text.startswith("Summary of earlier conversation: The student explained causes of the war.")
+    assert estimate_tokens(text) <= 80
+    assert "entry 9" in text and "entry 8" in text
+    # Covered by the summary, or aged out of the budget
+    assert "entry 3" not in text and "entry 4" not in text
+    assert render_history([], budget_tokens=80, entry_max_tokens=15) == "No previous history"
+
+
+def test_truncate_to_tokens():
+    assert truncate_to_tokens("short", 10) == "short"
+    assert truncate_to_tokens("a" * 100, 5) == "a" * 17 + "..."
+
+
+def _session_with_exchanges(client, exchanges):
+    teacher_id = auth_service.decode_token(client.headers["Authorization"].split(" ")[1])
+    rubric = rubric_service.create_rubric(teacher_id, "Title", "Content")
+    exam = exam_service.create_exam(teacher_id, rubric.id)
+    session = exam_service.create_student_session(exam.id, "Student", "S1")
+    for i in range(exchanges):
+        transcript_service.add_question(session.id, f"Question {i}")
+        transcript_service.add_response(session.id, f"Answer {i}")
+    return session
+
+
+@pytest.mark.asyncio
+async def test_summary_folds_aged_out_entries_incrementally(client, monkeypatch):
+    prompts = []
+
+    class _FakeLLMClient:
+        async def complete(self, prompt, **_kwargs):
+            prompts.append(prompt)
+            return f"  Summary {len(prompts)}  "
+
+    monkeypatch.setattr(summary_service, "get_llm_client", lambda: _FakeLLMClient())
+    session = _session_with_exchanges(client, 5)
+
+    summary = await summary_service.update_transcript_summary(session.id)
+
+    assert summary == TranscriptSummary(text="Summary 1", entry_count=6)
+    assert "Answer 2" in prompts[0] and "Question 3" not in prompts[0]
+    assert exam_service.get_student_session(session.id).transcript_summary == summary
+
+    transcript_service.add_question(session.id, "Question 5")
+    transcript_service.add_response(session.id, "Answer 5")
+    summary = await summary_service.update_transcript_summary(session.id)
+
+    assert summary.entry_count == 8
+    assert "Summary 1" in prompts[1]
+    assert "Answer 3" in prompts[1] and "Answer 2" not in prompts[1]
+
+
+@pytest.mark.asyncio
+async def test_summary_update_is_scheduled_once_per_interval(client, monkeypatch):
+    calls = []
+
+    async def _fake_update(session_id):
+        calls.append(session_id)
+
+    monkeypatch.setattr(summary_service, "update_transcript_summary", _fake_update)
+    session = _session_with_exchanges(client, 5)
+
+    # 4 tail entries + 3 exchanges are needed before the first update
+    assert summary_service.schedule_summary_update(session, 9) is None
+    task = summary_service.schedule_summary_update(session, 10)
+    assert task is not None
+    assert summary_service.schedule_summary_update(session, 10) is None  # Already in flight
+    await task
+
+    assert calls == [session.id]
+    assert not summary_service._in_flight
@@ -0,0 +1,227 @@
+import asyncio
+import os
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from app.config import get_settings
+from app.services import auth as auth_service
+from app.services import exam as exam_service
+from app.services import rubric as rubric_service
+from app.services import tts as tts_service
+from app.services.http_client import get_http_client
+
+
+@pytest.mark.asyncio
+async def test_tts_cache_single_flight_and_lru_eviction(tmp_path):
+    cache = tts_service.TTSCache(tmp_path, max_bytes=10)
+    calls = []
+
+    async def _synthesize(data: bytes):
+        calls.append(data)
+        await asyncio.sleep(0.01)
+        return data
+
+    first, second = await asyncio.gather(
+        cache.get_or_create("a", lambda: _synthesize(b"aaaa")),
+        cache.get_or_create("a", lambda: _synthesize(b"aaaa")),
+    )
+    assert first == second
+    assert calls == [b"aaaa"]
+
+    await cache.get_or_create("b", lambda: _synthesize(b"bbbb"))
+    assert cache.get("a") is not None  # "a" is now most recently used
+    await cache.get_or_create("c", lambda: _synthesize(b"cccc"))
+
+    assert cache.get("b") is None
+    assert cache.get("a").read_bytes() == b"aaaa"
+    stats = cache.stats()
+    assert stats["misses"] == 3
+    assert stats["coalesced"] == 1
+    assert stats["evictions"] == 1
+    assert stats["bytes"] <= 10
+
+    # Index is rebuilt from disk
+    reloaded = tts_service.TTSCache(tmp_path, max_bytes=10)
+    assert reloaded.stats()["entries"] == 2
+
+
+def _create_session(client):
+    token = client.headers["Authorization"].split(" ")[1]
+    teacher_id = auth_service.decode_token(token)
+    rubric = rubric_service.create_rubric(teacher_id, "Title", "Content")
+    exam = exam_service.create_exam(teacher_id, rubric.id)
+    return exam_service.create_student_session(exam.id, "Student", "S1")
+
+
+def test_tts_cache_removes_stale_partial_files_on_load(tmp_path):
+    stale = [tmp_path / "a.tmp", tmp_path / "b.part"]
+    fresh = tmp_path / "c.part"
+    for path in stale + [fresh]:
+        path.write_bytes(b"partial")
+    old = time.time() - tts_service.STALE_TEMP_FILE_SECONDS - 1
+    for path in stale:
+        os.utime(path, (old, old))
+
+    cache = tts_service.TTSCache(tmp_path, max_bytes=10)
+
+    assert not any(path.exists() for path in stale)
+    assert fresh.exists()  # May still be written by another worker
+    assert cache.stats()["entries"] == 0
+
+
+def test_tts_route_serves_cached_file_with_etag(client, tmp_path, monkeypatch):
+    monkeypatch.setenv("TTS_CACHE_DIR", str(tmp_path / "tts"))
+    monkeypatch.setenv("TTS_STREAMING_ENABLED", "false")
+    get_settings.cache_clear()
+    tts_service.get_tts_cache.cache_clear()
+    session = _create_session(client)
+
+    calls = []
+
+    async def _fake_generate_speech(text, language="en", voice_id=None, translated_text=None):
+        calls.append((text, language, voice_id))
+        return b"ID3" + b"\x00" * 97
+
+    monkeypatch.setattr(tts_service, "generate_speech", _fake_generate_speech)
+
+    url = f"/api/v1/session/{session.id}/tts"
+    response = client.get(url, params={"text": "Question 1"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "audio/mpeg"
+    etag = response.headers["etag"]
+
+    replay = client.get(url, params={"text": "Question 1"}, headers={"Range": "bytes=0-2"})
+    assert replay.status_code == 206
+    assert replay.content == b"ID3"
+
+    not_modified = client.get(url, params={"text": "Question 1"}, headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+
+    assert len(calls) == 1
+    tts_service.get_tts_cache.cache_clear()
+
+
+def test_tts_route_streams_miss_and_writes_through(client, tmp_path, monkeypatch):
+    monkeypatch.setenv("TTS_CACHE_DIR", str(tmp_path / "tts"))
+    get_settings.cache_clear()
+    tts_service.get_tts_cache.cache_clear()
+    session = _create_session(client)
+
+    calls = []
+
+    async def _fake_open_speech_stream(text, language="en", voice_id=None):
+        calls.append(text)
+
+        async def _chunks():
+            for chunk in (b"ID3", b"chunk1", b"chunk2"):
+                yield chunk
+
+        return _chunks()
+
+    monkeypatch.setattr(tts_service, "open_speech_stream", _fake_open_speech_stream)
+
+    url = f"/api/v1/session/{session.id}/tts"
+    streamed = client.get(url, params={"text": "Question 1"})
+    assert streamed.status_code == 200
+    assert streamed.content == b"ID3chunk1chunk2"
+    assert "content-length" not in streamed.headers
+
+    cached = client.get(url, params={"text": "Question 1"})
+    assert cached.status_code == 200
+    assert cached.content == b"ID3chunk1chunk2"
+    assert cached.headers["content-length"] == str(len(b"ID3chunk1chunk2"))
+    assert cached.headers["etag"] == streamed.headers["etag"]
+
+    assert calls == ["Question 1"]
+    tts_service.get_tts_cache.cache_clear()
+
+
+def _failing_stream(chunks_before_failure):
+    async def _fake_open_speech_stream(text, language="en", voice_id=None):
+        async def _chunks():
+            for chunk in chunks_before_failure:
+                yield chunk
+            raise RuntimeError("upstream reset")
+
+        return _chunks()
+
+    return _fake_open_speech_stream
+
+
+def test_tts_route_returns_502_when_stream_fails_before_audio(client, tmp_path, monkeypatch):
+    monkeypatch.setenv("TTS_CACHE_DIR", str(tmp_path / "tts"))
+    get_settings.cache_clear()
+    tts_service.get_tts_cache.cache_clear()
+    session = _create_session(client)
+    monkeypatch.setattr(tts_service, "open_speech_stream", _failing_stream([]))
+
+    response = client.get(f"/api/v1/session/{session.id}/tts", params={"text": "Question 1"})
+    assert response.status_code == 502
+    assert tts_service.get_tts_cache().stats()["entries"] == 0
+    tts_service.get_tts_cache.cache_clear()
+
+
+def test_tts_route_aborts_when_stream_fails_mid_clip(client, tmp_path, monkeypatch):
+    monkeypatch.setenv("TTS_CACHE_DIR", str(tmp_path / "tts"))
+    get_settings.cache_clear()
+    tts_service.get_tts_cache.cache_clear()
+    session = _create_session(client)
+    monkeypatch.setattr(tts_service, "open_speech_stream", _failing_stream([b"ID3", b"chunk1"]))
+
+    # A truncated clip must not complete as a clean 200
+    with pytest.raises(RuntimeError):
+        client.get(f"/api/v1/session/{session.id}/tts", params={"text": "Question 1"})
+    assert tts_service.get_tts_cache().stats()["entries"] == 0
+    tts_service.get_tts_cache.cache_clear()
+
+
+@pytest.mark.asyncio
+async def test_waiting_on_a_failed_fill_synthesizes_again(tmp_path, monkeypatch):
+    cache = tts_service.TTSCache(tmp_path, max_bytes=1000)
+    monkeypatch.setattr(tts_service, "get_tts_cache", lambda: cache)
+    started = asyncio.Event()
+
+    async def _fake_open_speech_stream(text, language="en", voice_id=None):
+        async def _chunks():
+            started.set()
+            await asyncio.sleep(0.01)
+            raise RuntimeError("upstream reset")
+            yield b""
+
+        return _chunks()
+
+    async def _fake_generate_speech(text, language="en", voice_id=None, translated_text=None):
+        return b"ID3fresh"
+
+    monkeypatch.setattr(tts_service, "open_speech_stream", _fake_open_speech_stream)
+    monkeypatch.setattr(tts_service, "generate_speech", _fake_generate_speech)
+
+    first = asyncio.ensure_future(tts_service.stream_cached_speech("Question 1"))
+    await started.wait()
+    path, _, chunks = await tts_service.stream_cached_speech("Question 1")
+
+    assert chunks is None
+    assert path.read_bytes() == b"ID3fresh"
+    with pytest.raises(HTTPException) as exc:
+        await first
+    assert exc.value.status_code == 502
+
+
+@pytest.mark.asyncio
+async def test_synthesis_reuses_the_pooled_http_client(monkeypatch, httpx_mock):
+    monkeypatch.setenv("ELEVENLABS_API_KEY", "test-key")
+    httpx_mock.add_response(content=b"ID3audio", is_reusable=True)
+    client = get_http_client()
+
+    assert await tts_service.generate_speech("Question 1") == b"ID3audio"
+    chunks = await tts_service.open_speech_stream("Question 1")
+    assert b"".join([chunk async for chunk in chunks]) == b"ID3audio"
+
+    assert get_http_client() is client
+    assert not client.is_closed
+    assert [request.extensions["timeout"]["read"] for request in httpx_mock.get_requests()] == [
+        tts_service.TTS_TIMEOUT,
+        tts_service.TTS_TIMEOUT,
+    ]